@@ -127,13 +127,14 @@ class QuestionForgeApp:
             refined_count = 0
             transformations = []
 
-            for q in questions:
-                scores = self.analyzer.analyze(q)
+            # Score and get suggestions for the whole upload in one pass
+            all_scores = self.analyzer.analyze_batch(questions, dedupe=True)
+            all_suggestions = self.transformer.suggest_transformations_batch(
+                questions, all_scores, threshold=4.8
+            )
 
+            for q, scores, suggestions in zip(questions, all_scores, all_suggestions):
                 if scores['overall'] < 4.8:
-                    # Get transformation suggestions
-                    suggestions = self.transformer.suggest_transformations(q, scores)
-
                     if suggestions and auto_apply:
                         # Apply best transformation
                         best = suggestions[0]
@@ -11,6 +11,8 @@ Usage:
 
 import sys
 import os
+import copy
+import json
 
 # Fix Windows console encoding
 if sys.platform == 'win32':
@@ -33,7 +35,19 @@ from refiner import (
     QuestionTransformer,
     QualityValidator,
     RAGOptimizer,
-    ReportGenerator
+    ReportGenerator,
+    ParallelTransformEngine,
+    QuestionDeduplicator,
+    RefinementScheduler,
+    StrategyStats,
+    StratifiedSampler,
+    NearDuplicateDetector,
+    InvertedIndex,
+    RetrievalBenchmark,
+    SemanticIndex,
+    KeywordVocabulary,
+    PrerequisiteGraph,
+    StructuralFingerprinter
 )
 
 console = Console()
@@ -47,12 +61,28 @@ def cli():
 
 @cli.command()
 @click.argument('input_file', type=click.Path(exists=True))
-def analyze(input_file):
+@click.option('--sample', type=int, default=None, help='Estimate from a stratified sample of N questions')
+@click.option('--confidence', type=float, default=0.95, help='Confidence level for sampled estimates')
+@click.option('--margin', type=float, default=None, help='Target margin of error; sets the sample size')
+@click.option('--resolve-prerequisites', is_flag=True,
+              help='Credit only prerequisites that name questions in this bank')
+def analyze(input_file, sample, confidence, margin, resolve_prerequisites):
     """Analyze question bank quality"""
 
     console.print("\n[bold cyan]🔍 QuestionForge - Quality Analysis[/bold cyan]")
     console.print("[italic]\"Small fixes, big clarity\" - Quest & Crossfire[/italic]\n")
 
+    if margin is not None:
+        sized = StratifiedSampler.sample_size_for(confidence, margin)
+        if sample is not None and sample != sized:
+            console.print(f"[yellow]--margin overrides --sample: sampling {sized} questions[/yellow]")
+        sample = sized
+    if sample is not None:
+        if resolve_prerequisites:
+            console.print("[yellow]--resolve-prerequisites is ignored when sampling[/yellow]")
+        _analyze_sample(input_file, sample, confidence)
+        return
+
     # Parse questions
     with console.status("[bold green]Loading question bank...", spinner="dots"):
         questions = QuestionParser.parse_jsonl(input_file)
@@ -61,6 +91,8 @@ def analyze(input_file):
 
     # Validate
     validator = QualityValidator(threshold=4.8)
+    if resolve_prerequisites:
+        validator.analyzer.set_prerequisite_graph(PrerequisiteGraph.build(questions))
 
     with Progress(
         SpinnerColumn(),
@@ -102,6 +134,22 @@ def analyze(input_file):
 
     console.print(table)
 
+    # Score quantiles (streaming sketch, per criterion)
+    console.print("\n[bold]SCORE QUANTILES:[/bold]")
+
+    quantiles = validation['quantiles']
+    labels = list(quantiles['overall'])
+
+    table = Table(show_header=True, header_style="bold magenta")
+    table.add_column("Criterion", style="dim")
+    for label in labels:
+        table.add_column(label)
+
+    for name, values in quantiles.items():
+        table.add_row(name, *(f"{values[label]:.2f}" for label in labels))
+
+    console.print(table)
+
     # Summary panel
     avg_score = validation['average_score']
     passed = validation['passed']
@@ -133,15 +181,93 @@ def analyze(input_file):
         console.print(f"[dim]Run: python main.py refine {input_file} --output refined.jsonl[/dim]\n")
 
 
+def _analyze_sample(input_file, sample_size, confidence):
+    """Estimated quality from a stratified sample, streamed from the file"""
+
+    validator = QualityValidator(threshold=4.8)
+    seed = validator.analyzer.config.get('refinement', {}).get('seed', 0)
+
+    with console.status(f"[bold green]Sampling {sample_size} questions...", spinner="dots"):
+        try:
+            estimate = validator.estimate_batch(
+                QuestionParser.iter_jsonl(input_file), sample_size, confidence=confidence, seed=seed
+            )
+        except ValueError as e:
+            # iter_jsonl skips unparseable lines, so a bad file arrives as an empty stream
+            raise click.ClickException(f"{e} in {input_file}")
+
+    console.print(f"✓ Scored {estimate['sample_size']} of {estimate['total']} questions "
+                  f"across {estimate['strata']} strata (topic × difficulty × style)\n")
+
+    console.print(f"[bold]ESTIMATED QUALITY DISTRIBUTION ({100*confidence:.0f}% CI):[/bold]")
+
+    table = Table(show_header=True, header_style="bold magenta")
+    table.add_column("Category", style="dim")
+    table.add_column("Est. Count")
+    table.add_column("Share")
+    table.add_column("Interval")
+
+    categories = [
+        ("Excellent (≥4.8)", "excellent"),
+        ("Very Good (4.5-4.7)", "very_good"),
+        ("Good (4.0-4.4)", "good"),
+        ("Adequate (3.5-3.9)", "adequate"),
+        ("Needs Work (3.0-3.4)", "needs_work"),
+        ("Poor (<3.0)", "poor")
+    ]
+    for label, key in categories:
+        share = estimate['distribution_share'][key]
+        table.add_row(
+            label,
+            str(estimate['distribution'][key]),
+            f"{100*share['estimate']:.1f}%",
+            f"{100*share['low']:.1f}% - {100*share['high']:.1f}%"
+        )
+
+    console.print(table)
+
+    avg = estimate['average_score']
+    rate = estimate['pass_rate']
+    summary = f"""
+[bold]Average Score:[/bold] {avg['estimate']:.2f}/5.00 ({avg['low']:.2f} - {avg['high']:.2f})
+[bold]Target:[/bold] 4.8/5.0
+[bold]Pass Rate (≥4.8):[/bold] {100*rate['estimate']:.1f}% ({100*rate['low']:.1f}% - {100*rate['high']:.1f}%)
+[bold]Estimated Passing:[/bold] {estimate['passed']}/{estimate['total']}
+"""
+
+    console.print(Panel(summary, title="📊 Sampled Estimate", border_style="cyan"))
+
+
 @cli.command()
 @click.argument('input_file', type=click.Path(exists=True))
 @click.option('--output', '-o', default='refined.jsonl', help='Output file path')
 @click.option('--auto', is_flag=True, help='Auto-apply all refinements')
 @click.option('--interactive', '-i', is_flag=True, help='Interactive review mode')
 @click.option('--threshold', '-t', default=4.8, help='Quality threshold')
-def refine(input_file, output, auto, interactive, threshold):
+@click.option('--max-iterations', type=int, default=None,
+              help='Max refinement passes per question (default: refinement.max_iterations)')
+@click.option('--search', is_flag=True, help='Beam-search strategy sequences instead of greedy passes')
+@click.option('--workers', '-w', default=1, help='Worker processes for refinement (0 = all CPUs)')
+@click.option('--dedupe', is_flag=True, help='Score and refine each distinct question once')
+@click.option('--time-budget', type=float, default=None,
+              help='Seconds to spend; refines worst questions first and saves progress when time runs out')
+@click.option('--stats-file', type=click.Path(), default=None,
+              help='Strategy improvement stats to learn from and update (used with --time-budget)')
+@click.option('--index', 'index_path', type=click.Path(), default=None,
+              help='Search index (.npz) to keep current: loaded if present, otherwise built, then saved')
+@click.option('--update-vocabulary', is_flag=True,
+              help='Save the keyword vocabulary, updated with this bank, to rag.vocabulary.path')
+def refine(input_file, output, auto, interactive, threshold, max_iterations, search, workers, dedupe,
+           time_budget, stats_file, index_path, update_vocabulary):
     """Refine questions to 4.8/5 quality"""
 
+    if time_budget is not None:
+        # The scheduler refines greedily, in-process and unattended
+        conflicts = [name for name, used in (("--workers", workers != 1), ("--search", search),
+                                             ("--dedupe", dedupe), ("--interactive", interactive)) if used]
+        if conflicts:
+            raise click.UsageError(f"--time-budget cannot be combined with {', '.join(conflicts)}")
+
     console.print("\n[bold cyan]🔨 QuestionForge - Batch Refinement[/bold cyan]")
     console.print("[italic]\"Small fixes, big clarity\" - Quest & Crossfire[/italic]\n")
 
@@ -155,55 +281,109 @@ def refine(input_file, output, auto, interactive, threshold):
     analyzer = QuestionAnalyzer()
     transformer = QuestionTransformer()
 
-    before_scores = [analyzer.analyze(q)["overall"] for q in questions]
+    # A configured keyword vocabulary is refreshed from the whole bank in
+    # memory (so it is never empty or stale), handed to the workers, and kept
+    # current with the refined keywords. The file is only rewritten on request.
+    vocabulary = analyzer.vocabulary
+    if vocabulary is not None:
+        for q in questions:
+            vocabulary.upsert(q)
+        transformer.analyzer.set_vocabulary(vocabulary)
+        transformer.add_listener(vocabulary.on_refined)
+    elif update_vocabulary:
+        raise click.UsageError("--update-vocabulary needs rag.vocabulary.path set in config.yaml")
+    engine = ParallelTransformEngine(workers=workers or None, vocabulary=vocabulary)
+
+    before = analyzer.analyze_batch(questions, dedupe=dedupe)
+    before_scores = [s["overall"] for s in before]
     avg_before = sum(before_scores) / len(before_scores)
 
-    console.print(f"[dim]Average score before refinement: {avg_before:.2f}/5.00[/dim]\n")
-
-    # Refine
-    refined_count = 0
-
-    with Progress(
-        SpinnerColumn(),
-        TextColumn("[progress.description]{task.description}"),
-        BarColumn(),
-        TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),
-        console=console
-    ) as progress:
-        task = progress.add_task("[cyan]Refining questions...", total=len(questions))
+    console.print(f"[dim]Average score before refinement: {avg_before:.2f}/5.00[/dim]")
 
-        for i, q in enumerate(questions):
-            current_score = analyzer.analyze(q)["overall"]
+    groups = None
+    if dedupe:
+        groups = QuestionDeduplicator().group(questions)
+        console.print(f"[dim]Distinct questions: {len(groups)}/{len(questions)} "
+                      f"(dedup ratio {100 * QuestionDeduplicator.ratio(groups):.1f}%)[/dim]")
+        near = len(groups) - len(QuestionDeduplicator(normalize_whitespace=True).group(questions))
+        if near:
+            console.print(f"[dim]{near} more differ only in whitespace (scored and refined separately)[/dim]")
 
-            if current_score >= threshold:
-                progress.update(task, advance=1)
-                continue
+    console.print()
 
-            # Transform
-            transformed, strategy, improvement = transformer.transform(q, auto=auto)
+    # Indexes follow every kept refinement
+    index = None
+    if index_path:
+        if Path(index_path).exists():
+            index = InvertedIndex.load(index_path)
+        else:
+            index = InvertedIndex.build(questions, **transformer.config['rag'].get('index', {}))
+        transformer.add_listener(index.on_refined)
 
-            if improvement > 0:
-                if interactive:
-                    # Show suggestion (simplified for now)
-                    console.print(f"\n[yellow]Question {i+1}/{len(questions)}:[/yellow] {q.question[:60]}...")
-                    console.print(f"[dim]Suggested: {transformed.question[:60]}...[/dim]")
-                    console.print(f"[green]Improvement: +{improvement:.2f}[/green]")
+    # Refine (interactive mode auto-applies refinements projected at or above this)
+    auto_apply_threshold = transformer.config['refinement']['auto_apply_threshold']
+    refined_count = 0
 
-                    if click.confirm("Apply?", default=True):
-                        questions[i] = transformed
+    if time_budget is not None:
+        refined_count = _refine_within_budget(
+            questions, transformer, threshold, max_iterations, time_budget, stats_file
+        )
+    else:
+        with Progress(
+            SpinnerColumn(),
+            TextColumn("[progress.description]{task.description}"),
+            BarColumn(),
+            TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),
+            console=console
+        ) as progress:
+            task = progress.add_task("[cyan]Refining questions...", total=len(questions))
+
+            # Outcomes arrive in input order; later questions are refined in the
+            # background while earlier suggestions are reviewed
+            outcomes = engine.iter_outcomes(
+                questions, threshold=threshold, max_iterations=max_iterations,
+                search=search, scores=before, groups=groups
+            )
+
+            for i, outcome in outcomes:
+                q = questions[i]
+
+                if outcome is None:
+                    # Already meets the threshold
+                    progress.update(task, advance=1)
+                    continue
+
+                transformed, strategies, improvement = outcome
+
+                if improvement > 0:
+                    projected = transformed.quality_scores["overall"]
+
+                    if interactive and projected < auto_apply_threshold:
+                        # Show suggestion (simplified for now)
+                        console.print(f"\n[yellow]Question {i+1}/{len(questions)}:[/yellow] {q.question[:60]}...")
+                        console.print(f"[dim]Suggested: {transformed.question[:60]}...[/dim]")
+                        console.print(f"[dim]Strategies: {' → '.join(strategies)}[/dim]")
+                        console.print(f"[green]Improvement: +{improvement:.2f}[/green]")
+
+                        if click.confirm("Apply?", default=True):
+                            transformer.keep(questions, i, transformed)
+                            refined_count += 1
+                    else:
+                        transformer.keep(questions, i, transformed)
                         refined_count += 1
-                else:
-                    questions[i] = transformed
-                    refined_count += 1
 
-            progress.update(task, advance=1)
+                progress.update(task, advance=1)
 
     # Analyze after
-    after_scores = [analyzer.analyze(q)["overall"] for q in questions]
+    after_scores = [s["overall"] for s in analyzer.analyze_batch(questions, dedupe=dedupe)]
     avg_after = sum(after_scores) / len(after_scores)
 
     # Save
     QuestionParser.save_jsonl(questions, output)
+    if index is not None:
+        index.save(index_path)
+    if update_vocabulary:
+        vocabulary.save(analyzer.config['rag']['vocabulary']['path'])
 
     # Results
     console.print("\n[bold green]✨ Refinement Complete![/bold green]\n")
@@ -244,6 +424,329 @@ def refine(input_file, output, auto, interactive, threshold):
     console.print(f"\n[dim]🎯 Ready for batch processing![/dim]\n")
 
 
+@cli.command()
+@click.argument('input_file', type=click.Path(exists=True))
+@click.option('--limit', '-k', default=500, help='Number of worst questions to list')
+@click.option('--output', '-o', default=None, help='Also save the worst questions as JSONL')
+@click.option('--threshold', '-t', default=4.8, help='Quality threshold')
+def priority(input_file, limit, output, threshold):
+    """List the questions most in need of refinement"""
+
+    console.print("\n[bold cyan]🎯 QuestionForge - Refinement Priority[/bold cyan]")
+    console.print("[italic]\"Small fixes, big clarity\" - Quest & Crossfire[/italic]\n")
+
+    validator = QualityValidator(threshold=threshold)
+
+    # Stream the bank; only the `limit` worst questions are held in memory
+    with console.status("[bold green]Scoring question bank...", spinner="dots"):
+        worst = validator.get_refinement_priority(QuestionParser.iter_jsonl(input_file), limit=limit)
+
+    table = Table(show_header=True, header_style="bold magenta")
+    table.add_column("#", style="dim")
+    table.add_column("Question ID")
+    table.add_column("Score")
+    table.add_column("Top Issue")
+
+    for rank, (q, score, top_issues) in enumerate(worst[:20], 1):
+        table.add_row(str(rank), q.id, f"{score:.2f}", top_issues[0] if top_issues else "-")
+
+    console.print(table)
+
+    if len(worst) > 20:
+        console.print(f"[dim]...and {len(worst) - 20} more[/dim]")
+
+    if output:
+        QuestionParser.save_jsonl([q for q, score, top_issues in worst], output)
+        console.print(f"\n[bold green]✓ Worst {len(worst)} questions saved to:[/bold green] {output}")
+
+    console.print()
+
+
+@cli.command()
+@click.argument('input_file', type=click.Path(exists=True))
+@click.option('--output', '-o', default=None, help='Save the bank with duplicates_check filled in')
+@click.option('--threshold', '-t', type=float, default=None, help='Similarity threshold (default from config)')
+@click.option('--semantic', is_flag=True, help='Compare character n-gram vectors instead of MinHash shingles')
+@click.option('--structural', is_flag=True,
+              help='Group questions whose code_context has the same structure (names and literals ignored)')
+def dedupe(input_file, output, threshold, semantic, structural):
+    """Find near-duplicate questions (MinHash + LSH)"""
+
+    console.print("\n[bold cyan]🧬 QuestionForge - Near-Duplicate Detection[/bold cyan]")
+    console.print("[italic]\"Small fixes, big clarity\" - Quest & Crossfire[/italic]\n")
+
+    with console.status("[bold green]Loading question bank...", spinner="dots"):
+        questions = QuestionParser.parse_jsonl(input_file)
+
+    console.print(f"✓ Loaded {len(questions)} questions\n")
+
+    with console.status("[bold green]Hashing and bucketing...", spinner="dots"):
+        if structural:
+            clusters = StructuralFingerprinter().group(questions)
+        elif semantic:
+            index = SemanticIndex.from_config().build(questions)
+            threshold = threshold if threshold is not None else index.duplicate_threshold
+            clusters = index.near_duplicates(threshold)
+        else:
+            detector = NearDuplicateDetector.from_config(threshold=threshold)
+            threshold = detector.threshold
+            clusters, pairs = detector.find(questions)
+
+    duplicates = sum(len(members) - 1 for members in clusters)
+    criterion = "same code structure" if structural else f"similarity ≥ {threshold}"
+    console.print(f"Found {len(clusters)} clusters, {duplicates} near-duplicates ({criterion})\n")
+
+    if clusters:
+        table = Table(show_header=True, header_style="bold magenta")
+        table.add_column("Kept", style="dim")
+        table.add_column("Duplicates")
+        table.add_column("Question")
+
+        for members in clusters[:20]:
+            first = questions[members[0]]
+            text = first.question[:50] + "..." if len(first.question) > 50 else first.question
+            table.add_row(first.id, ", ".join(questions[j].id for j in members[1:6]), text)
+
+        console.print(table)
+
+        if len(clusters) > 20:
+            console.print(f"[dim]...and {len(clusters) - 20} more clusters[/dim]")
+
+    if output:
+        annotated = NearDuplicateDetector.annotate(questions, clusters)
+        QuestionParser.save_jsonl(questions, output)
+        console.print(f"\n[bold green]✓ duplicates_check set on {annotated} questions, saved to:[/bold green] {output}")
+
+    console.print()
+
+
+@cli.command()
+@click.argument('input_file', type=click.Path(exists=True))
+@click.argument('query')
+@click.option('--k', '-k', default=10, help='Number of results')
+@click.option('--index', 'index_path', type=click.Path(), default=None,
+              help='Index file (.npz): loaded if present, otherwise built and saved there')
+@click.option('--semantic', is_flag=True, help='Rank by character n-gram vector similarity instead of BM25')
+def search(input_file, query, k, index_path, semantic):
+    """Query a local BM25 index of the bank"""
+
+    console.print("\n[bold cyan]🔎 QuestionForge - Local Search[/bold cyan]")
+    console.print("[italic]\"Small fixes, big clarity\" - Quest & Crossfire[/italic]\n")
+
+    if semantic:
+        with console.status("[bold green]Embedding question bank...", spinner="dots"):
+            index = SemanticIndex.from_config().build(QuestionParser.iter_jsonl(input_file))
+        console.print(f"✓ Embedded {len(index)} questions\n")
+    elif index_path and Path(index_path).exists():
+        index = InvertedIndex.load(index_path)
+        console.print(f"✓ Loaded index of {len(index)} questions from {index_path}\n")
+    else:
+        settings = RAGOptimizer().config['rag'].get('index', {})
+        with console.status("[bold green]Indexing question bank...", spinner="dots"):
+            index = InvertedIndex.build(QuestionParser.iter_jsonl(input_file), **settings)
+        console.print(f"✓ Indexed {len(index)} questions\n")
+        if index_path:
+            index.save(index_path)
+            console.print(f"✓ Index saved to: {index_path}\n")
+
+    results = index.search(query, k=k)
+    if not results:
+        console.print("[yellow]No matches[/yellow]\n")
+        return
+
+    table = Table(show_header=True, header_style="bold magenta")
+    table.add_column("#", style="dim")
+    table.add_column("Question ID")
+    table.add_column("Cosine" if semantic else "BM25")
+
+    for rank, (qid, score) in enumerate(results, 1):
+        table.add_row(str(rank), qid, f"{score:.3f}")
+
+    console.print(table)
+    console.print()
+
+
+@cli.command()
+@click.argument('input_file', type=click.Path(exists=True))
+@click.option('--closure', 'closure_id', default=None, help='List everything needed before this question id')
+@click.option('--dependents', 'dependents_id', default=None, help='List everything that needs this question id')
+@click.option('--order', 'order_output', type=click.Path(), default=None,
+              help='Save the bank with prerequisites first (questions on cycles go last)')
+def prereqs(input_file, closure_id, dependents_id, order_output):
+    """Check prerequisite references: dangling ids, cycles, ordering"""
+
+    console.print("\n[bold cyan]🧭 QuestionForge - Prerequisite Graph[/bold cyan]")
+    console.print("[italic]\"Small fixes, big clarity\" - Quest & Crossfire[/italic]\n")
+
+    with console.status("[bold green]Loading question bank...", spinner="dots"):
+        questions = QuestionParser.parse_jsonl(input_file)
+        graph = PrerequisiteGraph.build(questions)
+        cycles = graph.cycles()
+
+    dangling = sum(len(refs) for refs in graph.dangling.values())
+    console.print(f"✓ {len(graph)} questions, {graph.edge_count} resolved prerequisite links, "
+                  f"{dangling} dangling, {len(cycles)} cycles\n")
+
+    if graph.dangling:
+        table = Table(title="Dangling prerequisites", show_header=True, header_style="bold magenta")
+        table.add_column("Question", style="dim")
+        table.add_column("Unknown ids")
+        for qid, refs in list(graph.dangling.items())[:20]:
+            table.add_row(qid, ", ".join(refs))
+        console.print(table)
+        if len(graph.dangling) > 20:
+            console.print(f"[dim]...and {len(graph.dangling) - 20} more questions[/dim]")
+
+    for cycle in cycles[:10]:
+        console.print(f"[red]Cycle:[/red] {' → '.join(cycle)}")
+    if len(cycles) > 10:
+        console.print(f"[dim]...and {len(cycles) - 10} more cycles[/dim]")
+
+    try:
+        for label, qid, query in (("Needed before", closure_id, graph.closure),
+                                  ("Needed by", dependents_id, graph.dependents)):
+            if qid:
+                found = query(qid)
+                console.print(f"\n[bold]{label} {qid}[/bold] ({len(found)}): {', '.join(found[:50]) or '-'}")
+    except ValueError as e:
+        console.print(f"\n[red]{e}[/red]")
+
+    if order_output:
+        rank = {qid: i for i, qid in enumerate(graph.topological_order())}
+        ordered = sorted(questions, key=lambda q: rank.get(q.id, len(rank)))
+        QuestionParser.save_jsonl(ordered, order_output)
+        console.print(f"\n[bold green]✓ Ordered bank saved to:[/bold green] {order_output}")
+
+    console.print()
+
+
+@cli.command()
+@click.argument('input_file', type=click.Path(exists=True))
+@click.option('--output', '-o', default=None,
+              help='Table file (default: rag.vocabulary.path, else keyword_vocabulary.json)')
+def vocabulary(input_file, output):
+    """Build the keyword document-frequency table used by RAG scoring"""
+
+    console.print("\n[bold cyan]📚 QuestionForge - Keyword Vocabulary[/bold cyan]")
+    console.print("[italic]\"Small fixes, big clarity\" - Quest & Crossfire[/italic]\n")
+
+    with console.status("[bold green]Loading question bank...", spinner="dots"):
+        questions = QuestionParser.parse_jsonl(input_file)
+
+    vocab = KeywordVocabulary.from_config().build(questions)
+    configured = QuestionAnalyzer().config['rag'].get('vocabulary', {}).get('path')
+    output = output or configured or 'keyword_vocabulary.json'
+    vocab.save(output)
+
+    console.print(f"✓ {len(vocab.df)} distinct keywords over {len(vocab)} questions "
+                  f"in {len(vocab.topic_df)} topics\n")
+
+    generic = vocab.generic_keywords()
+    if generic:
+        table = Table(title=f"Keywords in more than {vocab.max_df:.0%} of questions (not counted)",
+                      show_header=True, header_style="bold magenta")
+        table.add_column("Keyword")
+        table.add_column("Share", justify="right")
+        for keyword, share in generic:
+            table.add_row(keyword, f"{share:.1%}")
+        console.print(table)
+
+    if not vocab.active:
+        console.print(f"[yellow]Fewer than {vocab.min_documents} questions: "
+                      f"RAG scoring keeps using raw keyword counts[/yellow]")
+
+    console.print(f"\n[bold green]✓ Saved to:[/bold green] {output}")
+    if output != configured:
+        console.print(f"[dim]Set rag.vocabulary.path to {output} in config.yaml to score with it[/dim]")
+    console.print()
+
+
+@cli.command()
+@click.argument('original_file', type=click.Path(exists=True))
+@click.argument('refined_file', type=click.Path(exists=True), required=False)
+@click.option('--rag', 'apply_rag', is_flag=True, help='Compare against the original after RAGOptimizer')
+@click.option('--output', '-o', default=None, help='Save the benchmark results as JSON')
+@click.option('--fail-on-regression', is_flag=True, help='Exit with status 1 if recall or MRR drops')
+def benchmark(original_file, refined_file, apply_rag, output, fail_on_regression):
+    """Measure retrieval recall@k, MRR and latency on a local index"""
+
+    console.print("\n[bold cyan]🎯 QuestionForge - Retrieval Benchmark[/bold cyan]")
+    console.print("[italic]\"Small fixes, big clarity\" - Quest & Crossfire[/italic]\n")
+
+    before = QuestionParser.parse_jsonl(original_file)
+    optimizer = RAGOptimizer()
+    bench = RetrievalBenchmark(**optimizer.config['rag'].get('index', {}))
+
+    after = None
+    if refined_file:
+        after = QuestionParser.parse_jsonl(refined_file)
+    elif apply_rag:
+        after = optimizer.optimize_batch([copy.deepcopy(q) for q in before])
+
+    with console.status("[bold green]Generating probes and running queries...", spinner="dots"):
+        probes = bench.generate_probes(before)
+        if after is None:
+            results = {"before": bench.run(before, probes)}
+        else:
+            results = bench.compare(before, after, probes)
+
+    console.print(f"✓ {len(probes)} probe queries over {len(before)} questions\n")
+
+    table = Table(show_header=True, header_style="bold magenta")
+    table.add_column("Metric", style="dim")
+    for name in ("before", "after", "delta"):
+        if name in results:
+            table.add_column(name.capitalize())
+
+    def row(label, pick, fmt):
+        cells = [fmt.format(pick(results[name])) for name in ("before", "after") if name in results]
+        if "delta" in results:
+            cells.append(f"{pick(results['delta']):+.4f}")
+        table.add_row(label, *cells)
+
+    for k in results["before"]["recall"]:
+        row(f"Recall{k}", lambda r, k=k: r["recall"][k], "{:.4f}")
+    row("MRR", lambda r: r["mrr"], "{:.4f}")
+    for kind in results["before"]["by_kind"]:
+        row(f"MRR ({kind})", lambda r, kind=kind: r["by_kind"][kind]["mrr"], "{:.4f}")
+    table.add_row("Latency p50 (ms)", *(f"{results[n]['latency_ms']['p50']:.3f}" for n in ("before", "after") if n in results))
+    table.add_row("Latency p95 (ms)", *(f"{results[n]['latency_ms']['p95']:.3f}" for n in ("before", "after") if n in results))
+
+    console.print(table)
+
+    if output:
+        Path(output).write_text(json.dumps(results, indent=2))
+        console.print(f"\n[bold green]✓ Results saved to:[/bold green] {output}")
+
+    if results.get("regressed"):
+        console.print("\n[red]❌ Retrieval regressed[/red]\n")
+        if fail_on_regression:
+            sys.exit(1)
+    console.print()
+
+
+def _refine_within_budget(questions, transformer, threshold, max_iterations, time_budget, stats_file):
+    """Anytime refinement: highest expected gain per cost first, until the budget is spent"""
+
+    stats = StrategyStats.load(stats_file) if stats_file else StrategyStats()
+    stats.seed_from_history(questions)
+
+    validator = QualityValidator(threshold=threshold)
+    scheduler = RefinementScheduler(transformer, validator, stats)
+
+    with console.status(f"[bold green]Refining worst questions first ({time_budget:.0f}s budget)...",
+                        spinner="dots"):
+        results = scheduler.run(questions, time_budget, threshold=threshold, max_iterations=max_iterations)
+
+    if results["timed_out"]:
+        console.print(f"[yellow]⏱  Time budget reached: {results['pending']} questions left for the next run[/yellow]")
+
+    if stats_file:
+        stats.save(stats_file)
+
+    return results["transformed"]
+
+
 @cli.command()
 @click.argument('original_file', type=click.Path(exists=True))
 @click.argument('refined_file', type=click.Path(exists=True), required=False)
@@ -14,6 +14,19 @@ from .transformers import QuestionTransformer
 from .validators import QualityValidator
 from .rag_optimizer import RAGOptimizer
 from .reporters import ReportGenerator
+from .parallel import ParallelTransformEngine
+from .dedup import QuestionDeduplicator
+from .scheduler import RefinementScheduler, StrategyStats
+from .stats import BatchAggregator
+from .sampling import StratifiedSampler
+from .keywords import KeywordEngine
+from .minhash import NearDuplicateDetector, MinHashIndex
+from .search_index import InvertedIndex
+from .benchmark import RetrievalBenchmark
+from .embeddings import SemanticIndex
+from .vocabulary import KeywordVocabulary
+from .prerequisites import PrerequisiteGraph
+from .code_structure import StructuralFingerprinter
 
 __all__ = [
     "QuestionParser",
@@ -22,4 +35,19 @@ __all__ = [
     "QualityValidator",
     "RAGOptimizer",
     "ReportGenerator",
+    "ParallelTransformEngine",
+    "QuestionDeduplicator",
+    "RefinementScheduler",
+    "StrategyStats",
+    "BatchAggregator",
+    "StratifiedSampler",
+    "KeywordEngine",
+    "NearDuplicateDetector",
+    "MinHashIndex",
+    "InvertedIndex",
+    "RetrievalBenchmark",
+    "SemanticIndex",
+    "KeywordVocabulary",
+    "PrerequisiteGraph",
+    "StructuralFingerprinter",
 ]
@@ -5,18 +5,145 @@ v2.0: Enhanced with academic + industry standards
 """
 
 import re
-from typing import Dict, List, Tuple
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, NamedTuple, Optional, Pattern, Sequence, Tuple
 import yaml
 from pathlib import Path
-from .parser import Question
+from .parser import Question, QuestionParser
+from .vocabulary import KeywordVocabulary
+from .prerequisites import PrerequisiteGraph
 
 # Bloom's taxonomy hierarchy for construct validity checks
 BLOOM_LEVELS = ["remember", "understand", "apply", "analyze", "evaluate", "create"]
 
+# Scoring criteria, in the order they appear in score reports
+CRITERIA = (
+    "adult_learning", "people_first", "blooms", "practical",
+    "rag", "construct_validity", "cognitive_depth"
+)
+
+# Question fields read by the scoring functions (also the default column
+# order for tuple rows passed to analyze_records)
+RECORD_FIELDS = (
+    "id", "topic", "question", "style", "difficulty", "subtopics", "keywords",
+    "prerequisites", "bloom_level", "duplicates_check", "language", "code_context"
+)
+
+_LIST_FIELDS = {"subtopics", "keywords", "prerequisites"}
+
+# Fields that determine a question's scores (everything scored except id)
+SCORING_FIELDS = RECORD_FIELDS[1:]
+
+# Language whose pack is used when a question's language has none
+DEFAULT_LANGUAGE = "en"
+
+# English vocabularies used when config.yaml has no language_packs.en
+_BUILTIN_PACK = {
+    "gendered_terms": ["he ", "she ", "his ", "her ", "him "],
+    "negative_terms": ["don't you know", "obviously", "simply", "just"],
+    "question_starters": ["what", "how", "why", "when", "which", "explain", "describe"],
+}
+
+# Matches nothing; stands in for empty vocabularies
+_NEVER = re.compile(r'(?!)')
+
+
+def _compile_terms(terms: Iterable[str]) -> Pattern:
+    """Compile substring terms into one alternation (same semantics as `any(t in text)`)"""
+    terms = [t for t in terms if t]
+    if not terms:
+        return _NEVER
+    # Longest first so overlapping terms don't shadow each other
+    return re.compile('|'.join(re.escape(t) for t in sorted(terms, key=len, reverse=True)))
+
+
+@dataclass(frozen=True)
+class PatternPack:
+    """Compiled per-language vocabularies used by the scorers"""
+    language: str
+    gendered_terms: Pattern
+    negative_terms: Pattern
+    question_starters: Tuple[str, ...]
+    facets: Tuple[Tuple[str, Pattern, float], ...]  # (name, pattern, weight)
+
+
+def scoring_key(question: Question) -> Tuple:
+    """Hashable key over the fields that determine a question's scores
+
+    Questions with equal keys always get equal scores.
+    """
+    key = []
+    for name in SCORING_FIELDS:
+        value = getattr(question, name)
+        key.append(tuple(value) if name in _LIST_FIELDS else value)
+    return tuple(key)
+
+
+def duplicate_key(question: Question, include_topic: bool = False,
+                  normalize_whitespace: bool = False) -> Tuple:
+    """Content key used to detect duplicate questions
+
+    Like scoring_key, but with the topic left out unless `include_topic` is
+    set (the scorers never read the topic; some transformation strategies
+    do). Questions with equal keys get equal scores and transformations.
+    `normalize_whitespace` also collapses whitespace in the question text;
+    the scorers read the exact text, so that is only for reporting.
+    """
+    key = list(scoring_key(question))
+    if normalize_whitespace:
+        key[SCORING_FIELDS.index("question")] = " ".join(question.question.split())
+    if not include_topic:
+        del key[SCORING_FIELDS.index("topic")]
+    return tuple(key)
+
+
+class RecordScores(NamedTuple):
+    """Scores for a raw record, without building a Question"""
+    id: str
+    adult_learning: float
+    people_first: float
+    blooms: float
+    practical: float
+    rag: float
+    construct_validity: float
+    cognitive_depth: float
+    overall: float
+
+
+class _RecordView:
+    """Read-only attribute view over a raw row, enough for the scorers"""
+
+    __slots__ = RECORD_FIELDS
+
+    @classmethod
+    def from_mapping(cls, row: Mapping[str, Any]) -> "_RecordView":
+        QuestionParser.check_required(row)
+        view = cls.__new__(cls)
+        get = row.get
+        for name in RECORD_FIELDS:
+            setattr(view, name, get(name))
+        # Same aliases and defaults as QuestionParser._dict_to_question
+        if view.bloom_level is None:
+            view.bloom_level = get('bloom')
+        if view.language is None:
+            view.language = "en"
+        for name in _LIST_FIELDS:
+            if getattr(view, name) is None:
+                setattr(view, name, [])
+        return view
+
+    @classmethod
+    def from_row(cls, row: Sequence[Any], columns: Sequence[str]) -> "_RecordView":
+        return cls.from_mapping(dict(zip(columns, row)))
+
 
 class QuestionAnalyzer:
     """Analyze and score questions against quality criteria"""
 
+    # Entries kept by analyze_cached (least recently used are evicted)
+    SCORE_CACHE_SIZE = 4096
+
     def __init__(self, config_path: str = "config.yaml"):
         """Load configuration"""
         with open(config_path, 'r') as f:
@@ -29,18 +156,76 @@ class QuestionAnalyzer:
         self.diverse_names = self.config['templates']['diverse_names']
         self.realistic_vars = self.config['templates']['realistic_variables']
 
-    def analyze(self, question: Question) -> Dict[str, float]:
+        # Language packs are compiled on first use (see pattern_pack)
+        self.language_packs = self.config.get('language_packs', {})
+        self._packs: Dict[str, PatternPack] = {}
+        self._score_cache: "OrderedDict[Tuple, Dict[str, float]]" = OrderedDict()
+
+        # Keyword document frequencies for the RAG criterion (rag.vocabulary.path)
+        self.vocabulary: Optional[KeywordVocabulary] = None
+        self._vocabulary_version = None
+        if self.config.get('rag', {}).get('vocabulary', {}).get('path'):
+            self.vocabulary = KeywordVocabulary.from_config(config_path)
+
+        # Bank the prerequisites are resolved against (set_prerequisite_graph)
+        self.prerequisite_graph: Optional[PrerequisiteGraph] = None
+
+    def set_vocabulary(self, vocabulary: Optional[KeywordVocabulary]):
+        """Score keyword distinctiveness against `vocabulary` (None: raw keyword counts)"""
+        self.vocabulary = vocabulary
+        self._score_cache.clear()
+
+    def set_prerequisite_graph(self, graph: Optional[PrerequisiteGraph]):
+        """Credit only prerequisites found in `graph` (None: any listed prerequisite)"""
+        self.prerequisite_graph = graph
+        self._score_cache.clear()
+
+    def pattern_pack(self, language: Optional[str]) -> PatternPack:
+        """Get the compiled pattern pack for a language, compiling it on first use
+
+        Languages without a configured pack share the English pack, which
+        falls back to built-in vocabularies when it is not configured either.
+        """
+        language = language or DEFAULT_LANGUAGE
+        pack = self._packs.get(language)
+        if pack is None:
+            if language in self.language_packs:
+                pack = self._compile_pack(language)
+            else:
+                pack = self._packs.get(DEFAULT_LANGUAGE) or self._compile_pack(DEFAULT_LANGUAGE)
+                self._packs[DEFAULT_LANGUAGE] = pack
+            self._packs[language] = pack
+        return pack
+
+    def _compile_pack(self, language: str) -> PatternPack:
+        """Compile one language's vocabularies from config"""
+        spec = self.language_packs.get(language)
+        if spec is None and language == DEFAULT_LANGUAGE:
+            spec = _BUILTIN_PACK
+        spec = spec or {}
+
+        # Facets default to the cognitive_depth section (English)
+        six_facets = spec.get('six_facets')
+        if six_facets is None:
+            six_facets = self.config.get('cognitive_depth', {}).get('six_facets', {})
+
+        facets = tuple(
+            (name, _compile_terms(facet.get('patterns', [])), facet.get('weight', 1.0))
+            for name, facet in six_facets.items()
+        )
+
+        return PatternPack(
+            language=language,
+            gendered_terms=_compile_terms(spec.get('gendered_terms', [])),
+            negative_terms=_compile_terms(spec.get('negative_terms', [])),
+            question_starters=tuple(spec.get('question_starters', [])),
+            facets=facets,
+        )
+
+    def analyze(self, question: Question, pack: Optional[PatternPack] = None) -> Dict[str, float]:
         """Analyze question and return scores for each criterion (v2.0 - 7 criteria)"""
 
-        scores = {
-            "adult_learning": self._score_adult_learning(question),
-            "people_first": self._score_people_first(question),
-            "blooms": self._score_blooms_alignment(question),
-            "practical": self._score_practical_application(question),
-            "rag": self._score_rag_optimization(question),
-            "construct_validity": self._score_construct_validity(question),
-            "cognitive_depth": self._score_cognitive_depth(question)
-        }
+        scores = dict(zip(CRITERIA, self._criterion_scores(question, pack)))
 
         # Calculate weighted overall score
         overall = sum(scores[k] * self.weights[k] for k in scores.keys())
@@ -48,6 +233,107 @@ class QuestionAnalyzer:
 
         return scores
 
+    def analyze_cached(self, question: Question) -> Dict[str, float]:
+        """Analyze with an LRU cache keyed on scoring_key
+
+        Used when the same content is scored repeatedly (e.g. trial
+        transformations). Returns a fresh dict the caller may modify.
+        """
+        key = scoring_key(question)
+        cache = self._score_cache
+
+        # RAG scores depend on the vocabulary, which may change between calls
+        version = self.vocabulary.version if self.vocabulary is not None else None
+        if version != self._vocabulary_version:
+            cache.clear()
+            self._vocabulary_version = version
+
+        scores = cache.get(key)
+        if scores is None:
+            scores = self.analyze(question)
+            cache[key] = scores
+            if len(cache) > self.SCORE_CACHE_SIZE:
+                cache.popitem(last=False)
+        else:
+            cache.move_to_end(key)
+
+        return dict(scores)
+
+    def analyze_batch(self, questions: List[Question], dedupe: bool = False) -> List[Dict[str, float]]:
+        """Analyze many questions, grouped by language so each group uses one pack
+
+        With `dedupe`, questions sharing a duplicate_key are scored once and
+        the scores copied to every occurrence.
+        Returns scores in input order.
+        """
+        by_language: Dict[str, List[int]] = {}
+        for i, q in enumerate(questions):
+            by_language.setdefault(q.language or DEFAULT_LANGUAGE, []).append(i)
+
+        results: List[Dict[str, float]] = [None] * len(questions)
+        for language, indices in by_language.items():
+            pack = self.pattern_pack(language)
+            seen: Dict[Tuple, Dict[str, float]] = {}
+
+            for i in indices:
+                if not dedupe:
+                    results[i] = self.analyze(questions[i], pack)
+                    continue
+
+                key = duplicate_key(questions[i])
+                scores = seen.get(key)
+                if scores is None:
+                    scores = seen[key] = self.analyze(questions[i], pack)
+                results[i] = dict(scores)
+
+        return results
+
+    def analyze_record(self, record: Mapping[str, Any]) -> RecordScores:
+        """Score a raw dict row (e.g. a database record) directly
+
+        Only the required fields are checked (ValueError, as in
+        QuestionParser); other validation and Question construction are
+        skipped. Field aliases and defaults match _dict_to_question.
+        """
+        return self._score_view(_RecordView.from_mapping(record))
+
+    def analyze_records(self, records: Iterable[Any],
+                        columns: Optional[Sequence[str]] = None) -> Iterator[RecordScores]:
+        """Score raw rows lazily
+
+        Rows are dicts, or tuples in `columns` order (defaults to RECORD_FIELDS).
+        """
+        if columns is None:
+            columns = RECORD_FIELDS
+
+        for record in records:
+            if isinstance(record, Mapping):
+                view = _RecordView.from_mapping(record)
+            else:
+                view = _RecordView.from_row(record, columns)
+            yield self._score_view(view)
+
+    def _score_view(self, view: "_RecordView") -> RecordScores:
+        """Score a record view into a RecordScores tuple"""
+        values = self._criterion_scores(view)
+        overall = sum(value * self.weights[k] for k, value in zip(CRITERIA, values))
+        return RecordScores(view.id, *values, round(overall, 2))
+
+    def _criterion_scores(self, q: Question, pack: Optional[PatternPack] = None) -> Tuple[float, ...]:
+        """Score every criterion, in CRITERIA order"""
+        if pack is None:
+            pack = self.pattern_pack(q.language)
+
+        return (
+            self._score_adult_learning(q),
+            self._score_people_first(q, pack),
+            self._score_blooms_alignment(q),
+            self._score_practical_application(q),
+            self._score_rag_optimization(q, pack),
+            self._score_construct_validity(q),
+            self._score_cognitive_depth(q, pack),
+        )
+
     def _score_adult_learning(self, q: Question) -> float:
         """Score based on adult learning principles"""
         score = 3.0  # Base score
@@ -96,7 +382,7 @@ class QuestionAnalyzer:
 
         return max(1.0, min(5.0, score))
 
-    def _score_people_first(self, q: Question) -> float:
+    def _score_people_first(self, q: Question, pack: PatternPack) -> float:
         """Score based on people-first principles"""
         score = 3.5  # Base score
 
@@ -114,8 +400,7 @@ class QuestionAnalyzer:
             score -= 0.4
 
         # Inclusive language check
-        gendered_terms = ["he ", "she ", "his ", "her ", "him "]
-        if any(term in text_lower for term in gendered_terms):
+        if pack.gendered_terms.search(text_lower):
             score -= 0.5  # Penalty for gendered examples
 
         # Cognitive load appropriateness
@@ -133,8 +418,7 @@ class QuestionAnalyzer:
             score += 0.3
 
         # Negative framing (penalty)
-        negative_terms = ["don't you know", "obviously", "simply", "just"]
-        if any(term in text_lower for term in negative_terms):
+        if pack.negative_terms.search(text_lower):
             score -= 0.6
 
         # Jargon without context (penalty)
@@ -241,13 +525,18 @@ class QuestionAnalyzer:
 
         return max(1.0, min(5.0, score))
 
-    def _score_rag_optimization(self, q: Question) -> float:
+    def _score_rag_optimization(self, q: Question, pack: PatternPack) -> float:
         """Score based on RAG (keyword + semantic) search optimization"""
         score = 3.0  # Base score
 
         # Keyword search optimization
         keyword_count = len(q.keywords) if q.keywords else 0
 
+        vocabulary = self.vocabulary
+        if keyword_count and vocabulary is not None and vocabulary.active:
+            # Keywords most of the bank shares don't help retrieval
+            keyword_count = vocabulary.distinct_count(q.keywords)
+
         if keyword_count >= 7:
             score += 1.0
         elif keyword_count >= 5:
@@ -279,12 +568,15 @@ class QuestionAnalyzer:
                 score -= 0.4  # Too short
 
         # Natural language phrasing
-        question_starters = ["what", "how", "why", "when", "which", "explain", "describe"]
-        if any(q.question.lower().startswith(starter) for starter in question_starters):
+        if q.question.lower().startswith(pack.question_starters):
             score += 0.5
 
         # Relationship mapping
-        if q.prerequisites and len(q.prerequisites) > 0:
+        graph = self.prerequisite_graph
+        if graph is not None:
+            if any(ref in graph for ref in q.prerequisites or []):
+                score += 0.4
+        elif q.prerequisites and len(q.prerequisites) > 0:
             score += 0.4
 
         if q.subtopics and len(q.subtopics) > 1:
@@ -357,7 +649,7 @@ class QuestionAnalyzer:
 
         return max(1.0, min(5.0, score))
 
-    def _score_cognitive_depth(self, q: Question) -> float:
+    def _score_cognitive_depth(self, q: Question, pack: PatternPack) -> float:
         """Score cognitive depth using Six Facets of Understanding
 
         Based on Wiggins & McTighe framework:
@@ -374,21 +666,12 @@ class QuestionAnalyzer:
 
         text_all = f"{q.question} {q.code_context or ''}".lower()
 
-        # Load Six Facets configuration
-        six_facets = self.config.get('cognitive_depth', {}).get('six_facets', {})
-
         facets_detected = 0
         facet_details = []
 
-        # Check each facet
-        for facet_name, facet_config in six_facets.items():
-            patterns = facet_config.get('patterns', [])
-            weight = facet_config.get('weight', 1.0)
-
-            # Check if any pattern matches
-            facet_found = any(pattern in text_all for pattern in patterns)
-
-            if facet_found:
+        # Check each facet (compiled per language in the pattern pack)
+        for facet_name, pattern, weight in pack.facets:
+            if pattern.search(text_all):
                 facets_detected += weight
                 facet_details.append(facet_name)
 
@@ -0,0 +1,148 @@
+"""
+Retrieval Benchmark - Measure recall@k, MRR and latency on a local index
+"""
+
+import time
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence
+
+from .parser import Question
+from .keywords import KeywordEngine
+from .search_index import InvertedIndex
+from .stats import QuantileSketch
+
+
+class Probe(NamedTuple):
+    """A query expected to retrieve one question"""
+    query: str
+    target: str   # question id
+    kind: str     # "subtopic", "facet" or "text"
+
+
+class RetrievalBenchmark:
+    """Known-item retrieval benchmark over a question bank
+
+    Probes are generated once, from the bank as it stands before any
+    changes, and each should find the question it came from:
+
+    - "subtopic": "topic subtopic" queries
+    - "facet": subtopic, answer type and topic, one per question. These
+      are fields keyword optimization never writes, so the before/after
+      delta credits keywords that genuinely connect them to the question.
+    - "text": the facet query plus the two most discriminative terms of
+      the original text. RAGOptimizer writes those same terms into the
+      keywords, so this set shows how much injected terms help, and is
+      reported separately (by_kind) rather than read as held-out recall.
+
+    Running the same probes against indexes of the bank before and after
+    RAGOptimizer/QuestionTransformer changes makes the effect measurable.
+    """
+
+    # Text terms per "text" probe
+    TEXT_TERMS = 2
+
+    def __init__(self, ks: Sequence[int] = (1, 5, 10), max_subtopic_probes: int = 2,
+                 k1: float = 1.5, b: float = 0.75):
+        self.ks = tuple(sorted(ks))
+        self.max_subtopic_probes = max_subtopic_probes
+        self.k1 = k1
+        self.b = b
+
+    def generate_probes(self, questions: List[Question]) -> List[Probe]:
+        """Probe queries for every question, in bank order"""
+        top_terms = KeywordEngine().fit(questions).top_terms(self.TEXT_TERMS)
+        probes = []
+
+        for q, terms in zip(questions, top_terms):
+            for subtopic in (q.subtopics or [])[:self.max_subtopic_probes]:
+                probes.append(Probe(f"{q.topic} {subtopic}", q.id, "subtopic"))
+
+            facet = [(q.subtopics or [q.topic])[0]]
+            if q.answer_type:
+                facet.append(q.answer_type.replace('_', ' '))
+            if q.subtopics:
+                facet.append(q.topic)
+            probes.append(Probe(" ".join(facet), q.id, "facet"))
+
+            text = facet + [term for term, weight in terms]
+            probes.append(Probe(" ".join(text), q.id, "text"))
+
+        return probes
+
+    def run(self, questions: List[Question], probes: List[Probe]) -> Dict[str, Any]:
+        """
+        Index `questions` and run every probe against it
+        Returns: recall@k per k, MRR, latency (ms) and counts, overall and per probe kind
+        """
+
+        started = time.perf_counter()
+        index = InvertedIndex.build(questions, k1=self.k1, b=self.b)
+        build_sec = time.perf_counter() - started
+
+        depth = self.ks[-1]
+        groups: Dict[str, Dict[str, Any]] = {}
+        latency = QuantileSketch()
+
+        for probe in probes:
+            started = time.perf_counter()
+            results = index.search(probe.query, k=depth)
+            latency.add(1000 * (time.perf_counter() - started))
+
+            rank = next((i for i, (qid, score) in enumerate(results, 1) if qid == probe.target), None)
+            for name in ("all", probe.kind):
+                group = groups.setdefault(name, {"probes": 0, "hits": [0] * len(self.ks), "rr": 0.0})
+                group["probes"] += 1
+                if rank is not None:
+                    group["rr"] += 1 / rank
+                    for i, k in enumerate(self.ks):
+                        if rank <= k:
+                            group["hits"][i] += 1
+
+        def summarize(group: Dict[str, Any]) -> Dict[str, Any]:
+            n = group["probes"]
+            return {
+                "probes": n,
+                "recall": {f"@{k}": round(hits / n, 4) for k, hits in zip(self.ks, group["hits"])},
+                "mrr": round(group["rr"] / n, 4)
+            }
+
+        overall = summarize(groups.pop("all")) if probes else {"probes": 0, "recall": {}, "mrr": 0.0}
+        overall["by_kind"] = {name: summarize(group) for name, group in sorted(groups.items())}
+        overall["questions"] = len(questions)
+        overall["index_build_ms"] = round(1000 * build_sec, 2)
+        overall["latency_ms"] = {
+            "p50": round(latency.quantile(0.5), 4),
+            "p95": round(latency.quantile(0.95), 4)
+        }
+        return overall
+
+    def compare(self, before: List[Question], after: List[Question],
+                probes: Optional[List[Probe]] = None) -> Dict[str, Any]:
+        """
+        Run the same probes (from `before` by default) against both banks
+        Returns: {"before", "after", "delta", "regressed"}
+        """
+
+        if probes is None:
+            probes = self.generate_probes(before)
+
+        result_before = self.run(before, probes)
+        result_after = self.run(after, probes)
+
+        delta = {
+            "recall": {
+                k: round(result_after["recall"][k] - value, 4)
+                for k, value in result_before["recall"].items()
+            },
+            "mrr": round(result_after["mrr"] - result_before["mrr"], 4),
+            "by_kind": {
+                kind: {"mrr": round(result_after["by_kind"][kind]["mrr"] - group["mrr"], 4)}
+                for kind, group in result_before["by_kind"].items()
+            }
+        }
+
+        return {
+            "before": result_before,
+            "after": result_after,
+            "delta": delta,
+            "regressed": delta["mrr"] < 0 or any(v < 0 for v in delta["recall"].values())
+        }
@@ -0,0 +1,189 @@
+"""
+Code Structure - Structural fingerprints of code_context for near-duplicate snippets
+Identifiers are alpha-renamed and literals stripped, so snippets that
+differ only in variable names or values share a fingerprint.
+"""
+
+import ast
+import builtins
+import hashlib
+import io
+import keyword
+import re
+import tokenize
+from collections import OrderedDict
+from typing import Dict, FrozenSet, List, NamedTuple, Optional
+
+from .parser import Question
+
+# Names kept as-is: renaming `print` or `len` would hide real differences
+_BUILTINS = frozenset(dir(builtins))
+
+# AST fields holding identifiers that are alpha-renamed
+_IDENTIFIER_FIELDS = {
+    (ast.Name, "id"), (ast.arg, "arg"),
+    (ast.FunctionDef, "name"), (ast.AsyncFunctionDef, "name"), (ast.ClassDef, "name"),
+    (ast.ExceptHandler, "name"), (ast.Global, "names"), (ast.Nonlocal, "names"),
+}
+
+# Fields with no structural meaning
+_SKIPPED_FIELDS = {"ctx", "type_comment", "kind"}
+
+# Last-resort lexer for text tokenize rejects (e.g. unclosed brackets)
+_ROUGH_TOKEN = re.compile(r"[A-Za-z_]\w*|\d[\w.]*|'[^'\n]*'?|\"[^\"\n]*\"?|\S")
+
+
+def _digest(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=8).hexdigest()
+
+
+class Fingerprint(NamedTuple):
+    """Structure of one snippet"""
+    digest: str                    # Whole-snippet hash; equal digests = same structure
+    method: str                    # "ast", or "tokens" when the snippet does not parse
+    statements: FrozenSet[str]     # Per-statement subtree hashes ("ast" only)
+
+
+class _Renamer:
+    """Alpha-renaming: the Nth distinct identifier becomes vN"""
+
+    def __init__(self):
+        self.names: Dict[str, str] = {}
+
+    def __call__(self, name: str) -> str:
+        if name in _BUILTINS:
+            return name
+        renamed = self.names.get(name)
+        if renamed is None:
+            renamed = self.names[name] = f"v{len(self.names)}"
+        return renamed
+
+
+class StructuralFingerprinter:
+    """Fingerprint code_context by normalized AST structure
+
+    Each AST node is hashed from its type, its normalized scalar fields and
+    its children's hashes (a Merkle hash), so the root hash identifies the
+    whole snippet and every statement gets a subtree hash of its own.
+    Identifiers are renamed in order of first appearance, constants are
+    replaced by their type, and attribute and keyword-argument names are
+    kept. Snippets that are not valid Python (debug_fix questions often
+    aren't) are fingerprinted from their normalized token stream instead.
+    Results are cached per snippet content.
+    """
+
+    # Snippets kept in the fingerprint cache (least recently used are evicted)
+    CACHE_SIZE = 4096
+
+    def __init__(self):
+        self._cache: "OrderedDict[str, Fingerprint]" = OrderedDict()
+
+    def fingerprint(self, code: str) -> Fingerprint:
+        """Fingerprint of one snippet"""
+        key = hashlib.sha1(code.encode("utf-8")).hexdigest()
+        cache = self._cache
+
+        result = cache.get(key)
+        if result is None:
+            result = self._fingerprint_ast(code) or self._fingerprint_tokens(code)
+            cache[key] = result
+            if len(cache) > self.CACHE_SIZE:
+                cache.popitem(last=False)
+        else:
+            cache.move_to_end(key)
+
+        return result
+
+    def _fingerprint_ast(self, code: str) -> Optional[Fingerprint]:
+        try:
+            tree = ast.parse(code)
+        except (SyntaxError, ValueError):
+            return None
+
+        def node_hash(node: ast.AST, rename: _Renamer) -> str:
+            parts = [type(node).__name__]
+            for name, value in ast.iter_fields(node):
+                if name in _SKIPPED_FIELDS:
+                    continue
+                if isinstance(value, list):
+                    items = [field_value(node, name, item, rename) for item in value]
+                    parts.append(f"{name}=[{','.join(items)}]")
+                else:
+                    parts.append(f"{name}={field_value(node, name, value, rename)}")
+            return _digest("|".join(parts))
+
+        def field_value(node: ast.AST, name: str, value, rename: _Renamer) -> str:
+            if isinstance(value, ast.AST):
+                return node_hash(value, rename)
+            if value is None:
+                return "-"
+            if isinstance(node, ast.Constant) and name == "value":
+                return type(value).__name__
+            if (type(node), name) in _IDENTIFIER_FIELDS:
+                return rename(value)
+            return repr(value)
+
+        try:
+            # Identifiers are renamed snippet-wide for the whole-snippet digest,
+            # but afresh per statement, so a statement hashes the same wherever
+            # its names first appear
+            digest = node_hash(tree, _Renamer())
+            statements = {node_hash(node, _Renamer()) for node in ast.walk(tree) if isinstance(node, ast.stmt)}
+        except RecursionError:
+            return None
+        return Fingerprint(digest, "ast", frozenset(statements))
+
+    def _fingerprint_tokens(self, code: str) -> Fingerprint:
+        rename = _Renamer()
+        normalized = []
+        for kind, text in self._tokens(code):
+            if kind == tokenize.NAME and not keyword.iskeyword(text):
+                normalized.append(rename(text))
+            elif kind in (tokenize.NUMBER, tokenize.STRING):
+                normalized.append("NUMBER" if kind == tokenize.NUMBER else "STRING")
+            else:
+                normalized.append(text)
+        return Fingerprint(_digest(" ".join(normalized)), "tokens", frozenset())
+
+    @staticmethod
+    def _tokens(code: str):
+        """(token type, text) pairs without comments or layout tokens"""
+        skipped = {tokenize.COMMENT, tokenize.NL, tokenize.NEWLINE, tokenize.INDENT,
+                   tokenize.DEDENT, tokenize.ENDMARKER, tokenize.ENCODING}
+        try:
+            tokens = [(t.type, t.string) for t in tokenize.generate_tokens(io.StringIO(code).readline)
+                      if t.type not in skipped]
+        except (tokenize.TokenError, IndentationError, SyntaxError):
+            tokens = []
+            for text in _ROUGH_TOKEN.findall(re.sub(r"#[^\n]*", "", code)):
+                if text[0].isalpha() or text[0] == "_":
+                    tokens.append((tokenize.NAME, text))
+                elif text[0].isdigit():
+                    tokens.append((tokenize.NUMBER, text))
+                elif text[0] in "'\"":
+                    tokens.append((tokenize.STRING, text))
+                else:
+                    tokens.append((tokenize.OP, text))
+        return tokens
+
+    @staticmethod
+    def similarity(a: Fingerprint, b: Fingerprint) -> float:
+        """Share of statement structures two snippets have in common (Jaccard)"""
+        if a.digest == b.digest:
+            return 1.0
+        union = a.statements | b.statements
+        return len(a.statements & b.statements) / len(union) if union else 0.0
+
+    def group(self, questions: List[Question]) -> List[List[int]]:
+        """
+        Indices of questions whose code_context has the same structure
+        Returns: clusters of 2+ indices in first-occurrence order
+        (questions without code_context are never grouped)
+        """
+
+        clusters: Dict[str, List[int]] = {}
+        for i, q in enumerate(questions):
+            if q.code_context and q.code_context.strip():
+                clusters.setdefault(self.fingerprint(q.code_context).digest, []).append(i)
+
+        return [members for members in clusters.values() if len(members) > 1]
@@ -0,0 +1,103 @@
+"""
+Question Deduplicator - Process each distinct question once
+"""
+
+from dataclasses import fields
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .parser import Question
+from .analyzer import SCORING_FIELDS, duplicate_key
+
+# refine_one result: (refined_question, strategies, improvement), or None if already passing
+Outcome = Optional[Tuple[Question, List[str], float]]
+
+# Fields a refinement may change, copied from a group's representative to its duplicates
+_REFINED_FIELDS = tuple(name for name in SCORING_FIELDS if name != "topic") + ("quality_scores", "last_refined")
+
+
+class QuestionDeduplicator:
+    """Group duplicate questions so each is scored and transformed once"""
+
+    def __init__(self, include_topic: bool = True, normalize_whitespace: bool = False):
+        """
+        `include_topic` keeps questions from different topics apart; needed
+        when transforming (strategies read the topic), not when scoring.
+        `normalize_whitespace` also groups questions whose text differs only
+        in whitespace; their scores can differ, so use it for reporting only.
+        """
+        self.include_topic = include_topic
+        self.normalize_whitespace = normalize_whitespace
+
+    def group(self, questions: List[Question]) -> List[List[int]]:
+        """
+        Group question indices by duplicate_key
+        Groups are in first-occurrence order; each group's first index is its representative.
+        """
+        groups: Dict[Tuple, List[int]] = {}
+        for i, q in enumerate(questions):
+            groups.setdefault(duplicate_key(q, self.include_topic, self.normalize_whitespace), []).append(i)
+        return list(groups.values())
+
+    @staticmethod
+    def ratio(groups: List[List[int]]) -> float:
+        """Share of questions that were duplicates (0.0 = all distinct)"""
+        total = sum(len(g) for g in groups)
+        if not total:
+            return 0.0
+        return round(1 - len(groups) / total, 4)
+
+    @staticmethod
+    def fan_out(before: Question, after: Question, target: Question) -> Question:
+        """
+        Apply the refinement that turned `before` into `after` to a duplicate
+        of `before`, keeping the duplicate's id and other metadata
+        """
+        values = {f.name: getattr(target, f.name) for f in fields(Question)}
+
+        for name in _REFINED_FIELDS:
+            if getattr(after, name) != getattr(before, name):
+                value = getattr(after, name)
+                values[name] = list(value) if isinstance(value, list) else value
+
+        new_entries = after.refinement_history[len(before.refinement_history):]
+        values["refinement_history"] = list(target.refinement_history) + [dict(e) for e in new_entries]
+        if new_entries and target.original_question is None:
+            values["original_question"] = target.question
+
+        return Question(**values)
+
+    def iter_fanned_outcomes(self, questions: List[Question], groups: List[List[int]],
+                             unique_outcomes: Iterable[Outcome]) -> Iterator[Tuple[int, Outcome]]:
+        """
+        Expand outcomes for group representatives (in group order) to every
+        question, yielding (index, outcome) in input order
+        """
+        representative = [0] * len(questions)
+        remaining: Dict[int, int] = {}
+        for group in groups:
+            for i in group:
+                representative[i] = group[0]
+            remaining[group[0]] = len(group)
+
+        unique_outcomes = iter(unique_outcomes)
+        # Representative index -> (question before refinement, outcome)
+        pending: Dict[int, Tuple[Question, Outcome]] = {}
+
+        for i, q in enumerate(questions):
+            rep = representative[i]
+
+            if rep == i:
+                outcome = next(unique_outcomes)
+                pending[rep] = (q, outcome)
+            else:
+                before, outcome = pending[rep]
+                if outcome is not None:
+                    refined, strategies, improvement = outcome
+                    outcome = (self.fan_out(before, refined, q), strategies, improvement)
+
+            # Drop a representative's outcome once its last duplicate is served
+            remaining[rep] -= 1
+            if not remaining[rep]:
+                del pending[rep]
+
+            yield i, outcome
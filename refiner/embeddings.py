@@ -0,0 +1,293 @@
+"""
+Semantic Index - Hashed character n-gram vectors with a random-projection ANN index
+Local and deterministic: no model download, no network.
+"""
+
+import re
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import yaml
+
+from .parser import Question
+from .incremental import GrowableArray, IncrementalIndex, UnionFind
+
+_SPACES = re.compile(r'\s+')
+
+
+class HashingVectorizer:
+    """Feature-hashed character n-grams, L2-normalized float32 vectors
+
+    Texts are lowercased, whitespace-collapsed and space-padded; every
+    n-gram (ngram_min..ngram_max chars) is hashed to one of `dim` columns
+    with a hash-derived sign. Hashing runs over whole chunks of texts at
+    once with uint32 arithmetic, so there is no per-n-gram Python work.
+    """
+
+    def __init__(self, dim: int = 512, ngram_min: int = 3, ngram_max: int = 5):
+        self.dim = dim
+        self.ngram_min = ngram_min
+        self.ngram_max = ngram_max
+
+    def transform(self, texts: List[str], chunk_size: int = 2048) -> np.ndarray:
+        """One row per text"""
+        result = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for start in range(0, len(texts), chunk_size):
+            result[start:start + chunk_size] = self._transform_chunk(texts[start:start + chunk_size])
+        return result
+
+    def _transform_chunk(self, texts: List[str]) -> np.ndarray:
+        padded = [" " + _SPACES.sub(" ", (t or "").lower()).strip() + " " for t in texts]
+        codes = np.frombuffer("".join(padded).encode("utf-32-le"), dtype=np.uint32)
+        lengths = np.fromiter((len(p) for p in padded), dtype=np.int64, count=len(padded))
+        doc_of = np.repeat(np.arange(len(padded)), lengths)
+
+        flat_parts, sign_parts = [], []
+        for n in range(self.ngram_min, self.ngram_max + 1):
+            count = codes.size - n + 1
+            if count <= 0:
+                continue
+            # N-grams must not cross text boundaries
+            valid = doc_of[:count] == doc_of[n - 1:]
+
+            h = np.full(count, 2166136261 ^ n, dtype=np.uint32)
+            for j in range(n):
+                h = (h ^ codes[j:j + count]) * np.uint32(16777619)
+            h ^= h >> np.uint32(15)
+            h *= np.uint32(0x2C1B3C6D)
+            h ^= h >> np.uint32(12)
+
+            h = h[valid]
+            flat_parts.append(doc_of[:count][valid] * self.dim + (h % np.uint32(self.dim)).astype(np.int64))
+            sign_parts.append(np.where(h >> np.uint32(31), -1.0, 1.0))
+
+        size = len(padded) * self.dim
+        if flat_parts:
+            counts = np.bincount(np.concatenate(flat_parts), weights=np.concatenate(sign_parts), minlength=size)
+        else:
+            counts = np.zeros(size)
+
+        vectors = counts.reshape(len(padded), self.dim).astype(np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+
+class SemanticIndex(IncrementalIndex):
+    """Approximate nearest neighbours by cosine similarity
+
+    Each of `tables` hash tables keys a vector by the signs of its
+    projections onto up to `bits` random hyperplanes: as many as keep
+    about BUCKET_SIZE documents per bucket, so buckets neither empty out
+    on small banks (missing near neighbours) nor swell on large ones. A
+    query probes its own bucket in every table plus the buckets reached
+    by flipping its `probes` least certain bits, then re-ranks the
+    candidates exactly.
+    Buckets of all tables are stored as one sorted key array (the table
+    number in the high bits), so a query finds every bucket it probes
+    with a single binary search rather than dict lookups.
+    Indexes of up to EXACT_MAX questions are scanned exactly instead.
+    Upserted questions are scanned exactly until compaction re-buckets
+    them (see IncrementalIndex).
+    """
+
+    # Below this size a full scan is as fast as probing buckets
+    EXACT_MAX = 4096
+    # Documents per bucket the number of hyperplanes per table aims for
+    BUCKET_SIZE = 4
+
+    def __init__(self, dim: int = 512, ngram_min: int = 3, ngram_max: int = 5,
+                 tables: int = 16, bits: int = 16, probes: int = 4, seed: int = 0,
+                 duplicate_threshold: float = 0.9, related_threshold: float = 0.3):
+        self.vectorizer = HashingVectorizer(dim, ngram_min, ngram_max)
+        self.duplicate_threshold = duplicate_threshold
+        self.related_threshold = related_threshold
+        self.tables = tables
+        self.bits = bits
+        self.probes = probes
+
+        rng = np.random.default_rng(seed)
+        self.planes = rng.standard_normal((tables, bits, dim)).astype(np.float32)
+        self._weights = (1 << np.arange(bits, dtype=np.int64))
+        self._key_bits = bits
+
+        self.questions: List[Question] = []
+        self.vectors = GrowableArray(np.float32, width=dim)
+        # Bank mean; hyperplanes split centered vectors, so shared n-grams
+        # ("what", "python") don't crowd everything into a few buckets
+        self.center = np.zeros(dim, dtype=np.float32)
+        self._sorted_keys = np.zeros(0, dtype=np.int64)
+        self._order = np.zeros(0, dtype=np.int64)
+        self._init_incremental()
+
+    def __len__(self) -> int:
+        return self.live_count
+
+    @classmethod
+    def from_config(cls, config_path: str = "config.yaml") -> "SemanticIndex":
+        """Index with settings from the config's semantic section"""
+        with open(config_path, 'r') as f:
+            settings = yaml.safe_load(f).get('semantic', {})
+        return cls(**settings)
+
+    @staticmethod
+    def document_text(question: Question) -> str:
+        """Text a question is embedded from"""
+        return question.question + (" " + question.code_context if question.code_context else "")
+
+    def build(self, questions: Iterable[Question]) -> "SemanticIndex":
+        """Embed and index `questions` (replaces any previous contents)"""
+        questions = list(questions)
+        vectors = self.vectorizer.transform([self.document_text(q) for q in questions])
+        with self._lock:
+            self._install(self._bucketed(questions, vectors))
+        return self
+
+    def _bucketed(self, questions: List[Question], vectors: np.ndarray) -> Dict[str, Any]:
+        """Index state for `questions` with all documents bucketed"""
+        center = vectors.mean(axis=0) if len(vectors) else np.zeros(self.vectorizer.dim, dtype=np.float32)
+        key_bits = int(np.clip(round(np.log2(max(len(vectors), 1) / self.BUCKET_SIZE)), 1, self.bits))
+        planes = self.planes[:, :key_bits].reshape(-1, self.vectorizer.dim)
+        signs = ((vectors - center) @ planes.T > 0).reshape(len(vectors), self.tables, key_bits)
+        keys = (signs @ self._weights[:key_bits]).T + (np.arange(self.tables, dtype=np.int64) << key_bits)[:, None]
+        order = np.argsort(keys, axis=1, kind="stable")
+        return {
+            "questions": questions,
+            "vectors": vectors,
+            "center": center,
+            "key_bits": key_bits,
+            "order": order.ravel(),
+            "sorted_keys": np.take_along_axis(keys, order, axis=1).ravel(),
+        }
+
+    def _install(self, state: Dict[str, Any]):
+        self.questions = state["questions"]
+        self.vectors = GrowableArray.from_array(state["vectors"])
+        self.center = state["center"]
+        self._key_bits = state["key_bits"]
+        self._order = state["order"]
+        self._sorted_keys = state["sorted_keys"]
+        self._reset_docs([q.id for q in self.questions])
+
+    def _add_document(self, doc: int, question: Question):
+        self.questions.append(question)
+        self.vectors.append(self.vectorizer.transform([self.document_text(question)])[0])
+
+    def _snapshot(self) -> Dict[str, Any]:
+        return {
+            "questions": list(self.questions),
+            "vectors": self.vectors.data,
+            "live": self.live.data.copy(),
+        }
+
+    def _compacted(self, snapshot: Dict[str, Any]) -> Dict[str, Any]:
+        live = snapshot["live"]
+        questions = [q for q, alive in zip(snapshot["questions"], live.tolist()) if alive]
+        return self._bucketed(questions, snapshot["vectors"][live])
+
+    def _candidates(self, vector: np.ndarray) -> np.ndarray:
+        weights = self._weights[:self._key_bits]
+        projections = self.planes[:, :self._key_bits] @ (vector - self.center)
+        keys = (projections > 0) @ weights + (np.arange(self.tables, dtype=np.int64) << self._key_bits)
+
+        probe_keys = [keys]
+        if self.probes:
+            # Flip the bits whose projections were closest to the hyperplane
+            uncertain = np.argsort(np.abs(projections), axis=1)[:, :self.probes]
+            for p in range(uncertain.shape[1]):
+                probe_keys.append(keys ^ weights[uncertain[:, p]])
+
+        probe_keys = np.concatenate(probe_keys)
+        lo = np.searchsorted(self._sorted_keys, probe_keys)
+        counts = np.searchsorted(self._sorted_keys, probe_keys + 1) - lo
+        total = int(counts.sum())
+        parts = [self._order[np.repeat(lo - np.cumsum(counts) + counts, counts) + np.arange(total)]]
+
+        # Documents added since the last compaction are not bucketed yet
+        if self._merged < len(self.doc_ids):
+            parts.append(np.arange(self._merged, len(self.doc_ids)))
+
+        return np.unique(np.concatenate(parts))
+
+    def query_vector(self, vector: np.ndarray, k: int = 10,
+                     exclude: Optional[int] = None) -> List[Tuple[int, float]]:
+        """
+        Approximate top-k by cosine similarity
+        Returns: [(doc number, similarity)] best first
+        """
+        with self._lock:
+            if len(self.doc_ids) <= self.EXACT_MAX:
+                candidates = np.arange(len(self.doc_ids))
+            else:
+                candidates = self._candidates(vector)
+            candidates = self.live_docs(candidates)
+            if exclude is not None:
+                candidates = candidates[candidates != exclude]
+            if not candidates.size or k <= 0:
+                return []
+
+            sims = self.vectors.data[candidates] @ vector
+        if candidates.size > k:
+            top = np.argpartition(-sims, k - 1)[:k]
+            candidates, sims = candidates[top], sims[top]
+        order = np.lexsort((candidates, -sims))
+        return [(int(candidates[i]), round(float(sims[i]), 4)) for i in order]
+
+    def search(self, text: str, k: int = 10) -> List[Tuple[str, float]]:
+        """Questions most similar to free text: [(question_id, similarity)]"""
+        vector = self.vectorizer.transform([text])[0]
+        return [(self.doc_ids[d], s) for d, s in self.query_vector(vector, k)]
+
+    def similar(self, question: Question, k: int = 10) -> List[Tuple[str, float]]:
+        """Questions most similar to `question`, excluding itself: [(question_id, similarity)]"""
+        return [(self.doc_ids[d], s) for d, s in self._similar_docs(question, k)]
+
+    def _similar_docs(self, question: Question, k: int) -> List[Tuple[int, float]]:
+        # The indexed document with the same id is `question` itself; its
+        # stored vector is reused only while the embedded text still matches
+        text = self.document_text(question)
+        with self._lock:
+            doc = self._doc_of_id.get(question.id)
+            vector = None
+            if doc is not None and self.document_text(self.questions[doc]) == text:
+                vector = self.vectors.data[doc]
+        if vector is None:
+            vector = self.vectorizer.transform([text])[0]
+        return self.query_vector(vector, k, exclude=doc)
+
+    def related_concepts(self, question: Question, limit: int = 5, k: int = 10) -> List[str]:
+        """
+        Subtopics and keywords that `question` lacks, taken from questions
+        at least `related_threshold` similar and weighted by similarity
+        """
+        own = {c.lower() for c in (question.subtopics or []) + (question.keywords or [])}
+        weights: Dict[str, float] = {}
+
+        for doc, sim in self._similar_docs(question, k):
+            if sim < self.related_threshold:
+                break
+            other = self.questions[doc]
+            for concept in (other.subtopics or []) + (other.keywords or []):
+                if concept.lower() not in own:
+                    weights[concept] = weights.get(concept, 0.0) + sim
+
+        ranked = sorted(weights.items(), key=lambda item: -item[1])
+        return [concept for concept, weight in ranked[:limit]]
+
+    def near_duplicates(self, threshold: Optional[float] = None, k: int = 10) -> List[List[int]]:
+        """Clusters (doc numbers, 2+ each) of questions with cosine similarity ≥ threshold"""
+        if threshold is None:
+            threshold = self.duplicate_threshold
+        with self._lock:
+            docs = self.live_docs(np.arange(len(self.doc_ids))).tolist()
+            union = UnionFind(len(self.doc_ids))
+            for doc in docs:
+                for other, sim in self.query_vector(self.vectors.data[doc], k, exclude=doc):
+                    if sim < threshold:
+                        break
+                    union.union(doc, other)
+
+        clusters: Dict[int, List[int]] = {}
+        for doc in docs:
+            clusters.setdefault(union.find(doc), []).append(doc)
+        return [members for members in clusters.values() if len(members) > 1]
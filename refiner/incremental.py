@@ -0,0 +1,207 @@
+"""
+Incremental Indexes - Upsert/delete by question id with tombstones and background compaction
+"""
+
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .parser import Question
+
+
+class GrowableArray:
+    """Append-only numpy array with amortized O(1) appends
+
+    Appends never modify existing rows, so a `data` view taken earlier
+    stays valid (and unchanged) while the array keeps growing.
+    """
+
+    def __init__(self, dtype, width: Optional[int] = None, capacity: int = 16):
+        self.width = width
+        shape = (capacity,) if width is None else (capacity, width)
+        self._buffer = np.zeros(shape, dtype=dtype)
+        self._size = 0
+
+    @classmethod
+    def from_array(cls, array: np.ndarray) -> "GrowableArray":
+        grown = cls(array.dtype, array.shape[1] if array.ndim == 2 else None, capacity=max(16, len(array)))
+        grown._buffer[:len(array)] = array
+        grown._size = len(array)
+        return grown
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def data(self) -> np.ndarray:
+        return self._buffer[:self._size]
+
+    def append(self, value):
+        if self._size == len(self._buffer):
+            grown = np.zeros((2 * len(self._buffer),) + self._buffer.shape[1:], dtype=self._buffer.dtype)
+            grown[:self._size] = self._buffer[:self._size]
+            self._buffer = grown
+        self._buffer[self._size] = value
+        self._size += 1
+
+
+class UnionFind:
+    """Disjoint sets over 0..n-1 (path halving); the lower index stays a cluster's root"""
+
+    def __init__(self, n: int):
+        self.parent = list(range(n))
+
+    def find(self, i: int) -> int:
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, i: int, j: int):
+        ri, rj = self.find(i), self.find(j)
+        if ri != rj:
+            # Lower index stays root, so clusters are led by first occurrence
+            self.parent[max(ri, rj)] = min(ri, rj)
+
+
+class IncrementalIndex:
+    """Base for indexes kept current as questions change
+
+    Documents are numbered in insertion order. upsert() tombstones a
+    question's previous document and appends the new one; delete() only
+    tombstones. Reads skip tombstoned documents. Once stale documents
+    (tombstones plus documents not yet merged into the main structure)
+    exceed COMPACT_RATIO of the index, compaction runs in a background
+    thread: it rebuilds from a snapshot without holding the lock, then
+    swaps the result in and replays any upserts/deletes made meanwhile.
+
+    Subclasses implement _add_document, _snapshot, _compacted and _install.
+    """
+
+    COMPACT_RATIO = 0.25
+    COMPACT_MIN = 64
+
+    def _init_incremental(self):
+        self._lock = threading.RLock()
+        self._pending: Optional[List[Tuple[str, Any]]] = None
+        self._compactor: Optional[threading.Thread] = None
+        self.background_compaction = True
+        self._reset_docs([])
+
+    def _reset_docs(self, doc_ids: List[str]):
+        """Mark `doc_ids` as the merged, all-live documents"""
+        self.doc_ids = list(doc_ids)
+        self._doc_of_id = {qid: doc for doc, qid in enumerate(self.doc_ids)}
+        self.live = GrowableArray.from_array(np.ones(len(self.doc_ids), dtype=bool))
+        self._dead = 0
+        self._merged = len(self.doc_ids)
+
+    @property
+    def live_count(self) -> int:
+        return len(self.doc_ids) - self._dead
+
+    @property
+    def stale(self) -> int:
+        """Tombstoned plus not-yet-merged documents"""
+        return self._dead + len(self.doc_ids) - self._merged
+
+    def live_docs(self, docs: np.ndarray) -> np.ndarray:
+        """`docs` without tombstoned documents"""
+        return docs[self.live.data[docs]] if self._dead and docs.size else docs
+
+    def upsert(self, question: Question):
+        """Add `question`, replacing any document with the same id"""
+        with self._lock:
+            self._upsert(question)
+            if self._pending is not None:
+                self._pending.append(("upsert", question))
+        self._maybe_compact()
+
+    def delete(self, question_id: str) -> bool:
+        """Remove a question by id; False if it is not indexed"""
+        with self._lock:
+            removed = self._delete(question_id)
+            if removed and self._pending is not None:
+                self._pending.append(("delete", question_id))
+        self._maybe_compact()
+        return removed
+
+    def on_refined(self, question: Question, entries: List[Dict[str, Any]]):
+        """QuestionTransformer listener: re-index a refined question"""
+        self.upsert(question)
+
+    def _upsert(self, question: Question):
+        self._delete(question.id)
+        doc = len(self.doc_ids)
+        self.doc_ids.append(question.id)
+        self._doc_of_id[question.id] = doc
+        self.live.append(True)
+        self._add_document(doc, question)
+
+    def _delete(self, question_id: str) -> bool:
+        doc = self._doc_of_id.pop(question_id, None)
+        if doc is None:
+            return False
+        self.live.data[doc] = False
+        self._dead += 1
+        self._remove_document(doc)
+        return True
+
+    def _maybe_compact(self):
+        if self.stale >= self.COMPACT_MIN and self.stale > self.COMPACT_RATIO * len(self.doc_ids):
+            self.compact(wait=not self.background_compaction)
+
+    def compact(self, wait: bool = True):
+        """Drop tombstones and merge new documents (in the background unless `wait`)"""
+        with self._lock:
+            if self._compactor is not None and self._compactor.is_alive():
+                running = self._compactor
+            else:
+                running = None
+                self._compactor = threading.Thread(target=self._run_compaction, daemon=True)
+                self._compactor.start()
+        if wait:
+            (running or self._compactor).join()
+            if running is not None:
+                self.compact(wait=True)
+
+    def wait_for_compaction(self):
+        compactor = self._compactor
+        if compactor is not None:
+            compactor.join()
+
+    def _run_compaction(self):
+        with self._lock:
+            snapshot = self._snapshot()
+            self._pending = []
+
+        try:
+            state = self._compacted(snapshot)
+            with self._lock:
+                self._install(state)
+                for op, arg in self._pending:
+                    if op == "upsert":
+                        self._upsert(arg)
+                    else:
+                        self._delete(arg)
+        finally:
+            # Stop logging operations for replay, even if compaction failed
+            # (the index then stays as it was, with the operations applied)
+            with self._lock:
+                self._pending = None
+
+    def _add_document(self, doc: int, question: Question):
+        raise NotImplementedError
+
+    def _remove_document(self, doc: int):
+        """Hook for running totals when `doc` is tombstoned"""
+
+    def _snapshot(self) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def _compacted(self, snapshot: Dict[str, Any]) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def _install(self, state: Dict[str, Any]):
+        raise NotImplementedError
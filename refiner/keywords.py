@@ -0,0 +1,161 @@
+"""
+Keyword Engine - Bank-wide discriminative keywords from a sparse term-document matrix
+"""
+
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .parser import Question
+
+# Words 4+ chars, as RAGOptimizer.optimize_keywords extracts them
+TOKEN_PATTERN = re.compile(r'\b\w{4,}\b')
+
+STOP_WORDS = frozenset({
+    'what', 'which', 'that', 'this', 'from', 'with', 'have',
+    'would', 'could', 'should', 'will', 'can', 'does', 'do'
+})
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased keyword candidates in `text`, stop words removed"""
+    return [w for w in TOKEN_PATTERN.findall(text.lower()) if w not in STOP_WORDS]
+
+
+class TermMatrix:
+    """Sparse term-document counts in CSR form (indptr, indices, data)"""
+
+    def __init__(self, vocabulary: Dict[str, int], indptr: np.ndarray,
+                 indices: np.ndarray, data: np.ndarray):
+        self.vocabulary = vocabulary
+        self.terms = np.array(sorted(vocabulary, key=vocabulary.get), dtype=object)
+        self.indptr = indptr
+        self.indices = indices
+        self.data = data
+
+    @property
+    def n_docs(self) -> int:
+        return len(self.indptr) - 1
+
+    @property
+    def n_terms(self) -> int:
+        return len(self.vocabulary)
+
+    @classmethod
+    def from_documents(cls, documents: Iterable[List[str]]) -> "TermMatrix":
+        """Count tokens per document; each row's columns are sorted"""
+        vocabulary: Dict[str, int] = {}
+        indptr = [0]
+        indices: List[int] = []
+        data: List[int] = []
+
+        for tokens in documents:
+            counts: Dict[int, int] = {}
+            for token in tokens:
+                col = vocabulary.setdefault(token, len(vocabulary))
+                counts[col] = counts.get(col, 0) + 1
+            for col in sorted(counts):
+                indices.append(col)
+                data.append(counts[col])
+            indptr.append(len(indices))
+
+        return cls(
+            vocabulary,
+            np.asarray(indptr, dtype=np.int64),
+            np.asarray(indices, dtype=np.int64),
+            np.asarray(data, dtype=np.float64)
+        )
+
+    def row_ids(self) -> np.ndarray:
+        """Row index of every stored entry"""
+        return np.repeat(np.arange(self.n_docs), np.diff(self.indptr))
+
+    def document_frequency(self) -> np.ndarray:
+        return np.bincount(self.indices, minlength=self.n_terms)
+
+    def document_lengths(self) -> np.ndarray:
+        return np.add.reduceat(self.data, self.indptr[:-1]) if self.data.size else np.zeros(self.n_docs)
+
+
+class KeywordEngine:
+    """TF-IDF or BM25 term weights for a whole bank, computed in one vectorized pass
+
+    Terms found in more than `max_df` of the documents are treated as
+    generic and never chosen. Weights are L2-normalized per question, so
+    top terms are comparable across questions of different lengths.
+    """
+
+    WEIGHTINGS = ("tfidf", "bm25")
+
+    def __init__(self, weighting: str = "tfidf", max_df: float = 0.5,
+                 k1: float = 1.5, b: float = 0.75):
+        if weighting not in self.WEIGHTINGS:
+            raise ValueError(f"Unknown weighting '{weighting}' (expected one of {self.WEIGHTINGS})")
+        self.weighting = weighting
+        self.max_df = max_df
+        self.k1 = k1
+        self.b = b
+
+        self.matrix: Optional[TermMatrix] = None
+        self.weights: Optional[np.ndarray] = None   # aligned with matrix.data
+
+    @staticmethod
+    def document_tokens(question: Question) -> List[str]:
+        """Tokens a question contributes to the matrix"""
+        return tokenize(question.question)
+
+    def fit(self, questions: List[Question]) -> "KeywordEngine":
+        """Build the term-document matrix and weight every entry"""
+        matrix = TermMatrix.from_documents(self.document_tokens(q) for q in questions)
+        n = max(matrix.n_docs, 1)
+        tf = matrix.data
+        df = matrix.document_frequency()
+
+        if self.weighting == "bm25":
+            idf = np.log(1 + (n - df + 0.5) / (df + 0.5))
+            lengths = matrix.document_lengths()
+            avg_length = lengths.mean() if lengths.size and lengths.mean() else 1.0
+            norm = self.k1 * (1 - self.b + self.b * lengths / avg_length)
+            weights = idf[matrix.indices] * tf * (self.k1 + 1) / (tf + norm[matrix.row_ids()])
+        else:
+            idf = np.log((1 + n) / (1 + df)) + 1
+            weights = (1 + np.log(tf)) * idf[matrix.indices]
+
+        # Generic terms never discriminate
+        if n > 1:
+            weights[(df / n)[matrix.indices] > self.max_df] = 0.0
+
+        # L2 normalize rows
+        if weights.size:
+            sq = np.add.reduceat(weights * weights, matrix.indptr[:-1])
+            sq[np.diff(matrix.indptr) == 0] = 0.0
+            norms = np.sqrt(sq)
+            norms[norms == 0] = 1.0
+            weights = weights / norms[matrix.row_ids()]
+
+        self.matrix = matrix
+        self.weights = weights
+        return self
+
+    def top_terms(self, k: int) -> List[List[Tuple[str, float]]]:
+        """
+        Up to `k` highest-weighted terms per question (zero weights skipped)
+        Returns: per question, [(term, weight)] best first
+        """
+        if self.matrix is None:
+            raise RuntimeError("KeywordEngine.fit() must be called first")
+
+        matrix = self.matrix
+        rows = matrix.row_ids()
+
+        # Sort entries by row, then weight descending (ties by term order)
+        order = np.lexsort((matrix.indices, -self.weights, rows))
+        rank = np.arange(order.size) - matrix.indptr[rows[order]]
+        keep = order[(rank < k) & (self.weights[order] > 0)]
+
+        result: List[List[Tuple[str, float]]] = [[] for _ in range(matrix.n_docs)]
+        for row, term, weight in zip(rows[keep].tolist(), matrix.terms[matrix.indices[keep]],
+                                     self.weights[keep].tolist()):
+            result[row].append((term, round(weight, 4)))
+        return result
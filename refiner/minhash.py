@@ -0,0 +1,282 @@
+"""
+Near-Duplicate Detector - MinHash signatures with LSH banding
+"""
+
+import re
+import zlib
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import yaml
+
+from .parser import Question
+from .incremental import GrowableArray, IncrementalIndex, UnionFind
+
+# Mersenne prime 2^31 - 1: a * x + b stays below 2^63 in uint64
+_PRIME = np.uint64((1 << 31) - 1)
+_WORD = re.compile(r'\w+')
+
+# Prefix of the duplicates_check segment written by annotate()
+DUPLICATES_LABEL = "Duplicates: "
+
+
+def shingles(question: Question, size: int = 3) -> List[str]:
+    """Word `size`-grams of the question text and code_context"""
+    result = []
+    for prefix, text in (("q", question.question), ("c", question.code_context)):
+        words = _WORD.findall((text or "").lower())
+        if not words:
+            continue
+        if len(words) < size:
+            result.append(prefix + ":" + " ".join(words))
+            continue
+        for i in range(len(words) - size + 1):
+            result.append(prefix + ":" + " ".join(words[i:i + size]))
+    return result
+
+
+class NearDuplicateDetector:
+    """Find near-duplicate questions in roughly linear time
+
+    Each question gets a MinHash signature over word shingles of its text
+    and code_context. Signatures are split into `bands`; questions sharing
+    any band bucket become candidates, and candidates whose estimated
+    Jaccard similarity reaches `threshold` are clustered. Every pair in a
+    bucket is verified; in buckets of more than VERIFY_MAX questions each
+    member is verified against a fixed sample of VERIFY_MAX members, so
+    large buckets stay linear.
+    """
+
+    # Bucket size up to which all pairs are verified
+    VERIFY_MAX = 64
+
+    def __init__(self, num_perm: int = 128, bands: int = 16, shingle_size: int = 3,
+                 threshold: float = 0.8, seed: int = 0):
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be divisible by bands ({bands})")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.threshold = threshold
+
+        self.seed = seed
+
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, int(_PRIME), size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, int(_PRIME), size=num_perm, dtype=np.uint64)
+
+    @classmethod
+    def from_config(cls, config_path: str = "config.yaml", **overrides) -> "NearDuplicateDetector":
+        """Detector with settings from the config's near_duplicates section"""
+        with open(config_path, 'r') as f:
+            settings = dict(yaml.safe_load(f).get('near_duplicates', {}))
+        settings.update({k: v for k, v in overrides.items() if v is not None})
+        return cls(**settings)
+
+    def signatures(self, questions: List[Question], chunk_size: int = 65536) -> np.ndarray:
+        """MinHash signatures, one row of `num_perm` values per question"""
+        hashes: List[int] = []
+        indptr = [0]
+        for q in questions:
+            # An empty question still gets one (empty) shingle
+            items = shingles(q, self.shingle_size) or [""]
+            hashes.extend(zlib.crc32(s.encode("utf-8")) for s in items)
+            indptr.append(len(hashes))
+
+        values = np.asarray(hashes, dtype=np.uint64) % _PRIME
+        indptr = np.asarray(indptr, dtype=np.int64)
+        result = np.empty((len(questions), self.num_perm), dtype=np.uint64)
+
+        # Process whole documents in chunks of about `chunk_size` shingles
+        start = 0
+        while start < len(questions):
+            end = int(np.searchsorted(indptr, indptr[start] + chunk_size, side="right")) - 1
+            end = min(max(end, start + 1), len(questions))
+            lo, hi = indptr[start], indptr[end]
+
+            permuted = (self._a[:, None] * values[None, lo:hi] + self._b[:, None]) % _PRIME
+            result[start:end] = np.minimum.reduceat(permuted, indptr[start:end] - lo, axis=1).T
+            start = end
+
+        return result
+
+    def similarity(self, sig_a: np.ndarray, sig_b: np.ndarray) -> float:
+        """Estimated Jaccard similarity of two signatures"""
+        return float(np.mean(sig_a == sig_b))
+
+    def find(self, questions: List[Question]) -> Tuple[List[List[int]], List[Tuple[int, int, float]]]:
+        """
+        Detect near-duplicates among `questions`
+        Returns: (clusters of 2+ indices in first-occurrence order,
+                  verified pairs as (i, j, similarity))
+        """
+
+        if not questions:
+            return [], []
+
+        sigs = self.signatures(questions)
+        union = UnionFind(len(questions))
+        pairs: Dict[Tuple[int, int], float] = {}
+        rng = np.random.default_rng(self.seed)
+
+        # Identical signatures are paired with their first occurrence directly;
+        # only distinct signatures go through the bands
+        distinct: Dict[bytes, int] = {}
+        for i, key in enumerate(map(bytes, sigs)):
+            first = distinct.setdefault(key, i)
+            if first != i:
+                pairs[(first, i)] = 1.0
+                union.union(first, i)
+        reps = np.fromiter(distinct.values(), dtype=np.int64, count=len(distinct))
+
+        for band in range(self.bands):
+            block = np.ascontiguousarray(sigs[reps, band * self.rows:(band + 1) * self.rows])
+            buckets: Dict[bytes, List[int]] = {}
+            for i, key in zip(reps.tolist(), map(bytes, block)):
+                buckets.setdefault(key, []).append(i)
+
+            for members in buckets.values():
+                if len(members) > 1:
+                    for i, j, score in self._verify_bucket(sigs, np.asarray(members), rng):
+                        pairs[(i, j)] = score
+                        union.union(i, j)
+
+        clusters: Dict[int, List[int]] = {}
+        for i in range(len(questions)):
+            clusters.setdefault(union.find(i), []).append(i)
+
+        return (
+            [members for members in clusters.values() if len(members) > 1],
+            [(i, j, round(score, 3)) for (i, j), score in sorted(pairs.items())]
+        )
+
+    def _verify_bucket(self, sigs: np.ndarray, members: np.ndarray,
+                       rng: np.random.Generator) -> List[Tuple[int, int, float]]:
+        """Pairs (i < j) of bucket `members` whose similarity reaches the threshold"""
+        if len(members) <= self.VERIFY_MAX:
+            partners = members
+        else:
+            partners = np.sort(rng.choice(members, self.VERIFY_MAX, replace=False))
+
+        found: Dict[Tuple[int, int], float] = {}
+        partner_sigs = sigs[partners]
+        for start in range(0, len(members), self.VERIFY_MAX):
+            chunk = members[start:start + self.VERIFY_MAX]
+            scores = (sigs[chunk][:, None, :] == partner_sigs[None, :, :]).mean(axis=2)
+            rows, cols = np.nonzero((scores >= self.threshold) & (chunk[:, None] != partners[None, :]))
+            for r, c in zip(rows.tolist(), cols.tolist()):
+                pair = tuple(sorted((int(chunk[r]), int(partners[c]))))
+                found[pair] = float(scores[r, c])
+        return [(i, j, score) for (i, j), score in sorted(found.items())]
+
+    @staticmethod
+    def annotate(questions: List[Question], clusters: List[List[int]],
+                 max_ids: Optional[int] = 5) -> int:
+        """
+        Record each question's near-duplicates in duplicates_check
+        Any earlier "Duplicates: ..." segment is replaced; other text
+        (e.g. RAGOptimizer's "Related: ...") is kept.
+        Returns: number of questions annotated
+        """
+
+        annotated = 0
+        for members in clusters:
+            for i in members:
+                q = questions[i]
+                others = [questions[j].id for j in members if j != i][:max_ids]
+
+                segments = [
+                    s for s in (q.duplicates_check or "").split(" | ")
+                    if s and not s.startswith(DUPLICATES_LABEL)
+                ]
+                segments.append(DUPLICATES_LABEL + ", ".join(others))
+                q.duplicates_check = " | ".join(segments)
+                annotated += 1
+
+        return annotated
+
+
+class MinHashIndex(IncrementalIndex):
+    """Queryable MinHash/LSH index kept current with upsert/delete
+
+    Band buckets are dicts, so new documents go straight into them and
+    never count as unmerged; compaction only drops tombstones.
+    """
+
+    def __init__(self, detector: Optional[NearDuplicateDetector] = None):
+        self.detector = detector or NearDuplicateDetector()
+        self.signatures = GrowableArray(np.uint64, width=self.detector.num_perm)
+        self._buckets: List[Dict[bytes, List[int]]] = [{} for _ in range(self.detector.bands)]
+        self._init_incremental()
+
+    def __len__(self) -> int:
+        return self.live_count
+
+    def build(self, questions: Iterable[Question]) -> "MinHashIndex":
+        """Index `questions` (replaces any previous contents)"""
+        questions = list(questions)
+        sigs = self.detector.signatures(questions)
+        with self._lock:
+            self._install(self._bucketed([q.id for q in questions], sigs))
+        return self
+
+    def _band_keys(self, sig: np.ndarray) -> List[bytes]:
+        rows = self.detector.rows
+        return [sig[band * rows:(band + 1) * rows].tobytes() for band in range(self.detector.bands)]
+
+    def _bucketed(self, doc_ids: List[str], sigs: np.ndarray) -> Dict[str, Any]:
+        buckets: List[Dict[bytes, List[int]]] = [{} for _ in range(self.detector.bands)]
+        for doc, sig in enumerate(sigs):
+            for table, key in zip(buckets, self._band_keys(sig)):
+                table.setdefault(key, []).append(doc)
+        return {"doc_ids": doc_ids, "signatures": sigs, "buckets": buckets}
+
+    def _install(self, state: Dict[str, Any]):
+        self.signatures = GrowableArray.from_array(state["signatures"])
+        self._buckets = state["buckets"]
+        self._reset_docs(state["doc_ids"])
+
+    def _add_document(self, doc: int, question: Question):
+        sig = self.detector.signatures([question])[0]
+        self.signatures.append(sig)
+        for table, key in zip(self._buckets, self._band_keys(sig)):
+            table.setdefault(key, []).append(doc)
+        self._merged = len(self.doc_ids)
+
+    def _snapshot(self) -> Dict[str, Any]:
+        return {
+            "doc_ids": list(self.doc_ids),
+            "signatures": self.signatures.data,
+            "live": self.live.data.copy(),
+        }
+
+    def _compacted(self, snapshot: Dict[str, Any]) -> Dict[str, Any]:
+        live = snapshot["live"]
+        doc_ids = [qid for qid, alive in zip(snapshot["doc_ids"], live.tolist()) if alive]
+        return self._bucketed(doc_ids, snapshot["signatures"][live])
+
+    def query(self, question: Question, threshold: Optional[float] = None) -> List[Tuple[str, float]]:
+        """
+        Indexed near-duplicates of `question` (other ids only)
+        Returns: [(question_id, similarity)] most similar first
+        """
+        if threshold is None:
+            threshold = self.detector.threshold
+        sig = self.detector.signatures([question])[0]
+
+        with self._lock:
+            candidates = set()
+            for table, key in zip(self._buckets, self._band_keys(sig)):
+                candidates.update(table.get(key, ()))
+            docs = self.live_docs(np.fromiter(candidates, dtype=np.int64, count=len(candidates)))
+
+            matches = []
+            for doc in docs.tolist():
+                if self.doc_ids[doc] == question.id:
+                    continue
+                score = self.detector.similarity(sig, self.signatures.data[doc])
+                if score >= threshold:
+                    matches.append((self.doc_ids[doc], round(score, 3)))
+
+        return sorted(matches, key=lambda match: (-match[1], match[0]))
@@ -0,0 +1,155 @@
+"""
+Parallel Transform Engine - Shard refinement across a process pool
+"Small fixes, big clarity" - Quest & Crossfire
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .parser import Question
+from .dedup import QuestionDeduplicator
+from .vocabulary import KeywordVocabulary
+from .transformers import (
+    QuestionTransformer,
+    new_batch_results,
+    RefinementListener,
+    record_outcome,
+    keep_refinement,
+    finish_batch_results,
+)
+
+# refine_one result: (refined_question, strategies, improvement), or None if already passing
+Outcome = Optional[Tuple[Question, List[str], float]]
+
+# Each worker process builds its own analyzer and transformer once
+_worker_transformer: Optional[QuestionTransformer] = None
+
+
+def _init_worker(config_path: str, seed: Optional[int], vocabulary: Optional[KeywordVocabulary]):
+    """Process pool initializer"""
+    global _worker_transformer
+    _worker_transformer = QuestionTransformer(config_path, seed=seed)
+    if vocabulary is not None:
+        _worker_transformer.analyzer.set_vocabulary(vocabulary)
+
+
+def _refine_shard(questions: List[Question], scores: List[Optional[Dict[str, float]]],
+                  options: Dict[str, Any]) -> List[Outcome]:
+    """Refine one shard inside a worker"""
+    return [
+        _worker_transformer.refine_one(q, scores=s, **options)
+        for q, s in zip(questions, scores)
+    ]
+
+
+class ParallelTransformEngine:
+    """Refine question batches across processes, merging results in input order"""
+
+    # Shards per worker; more shards balance uneven questions better
+    SHARDS_PER_WORKER = 4
+
+    def __init__(self, config_path: str = "config.yaml", workers: Optional[int] = None,
+                 seed: Optional[int] = None, max_shard_size: int = 256,
+                 vocabulary: Optional[KeywordVocabulary] = None):
+        self.config_path = config_path
+        self.workers = workers or os.cpu_count() or 1
+        self.seed = seed
+        self.max_shard_size = max_shard_size
+        # Scores with this table instead of the configured file (sent to workers as-is)
+        self.vocabulary = vocabulary
+        self.listeners: List[RefinementListener] = []
+
+    def add_listener(self, listener: RefinementListener):
+        """Notify `listener` of every refinement batch_transform keeps"""
+        self.listeners.append(listener)
+
+    def iter_outcomes(self, questions: List[Question], threshold: Optional[float] = None,
+                      max_iterations: Optional[int] = None, search: bool = False,
+                      scores: Optional[List[Dict[str, float]]] = None,
+                      groups: Optional[List[List[int]]] = None) -> Iterator[Tuple[int, Outcome]]:
+        """
+        Yield (index, outcome) for every question, in input order
+        Outcomes are proposals: consumers keep them with keep_refinement
+        (or QuestionTransformer.keep) so listeners are notified.
+
+        All shards are submitted up front, so later questions keep being
+        refined while earlier outcomes are consumed (e.g. reviewed
+        interactively). `scores` may carry already-computed scores.
+        Pass duplicate `groups` (QuestionDeduplicator.group) to refine only
+        each group's representative and fan its outcome out to the others.
+        """
+
+        if groups is not None:
+            reps = [group[0] for group in groups]
+            unique = (
+                outcome for _, outcome in self.iter_outcomes(
+                    [questions[r] for r in reps], threshold, max_iterations, search,
+                    scores=[scores[r] for r in reps] if scores is not None else None
+                )
+            )
+            yield from QuestionDeduplicator().iter_fanned_outcomes(questions, groups, unique)
+            return
+
+        options = {"threshold": threshold, "max_iterations": max_iterations, "search": search}
+        if scores is None:
+            scores = [None] * len(questions)
+
+        if self.workers <= 1 or len(questions) <= 1:
+            transformer = QuestionTransformer(self.config_path, seed=self.seed)
+            if self.vocabulary is not None:
+                transformer.analyzer.set_vocabulary(self.vocabulary)
+            for i, (q, s) in enumerate(zip(questions, scores)):
+                yield i, transformer.refine_one(q, scores=s, **options)
+            return
+
+        shard_size = max(1, min(
+            self.max_shard_size,
+            -(-len(questions) // (self.workers * self.SHARDS_PER_WORKER))
+        ))
+
+        pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(self.config_path, self.seed, self.vocabulary)
+        )
+        try:
+            futures = [
+                pool.submit(
+                    _refine_shard,
+                    questions[start:start + shard_size],
+                    scores[start:start + shard_size],
+                    options
+                )
+                for start in range(0, len(questions), shard_size)
+            ]
+
+            i = 0
+            for future in futures:
+                for outcome in future.result():
+                    yield i, outcome
+                    i += 1
+        finally:
+            # Stop pending shards if the consumer stops early
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    def batch_transform(self, questions: List[Question], threshold: float = 4.8,
+                        max_iterations: Optional[int] = None, search: bool = False,
+                        dedupe: bool = False) -> Dict[str, Any]:
+        """
+        Parallel QuestionTransformer.batch_transform: refines in place
+        Returns summary statistics (same shape, merged in input order)
+        """
+
+        results = new_batch_results(len(questions))
+
+        groups = None
+        if dedupe:
+            groups = QuestionDeduplicator().group(questions)
+            results["dedup_ratio"] = QuestionDeduplicator.ratio(groups)
+
+        for i, outcome in self.iter_outcomes(questions, threshold, max_iterations, search, groups=groups):
+            if record_outcome(results, outcome):
+                keep_refinement(self.listeners, questions, i, outcome[0])
+
+        return finish_batch_results(results)
@@ -5,8 +5,8 @@ Question Parser - JSONL handling and validation
 import json
 import re
 from pathlib import Path
-from typing import List, Dict, Any, Optional
-from dataclasses import dataclass, field, asdict
+from typing import Iterator, List, Dict, Any, Mapping, Optional
+from dataclasses import dataclass, field, fields, asdict
 from datetime import datetime
 
 
@@ -44,21 +44,81 @@ class Question:
         data = asdict(self)
         return {k: v for k, v in data.items() if v is not None}
 
-    def update_from_refinement(self, refined_question: str, strategy: str, score_improvement: float):
+    def update_from_refinement(self, refined_question: str, strategy: str, score_improvement: float,
+                               iteration: Optional[int] = None):
         """Record a refinement"""
         if self.original_question is None:
             self.original_question = self.question
 
-        self.refinement_history.append({
-            "timestamp": datetime.now().isoformat(),
+        timestamp = datetime.now().isoformat()
+        entry = {
+            "timestamp": timestamp,
             "strategy": strategy,
             "old_question": self.question,
             "new_question": refined_question,
             "score_improvement": score_improvement
-        })
+        }
+        if iteration is not None:
+            entry["iteration"] = iteration
+
+        self.refinement_history.append(entry)
 
         self.question = refined_question
-        self.last_refined = datetime.now().isoformat()
+        self.last_refined = timestamp
+
+
+class CandidateQuestion:
+    """Copy-on-write overlay over a Question, used for trial transformations
+
+    Reads fall through to the base question until a field is assigned;
+    assignments only touch the overlay. Scoreable wherever a Question is
+    read. Call materialize() to turn an accepted candidate into a Question.
+    """
+
+    __slots__ = ("_base", "_changes")
+
+    def __init__(self, base):
+        if isinstance(base, CandidateQuestion):
+            # Flatten overlays so lookups stay one level deep
+            changes = dict(base._changes)
+            base = base._base
+        else:
+            changes = {}
+        object.__setattr__(self, "_base", base)
+        object.__setattr__(self, "_changes", changes)
+
+    def __getattr__(self, name):
+        changes = self._changes
+        if name in changes:
+            return changes[name]
+        return getattr(self._base, name)
+
+    def __setattr__(self, name, value):
+        self._changes[name] = value
+
+    def changes(self) -> Dict[str, Any]:
+        """Fields assigned on this candidate, as a new dict of {name: value}"""
+        return dict(self._changes)
+
+    def materialize(self) -> Question:
+        """Build a standalone Question (unchanged list/dict fields are shallow-copied)"""
+        changes = self._changes
+        base = self._base
+
+        values = {}
+        for f in fields(Question):
+            name = f.name
+            if name in changes:
+                value = changes[name]
+            else:
+                value = getattr(base, name)
+                if isinstance(value, list):
+                    value = list(value)
+                elif isinstance(value, dict):
+                    value = dict(value)
+            values[name] = value
+
+        return Question(**values)
 
 
 class QuestionParser:
@@ -135,14 +195,38 @@ class QuestionParser:
         return questions
 
     @staticmethod
-    def _dict_to_question(data: Dict[str, Any]) -> Question:
-        """Convert dictionary to Question object with validation"""
+    def iter_jsonl(file_path: str) -> Iterator[Question]:
+        """Stream questions from a JSONL file one line at a time (standard format only)"""
+        path = Path(file_path)
+
+        if not path.exists():
+            raise FileNotFoundError(f"Question bank not found: {file_path}")
+
+        with path.open('r', encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
 
-        # Check required fields
+                try:
+                    data = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+                yield QuestionParser._dict_to_question(data)
+
+    @staticmethod
+    def check_required(data: Mapping[str, Any]):
+        """Raise ValueError if a raw question row lacks any REQUIRED_FIELDS"""
         missing = QuestionParser.REQUIRED_FIELDS - set(data.keys())
         if missing:
             raise ValueError(f"Missing required fields: {missing} in question {data.get('id', 'unknown')}")
 
+    @staticmethod
+    def _dict_to_question(data: Dict[str, Any]) -> Question:
+        """Convert dictionary to Question object with validation"""
+
+        QuestionParser.check_required(data)
+
         # Validate style
         if data['style'] not in QuestionParser.VALID_STYLES:
             print(f"⚠️  Warning: Unknown style '{data['style']}' in question {data['id']}")
@@ -0,0 +1,222 @@
+"""
+Prerequisite Graph - Resolve Question.prerequisites into a CSR graph
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .parser import Question
+
+
+def _gather(indptr: np.ndarray, indices: np.ndarray, nodes: np.ndarray) -> np.ndarray:
+    """Concatenated adjacency lists of `nodes`"""
+    starts = indptr[nodes]
+    counts = indptr[nodes + 1] - starts
+    total = int(counts.sum())
+    if not total:
+        return np.zeros(0, dtype=indices.dtype)
+    offsets = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(total)
+    return indices[offsets]
+
+
+def _reach(indptr: np.ndarray, indices: np.ndarray, node: int) -> np.ndarray:
+    """Nodes reachable from `node` (excluding it), nearest first, bank order within a level"""
+    seen = np.zeros(len(indptr) - 1, dtype=bool)
+    seen[node] = True
+    frontier = np.array([node])
+    levels = []
+    while frontier.size:
+        frontier = _gather(indptr, indices, frontier)
+        frontier = np.unique(frontier[~seen[frontier]])
+        seen[frontier] = True
+        levels.append(frontier)
+    return np.concatenate(levels)
+
+
+class PrerequisiteGraph:
+    """Questions and the prerequisites they name, as a directed graph
+
+    Nodes are question ids numbered in bank order (a repeated id shares
+    the first occurrence's node). An edge runs from a question to each
+    prerequisite; the prerequisites of node n are
+    indices[indptr[n]:indptr[n + 1]]. Dependents are kept the same way in
+    a reverse CSR. References to ids not in the bank are kept apart as
+    dangling.
+    """
+
+    def __init__(self, ids: List[str], indptr: np.ndarray, indices: np.ndarray,
+                 dangling: Dict[str, List[str]]):
+        self.ids = ids
+        self.indptr = indptr
+        self.indices = indices
+        self.dangling = dangling
+        self._node_of = {qid: node for node, qid in enumerate(ids)}
+
+        # Reverse CSR: dependents of node n
+        sources = np.repeat(np.arange(len(ids), dtype=np.int32), np.diff(indptr))
+        order = np.argsort(indices, kind="stable")
+        self.rev_indices = sources[order]
+        self.rev_indptr = np.zeros(len(ids) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(indices, minlength=len(ids)), out=self.rev_indptr[1:])
+
+        self._order: Optional[List[int]] = None
+        self._cycles: Optional[List[List[int]]] = None
+
+    @classmethod
+    def build(cls, questions: Iterable[Question]) -> "PrerequisiteGraph":
+        """Resolve every question's prerequisites in one pass"""
+        questions = list(questions)
+        node_of: Dict[str, int] = {}
+        for q in questions:
+            node_of.setdefault(q.id, len(node_of))
+
+        sources, targets = [], []
+        dangling: Dict[str, List[str]] = {}
+        for q in questions:
+            source = node_of[q.id]
+            for ref in q.prerequisites or []:
+                target = node_of.get(ref)
+                if target is None:
+                    dangling.setdefault(q.id, []).append(ref)
+                else:
+                    sources.append(source)
+                    targets.append(target)
+
+        # Sorted, deduplicated edges: by source, then target
+        n = len(node_of)
+        edges = np.unique(np.asarray(sources, dtype=np.int64) * n + np.asarray(targets, dtype=np.int64))
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        if n:
+            np.cumsum(np.bincount(edges // n, minlength=n), out=indptr[1:])
+        indices = (edges % max(n, 1)).astype(np.int32)
+
+        return cls(list(node_of), indptr, indices, dangling)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, question_id: str) -> bool:
+        return question_id in self._node_of
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.indices)
+
+    def _node(self, question_id: str) -> int:
+        node = self._node_of.get(question_id)
+        if node is None:
+            raise ValueError(f"Unknown question id: {question_id}")
+        return node
+
+    def prerequisites(self, question_id: str) -> List[str]:
+        """Direct prerequisites that resolve to questions in the bank"""
+        node = self._node(question_id)
+        return [self.ids[i] for i in self.indices[self.indptr[node]:self.indptr[node + 1]].tolist()]
+
+    def closure(self, question_id: str) -> List[str]:
+        """Everything needed before `question_id`, nearest prerequisites first"""
+        return [self.ids[i] for i in _reach(self.indptr, self.indices, self._node(question_id)).tolist()]
+
+    def dependents(self, question_id: str) -> List[str]:
+        """Everything that needs `question_id`, direct dependents first"""
+        return [self.ids[i] for i in _reach(self.rev_indptr, self.rev_indices, self._node(question_id)).tolist()]
+
+    def _topological_nodes(self) -> List[int]:
+        if self._order is None:
+            # Kahn's algorithm: a question is ready once all its prerequisites are placed
+            waiting = np.diff(self.indptr).tolist()
+            rev_indptr = self.rev_indptr.tolist()
+            rev_indices = self.rev_indices.tolist()
+
+            order = [node for node, count in enumerate(waiting) if not count]
+            for node in order:
+                for dependent in rev_indices[rev_indptr[node]:rev_indptr[node + 1]]:
+                    waiting[dependent] -= 1
+                    if not waiting[dependent]:
+                        order.append(dependent)
+            self._order = order
+        return self._order
+
+    def topological_order(self) -> List[str]:
+        """
+        Question ids with every prerequisite before the questions needing it
+        Questions on a cycle, or needing one, are left out (see cycles()).
+        """
+        return [self.ids[node] for node in self._topological_nodes()]
+
+    def cycles(self) -> List[List[str]]:
+        """Groups of questions that (transitively) require each other, including self-references"""
+        if self._cycles is None:
+            remaining = np.ones(len(self.ids), dtype=bool)
+            remaining[self._topological_nodes()] = False
+
+            # Also peel questions only needed by nothing that remains: those
+            # just depend on a cycle without being on one
+            counts = np.bincount(self.indices[remaining[np.repeat(np.arange(len(self.ids)), np.diff(self.indptr))]],
+                                 minlength=len(self.ids))
+            needed = np.where(remaining, counts, 0).tolist()
+            indptr, indices = self.indptr.tolist(), self.indices.tolist()
+            peel = [node for node in np.flatnonzero(remaining).tolist() if not needed[node]]
+            for node in peel:
+                remaining[node] = False
+                for prerequisite in indices[indptr[node]:indptr[node + 1]]:
+                    if remaining[prerequisite]:
+                        needed[prerequisite] -= 1
+                        if not needed[prerequisite]:
+                            peel.append(prerequisite)
+
+            self._cycles = self._strongly_connected(np.flatnonzero(remaining).tolist())
+        return [[self.ids[node] for node in component] for component in self._cycles]
+
+    def _strongly_connected(self, nodes: List[int]) -> List[List[int]]:
+        """Cyclic strongly connected components among `nodes` (iterative Tarjan)"""
+        indptr, indices = self.indptr, self.indices
+        candidates = set(nodes)
+        index: Dict[int, int] = {}
+        low: Dict[int, int] = {}
+        stack: List[int] = []
+        on_stack = set()
+        components = []
+
+        for root in nodes:
+            if root in index:
+                continue
+            work: List[Tuple[int, int]] = [(root, int(indptr[root]))]
+            index[root] = low[root] = len(index)
+            stack.append(root)
+            on_stack.add(root)
+
+            while work:
+                node, edge = work[-1]
+                if edge < indptr[node + 1]:
+                    work[-1] = (node, edge + 1)
+                    target = int(indices[edge])
+                    if target not in candidates:
+                        continue
+                    if target not in index:
+                        index[target] = low[target] = len(index)
+                        stack.append(target)
+                        on_stack.add(target)
+                        work.append((target, int(indptr[target])))
+                    elif target in on_stack:
+                        low[node] = min(low[node], index[target])
+                    continue
+
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+                if low[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    targets = indices[indptr[node]:indptr[node + 1]]
+                    if len(component) > 1 or node in targets:
+                        components.append(sorted(component))
+
+        return sorted(components)
@@ -3,59 +3,87 @@ RAG Optimizer - Optimize questions for keyword + semantic search
 """
 
 import re
-from typing import List, Set, Dict
+from types import MappingProxyType
+from typing import List, Set, Dict, Mapping, Optional, Pattern, Tuple
 import yaml
 from .parser import Question
+from .keywords import KeywordEngine, tokenize
+from .embeddings import SemanticIndex
+
+
+def _compile_subtopics(patterns: Mapping[str, List[str]]) -> Tuple[Pattern, Tuple[str, ...]]:
+    """One regex with a named group per subtopic, plus the group names in config order"""
+    names = tuple(f"s{i}" for i in range(len(patterns)))
+    alternatives = [
+        f"(?P<{name}>{'|'.join(re.escape(w) for w in sorted(words, key=len, reverse=True))})"
+        for name, words in zip(names, patterns.values()) if words
+    ]
+    if not alternatives:
+        return re.compile(r'(?!)'), ()
+    return re.compile(r'\b(?:' + '|'.join(alternatives) + r')\b'), names
 
 
 class RAGOptimizer:
-    """Optimize questions for RAG retrieval (keyword + semantic)"""
+    """Optimize questions for RAG retrieval (keyword + semantic)
+
+    Synonyms, subtopic patterns and topic concepts come from the rag
+    section of the config and are compiled once per optimizer.
+    """
 
     def __init__(self, config_path: str = "config.yaml"):
+        self.config_path = config_path
         with open(config_path, 'r') as f:
             self.config = yaml.safe_load(f)
 
         self.min_keywords = self.config['rag']['min_keywords']
         self.max_keywords = self.config['rag']['max_keywords']
+        self.keyword_settings = self.config['rag'].get('keywords', {})
+
+        # term -> synonyms added alongside it
+        self.synonyms: Mapping[str, Tuple[str, ...]] = MappingProxyType({
+            term: tuple(syns) for term, syns in self.config['rag'].get('synonyms', {}).items()
+        })
+        # Reverse map: every form (term or synonym) -> its canonical term, so
+        # a keyword that is itself a synonym expands to the rest of its group
+        canonical: Dict[str, str] = {}
+        for term, syns in self.synonyms.items():
+            for form in (term,) + syns:
+                canonical.setdefault(form, term)
+        self.canonical_terms: Mapping[str, str] = MappingProxyType(canonical)
+        self._synonym_rank = {term: rank for rank, term in enumerate(self.synonyms)}
+
+        # Subtopic inference: one pass of one regex; group sN is the Nth subtopic
+        subtopic_patterns = self.config['rag'].get('subtopic_patterns', {})
+        self._subtopic_regex, groups = _compile_subtopics(subtopic_patterns)
+        self._subtopic_of_group = dict(zip(groups, subtopic_patterns))
+        self._subtopic_rank = {group: rank for rank, group in enumerate(groups)}
+
+        self.topic_concepts: Mapping[str, Tuple[str, ...]] = MappingProxyType({
+            topic: tuple(concepts) for topic, concepts in self.config['rag'].get('topic_concepts', {}).items()
+        })
+
+        # Set by index_bank(); related concepts then come from similar questions
+        self.semantic_index: Optional[SemanticIndex] = None
+
+    def index_bank(self, questions: List[Question]) -> SemanticIndex:
+        """Build the semantic index used to infer related concepts"""
+        self.semantic_index = SemanticIndex.from_config(self.config_path).build(questions)
+        return self.semantic_index
 
     def optimize_keywords(self, question: Question) -> Question:
         """Enhance keyword metadata"""
 
         keywords = set(question.keywords) if question.keywords else set()
 
-        # Extract from question text
+        # Extract from question text: words 4+ chars, minus common stop words
         text_lower = question.question.lower()
-        words = set(re.findall(r'\b\w{4,}\b', text_lower))  # Words 4+ chars
-
-        # Remove common stop words
-        stop_words = {
-            'what', 'which', 'that', 'this', 'from', 'with', 'have',
-            'would', 'could', 'should', 'will', 'can', 'does', 'do'
-        }
-        words -= stop_words
-
-        keywords.update(words)
+        keywords.update(tokenize(question.question))
 
         # Add synonyms for common terms
-        synonyms = {
-            'function': ['def', 'method', 'procedure'],
-            'variable': ['identifier', 'name', 'symbol'],
-            'loop': ['iteration', 'repeat', 'cycle'],
-            'list': ['array', 'sequence', 'collection'],
-            'error': ['exception', 'bug', 'issue'],
-        }
-
-        for term, syns in synonyms.items():
-            if term in keywords:
-                keywords.update(syns)
+        keywords.update(self._synonyms_for(list(keywords)))
 
         # Add Python-specific context
-        if question.topic:
-            keywords.add(question.topic.lower().replace(' & ', '_').replace(' ', '_'))
-
-        if question.subtopics:
-            for st in question.subtopics:
-                keywords.add(st.lower().replace(' ', '_'))
+        keywords.update(self._context_tags(question))
 
         # Limit to max keywords (keep most relevant)
         if len(keywords) > self.max_keywords:
@@ -74,6 +102,75 @@ class RAGOptimizer:
 
         return question
 
+    def optimize_keywords_batch(self, questions: List[Question]) -> List[Question]:
+        """
+        Assign keywords bank-wide from TF-IDF (or BM25) term weights
+        One sparse term-document matrix is built for all questions, so a
+        term scores high only where it separates a question from the rest
+        of the bank. Topic/subtopic tags come first, then discriminative
+        terms, then existing keywords, then synonyms while room remains.
+        Questions are updated in place.
+        Returns: questions
+        """
+
+        engine = KeywordEngine(
+            weighting=self.keyword_settings.get('weighting', 'tfidf'),
+            max_df=self.keyword_settings.get('max_df', 0.5)
+        ).fit(questions)
+        top_terms = engine.top_terms(self.max_keywords)
+
+        for question, terms in zip(questions, top_terms):
+            keywords = list(self._context_tags(question))
+            keywords.extend(term for term, weight in terms)
+            keywords.extend(question.keywords or [])
+
+            if self.config['rag'].get('include_synonyms', True):
+                keywords.extend(self._synonyms_for(keywords))
+
+            # Deduplicate keeping priority order, then cap
+            question.keywords = list(dict.fromkeys(keywords))[:self.max_keywords]
+
+        return questions
+
+    def _synonyms_for(self, keywords: List[str]) -> List[str]:
+        """
+        Other forms of every synonym group `keywords` touch (one reverse-map
+        lookup per keyword): the canonical term, then its synonyms, groups
+        in config order
+        """
+        canonical = self.canonical_terms
+        present = set(keywords)
+        terms = sorted({canonical[kw] for kw in present if kw in canonical}, key=self._synonym_rank.__getitem__)
+        return [form for term in terms for form in (term,) + self.synonyms[term] if form not in present]
+
+    def optimize_batch(self, questions: List[Question], related: bool = True) -> List[Question]:
+        """
+        Optimize a whole bank: bank-wide keywords, then search metadata
+        With `related`, the semantic index is built over the bank first so
+        related concepts come from similar questions.
+        Questions are updated in place.
+        Returns: questions
+        """
+
+        self.optimize_keywords_batch(questions)
+        if related:
+            self.index_bank(questions)
+
+        for question in questions:
+            self.add_search_metadata(question)
+
+        return questions
+
+    @staticmethod
+    def _context_tags(question: Question) -> List[str]:
+        """Topic and subtopic tags in keyword form"""
+        tags = []
+        if question.topic:
+            tags.append(question.topic.lower().replace(' & ', '_').replace(' ', '_'))
+        for st in question.subtopics or []:
+            tags.append(st.lower().replace(' ', '_'))
+        return tags
+
     def optimize_semantic(self, question: Question) -> Question:
         """Optimize for semantic/embedding search"""
 
@@ -99,17 +196,14 @@ class RAGOptimizer:
 
         related = []
 
-        # Map topics to related concepts
-        topic_concepts = {
-            "Data Types": ["mutability", "type conversion", "type checking"],
-            "Control Flow": ["loops", "conditionals", "iteration"],
-            "Functions": ["parameters", "return values", "scope", "recursion"],
-            "Operators": ["precedence", "arithmetic", "comparison", "logical"],
-            "Errors & Exceptions": ["error handling", "try-except", "debugging"],
-        }
+        # Concepts from semantically similar questions in the bank
+        if self.semantic_index is not None:
+            related = self.semantic_index.related_concepts(question, limit=5)
+            if related:
+                return related
 
-        if question.topic in topic_concepts:
-            related.extend(topic_concepts[question.topic])
+        # Map topics to related concepts
+        related.extend(self.topic_concepts.get(question.topic, ()))
 
         # Infer from keywords
         if question.keywords:
@@ -136,24 +230,11 @@ class RAGOptimizer:
     def _infer_subtopics(self, question: Question) -> List[str]:
         """Infer subtopics from question content"""
 
-        text_lower = question.question.lower()
-        subtopics = []
-
-        # Common subtopic patterns
-        patterns = {
-            "syntax": r'\b(syntax|colon|indentation|statement)\b',
-            "variables": r'\b(variable|identifier|name|assign)\b',
-            "functions": r'\b(function|def|return|parameter)\b',
-            "loops": r'\b(loop|for|while|iteration)\b',
-            "conditionals": r'\b(if|else|elif|condition)\b',
-            "errors": r'\b(error|exception|bug|debug)\b',
-        }
-
-        for topic, pattern in patterns.items():
-            if re.search(pattern, text_lower):
-                subtopics.append(topic)
+        found = {match.lastgroup for match in self._subtopic_regex.finditer(question.question.lower())}
 
-        return subtopics[:3]  # Max 3 subtopics
+        # Config order, not order of appearance
+        ranked = sorted(found, key=self._subtopic_rank.__getitem__)
+        return [self._subtopic_of_group[group] for group in ranked[:3]]  # Max 3 subtopics
 
     def validate_rag_readiness(self, question: Question) -> Dict[str, any]:
         """Check if question is optimized for RAG"""
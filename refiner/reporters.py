@@ -59,15 +59,15 @@ class ReportGenerator:
         if validation['failed'] > 0:
             report.append("QUESTIONS NEEDING REFINEMENT")
             report.append("-" * 40)
-            for failed in validation['failed_questions'][:10]:  # Top 10
+            for failed in validation['failed_questions'][:10]:  # 10 worst
                 report.append(f"  [{failed['id']}] Score: {failed['score']:.2f}")
                 report.append(f"    {failed['question']}")
                 if failed['top_issue']:
                     report.append(f"    Issue: {failed['top_issue']['criterion']} (score: {failed['top_issue']['score']:.2f})")
                 report.append("")
 
-            if len(validation['failed_questions']) > 10:
-                report.append(f"  ... and {len(validation['failed_questions']) - 10} more")
+            if validation['failed'] > 10:
+                report.append(f"  ... and {validation['failed'] - 10} more")
                 report.append("")
 
         report.append("=" * 60)
@@ -164,7 +164,8 @@ class ReportGenerator:
             "passed": validation["passed"],
             "failed": validation["failed"],
             "pass_rate": round(100 * validation["passed"] / validation["total"], 2),
-            "distribution": validation["distribution"]
+            "distribution": validation["distribution"],
+            "quantiles": validation["quantiles"]
         }
 
         # Save to file
@@ -0,0 +1,207 @@
+"""
+Stratified Sampler - Estimate bank quality from a sample in one streaming pass
+"""
+
+import math
+import random
+from statistics import NormalDist
+from typing import Any, Dict, Iterable, List, Tuple
+
+from .parser import Question
+from .stats import DISTRIBUTION_BUCKETS, bucket_for
+
+Stratum = Tuple[str, str, str]
+
+
+def stratum_key(question: Question) -> Stratum:
+    """Stratum of a question: (topic, difficulty, style)"""
+    return (question.topic, question.difficulty, question.style)
+
+
+class StratifiedSampler:
+    """Uniform sample of `sample_size` questions, post-stratified by topic × difficulty × style
+
+    One reservoir (Algorithm R) holds the sample, so memory is bounded
+    by `sample_size` however many strata the bank has, while population
+    counts are tallied per stratum. Each stratum then receives the
+    sampled questions that fall in it, proportional to its size in
+    expectation. Strata too sparse to estimate a variance from are
+    collapsed with their neighbours by estimate_from_sample.
+    """
+
+    def __init__(self, sample_size: int, seed: int = 0):
+        if sample_size < 1:
+            raise ValueError("sample_size must be at least 1")
+        self.sample_size = sample_size
+        self.seed = seed
+
+    @staticmethod
+    def z_score(confidence: float) -> float:
+        """Two-sided normal critical value for `confidence` (e.g. 0.95 -> 1.96)"""
+        if not 0 < confidence < 1:
+            raise ValueError("confidence must be between 0 and 1")
+        return NormalDist().inv_cdf((1 + confidence) / 2)
+
+    @classmethod
+    def sample_size_for(cls, confidence: float, margin: float) -> int:
+        """Sample size bounding a proportion's margin of error (worst case p = 0.5)"""
+        if margin <= 0:
+            raise ValueError("margin must be positive")
+        return math.ceil((cls.z_score(confidence) / (2 * margin)) ** 2)
+
+    def sample(self, questions: Iterable[Question]) -> Dict[Stratum, Tuple[int, List[Question]]]:
+        """
+        One pass over `questions`
+        Returns: {stratum: (population_count, sampled_questions)} for every
+        stratum seen, with min(sample_size, population) questions in total
+        """
+
+        rng = random.Random(self.seed)
+        counts: Dict[Stratum, int] = {}
+        reservoir: List[Tuple[Stratum, Question]] = []
+
+        for seen, q in enumerate(questions, 1):
+            key = stratum_key(q)
+            counts[key] = counts.get(key, 0) + 1
+
+            if len(reservoir) < self.sample_size:
+                reservoir.append((key, q))
+            else:
+                j = rng.randrange(seen)
+                if j < self.sample_size:
+                    reservoir[j] = (key, q)
+
+        strata = {key: (counts[key], []) for key in sorted(counts)}
+        for key, q in reservoir:
+            strata[key][1].append(q)
+        return strata
+
+
+def collapse_strata(strata: Dict[Stratum, Tuple[int, List[Any]]]) -> List[Tuple[int, List[Any]]]:
+    """
+    Merge strata with fewer than two sampled items into their neighbours
+    (in stratum order), so every group has a within-group variance. Strata
+    with nothing sampled are represented through the group they join.
+    Returns: [(population_count, sample)] per group
+    """
+
+    groups: List[Tuple[int, List[Any]]] = []
+    count, sample = 0, []
+    for key in sorted(strata):
+        stratum_count, stratum_sample = strata[key]
+        count += stratum_count
+        sample = sample + list(stratum_sample)
+        if len(sample) >= 2:
+            groups.append((count, sample))
+            count, sample = 0, []
+
+    if count:
+        if groups:
+            last_count, last_sample = groups.pop()
+            groups.append((last_count + count, last_sample + sample))
+        else:
+            groups.append((count, sample))
+    return groups
+
+
+def wilson_interval(p: float, n: float, z: float) -> Tuple[float, float]:
+    """Wilson score interval for a proportion `p` observed over `n` (possibly effective) trials"""
+    if n <= 0:
+        return 0.0, 1.0
+    z2 = z * z
+    denominator = 1 + z2 / n
+    center = (p + z2 / (2 * n)) / denominator
+    half = z * math.sqrt(p * (1 - p) / n + z2 / (4 * n * n)) / denominator
+    return max(0.0, center - half), min(1.0, center + half)
+
+
+def estimate_from_sample(strata: Dict[Stratum, Tuple[int, List[Dict[str, float]]]],
+                         threshold: float, confidence: float = 0.95) -> Dict[str, Any]:
+    """
+    Stratified estimates of pass rate, distribution and average score
+    `strata` maps each stratum to (population_count, scores of its sample).
+    Strata with fewer than two scores are collapsed with their neighbours
+    (collapse_strata). The average score gets a normal interval with
+    finite population correction; shares get Wilson intervals over the
+    effective sample size (sample size over design effect), so a share
+    observed as 0 or 1 still gets an interval unless the whole bank was
+    scored.
+    Returns: validate_batch-style summary with 'estimated' intervals
+    """
+
+    z = StratifiedSampler.z_score(confidence)
+    population = sum(count for count, scores in strata.values())
+    sampled = sum(len(scores) for count, scores in strata.values())
+    census = sampled >= population
+
+    # Per-proportion [estimate, variance] accumulators
+    names = ["passed"] + [name for name, lower in DISTRIBUTION_BUCKETS]
+    shares = {name: [0.0, 0.0] for name in names}
+    mean = [0.0, 0.0]
+
+    for count, scores in collapse_strata(strata):
+        n = len(scores)
+        if not n or not population:
+            continue
+        weight = count / population
+        fpc = max(0.0, 1 - n / count)
+
+        hits = {name: 0 for name in names}
+        overall = [s["overall"] for s in scores]
+        for score in overall:
+            hits[bucket_for(score)] += 1
+            if score >= threshold:
+                hits["passed"] += 1
+
+        for name, hit in hits.items():
+            p = hit / n
+            shares[name][0] += weight * p
+            shares[name][1] += weight * weight * fpc * p * (1 - p) / (n - 1 if n > 1 else 1)
+
+        stratum_mean = sum(overall) / n
+        if n > 1:
+            variance = sum((x - stratum_mean) ** 2 for x in overall) / (n - 1)
+        else:
+            # A single score says nothing about spread: assume the widest
+            variance = 2.5 ** 2 if fpc else 0.0
+        mean[0] += weight * stratum_mean
+        mean[1] += weight * weight * fpc * variance / n
+
+    def interval(estimate: float, variance: float) -> Dict[str, float]:
+        half = z * math.sqrt(variance)
+        return {
+            "estimate": round(estimate, 4),
+            "low": round(max(0.0, estimate - half), 4),
+            "high": round(min(5.0, estimate + half), 4)
+        }
+
+    def share_interval(estimate: float, variance: float) -> Dict[str, float]:
+        if census:
+            low = high = estimate
+        else:
+            binomial = estimate * (1 - estimate) / sampled
+            effective = sampled * binomial / variance if variance > 0 and binomial > 0 else sampled
+            low, high = wilson_interval(estimate, effective, z)
+        return {
+            "estimate": round(estimate, 4),
+            "low": round(min(low, estimate), 4),
+            "high": round(max(high, estimate), 4)
+        }
+
+    pass_rate = share_interval(*shares["passed"])
+    return {
+        "total": population,
+        "sample_size": sampled,
+        "strata": len(strata),
+        "confidence": confidence,
+        "threshold": threshold,
+        "average_score": interval(*mean),
+        "pass_rate": pass_rate,
+        "passed": round(pass_rate["estimate"] * population),
+        "distribution": {
+            name: round(shares[name][0] * population) for name, lower in DISTRIBUTION_BUCKETS
+        },
+        "distribution_share": {
+            name: share_interval(*shares[name]) for name, lower in DISTRIBUTION_BUCKETS
+        }
+    }
@@ -0,0 +1,181 @@
+"""
+Refinement Scheduler - Time-boxed "anytime" refinement, worst questions first
+"Small fixes, big clarity" - Quest & Crossfire
+"""
+
+import heapq
+import json
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from .parser import Question
+from .transformers import (
+    QuestionTransformer,
+    new_batch_results,
+    record_outcome,
+    finish_batch_results,
+)
+from .validators import QualityValidator
+
+
+class StrategyStats:
+    """Running improvement and CPU cost per strategy"""
+
+    # Used until a strategy has been observed
+    PRIOR_GAIN = 0.1
+    PRIOR_COST_SEC = 0.005
+
+    def __init__(self):
+        self.gain: Dict[str, List[float]] = {}   # strategy -> [sum, count]
+        self.cost: List[float] = [0.0, 0]         # seconds per strategy pass: [sum, count]
+
+    def observe(self, strategy: str, improvement: float):
+        """Record one applied strategy's score improvement"""
+        entry = self.gain.setdefault(strategy, [0.0, 0])
+        entry[0] += improvement
+        entry[1] += 1
+
+    def observe_cost(self, seconds: float):
+        """Record the time one strategy pass took"""
+        self.cost[0] += seconds
+        self.cost[1] += 1
+
+    def seed_from_history(self, questions: List[Question]):
+        """Learn from refinement_history already recorded in the bank"""
+        for q in questions:
+            for entry in q.refinement_history:
+                improvement = entry.get("score_improvement")
+                if entry.get("strategy") and improvement is not None:
+                    self.observe(entry["strategy"], improvement)
+
+    def mean_gain(self, strategy: str) -> float:
+        total, count = self.gain.get(strategy, (0.0, 0))
+        return total / count if count else self.PRIOR_GAIN
+
+    def mean_cost(self) -> float:
+        total, count = self.cost
+        return total / count if count else self.PRIOR_COST_SEC
+
+    def save(self, path: str):
+        """Persist stats so later runs start from them"""
+        Path(path).write_text(json.dumps({"gain": self.gain, "cost": self.cost}, indent=2))
+
+    @classmethod
+    def load(cls, path: str) -> "StrategyStats":
+        stats = cls()
+        if Path(path).exists():
+            data = json.loads(Path(path).read_text())
+            stats.gain = {k: list(v) for k, v in data.get("gain", {}).items()}
+            stats.cost = list(data.get("cost", stats.cost))
+        return stats
+
+
+class RefinementScheduler:
+    """Refine failing questions within a time budget, highest expected gain per cost first
+
+    The bank is scored in one streaming pass (the deadline applies to this
+    pass too). Each failing question is keyed in a max-heap by expected gain
+    (mean historical improvement of the strategies that address its issues)
+    per unit of expected cost (one strategy pass per applicable strategy, up
+    to max_iterations). Keys are re-checked lazily as stats are updated
+    during the run. When the budget runs out, whatever has been refined so
+    far is kept in the list.
+
+    Scoring may use at most SETUP_SHARE of the budget; questions not scored
+    by then are left for the next run, so a short budget still refines the
+    worst of the questions it got to.
+    """
+
+    SETUP_SHARE = 0.5
+
+    def __init__(self, transformer: QuestionTransformer, validator: QualityValidator,
+                 stats: Optional[StrategyStats] = None):
+        self.transformer = transformer
+        self.validator = validator
+        self.stats = stats or StrategyStats()
+
+    @staticmethod
+    def expected_passes(strategies: List[str], max_iterations: int) -> int:
+        """Strategy passes refining a question is expected to take"""
+        return max(1, min(len(strategies), max_iterations))
+
+    def expected_gain(self, strategies: List[str], scores: Dict[str, float], max_iterations: int) -> float:
+        """Expected score gain from applying `strategies`, capped at the 5.0 ceiling"""
+        strategies = strategies or ["_generic_enhancement"]
+        gain = sum(self.stats.mean_gain(name.lstrip('_')) for name in strategies[:max_iterations])
+        return max(0.0, min(gain, 5.0 - scores["overall"]))
+
+    def priority(self, strategies: List[str], scores: Dict[str, float], max_iterations: int) -> float:
+        """Expected gain per second of expected cost"""
+        cost = self.stats.mean_cost() * self.expected_passes(strategies, max_iterations)
+        return self.expected_gain(strategies, scores, max_iterations) / cost
+
+    def run(self, questions: List[Question], time_budget: float, threshold: Optional[float] = None,
+            max_iterations: Optional[int] = None,
+            on_refined: Optional[Callable[[int, Question], None]] = None) -> Dict[str, Any]:
+        """
+        Refine `questions` in place until done or `time_budget` seconds have passed
+        `on_refined(index, question)` is called after each accepted refinement.
+        Returns batch_transform-style statistics plus 'pending' (failing or not
+        yet scored questions left) and 'timed_out'.
+        """
+
+        started = time.monotonic()
+        deadline = started + time_budget
+        setup_deadline = started + self.SETUP_SHARE * time_budget
+        if threshold is None:
+            threshold = self.validator.threshold
+        if max_iterations is None:
+            max_iterations = self.transformer.max_iterations
+
+        analyzer = self.transformer.analyzer
+        results = new_batch_results(len(questions))
+        timed_out = False
+
+        # Heap entries: (-priority, index, scores, strategies)
+        heap = []
+        scored = 0
+        for i, q in enumerate(questions):
+            if time.monotonic() >= setup_deadline:
+                timed_out = True
+                break
+            scored += 1
+            scores = analyzer.analyze(q)
+            if scores["overall"] >= threshold:
+                results["unchanged"] += 1
+                continue
+            strategies = self.transformer.applicable_strategies(q, scores)
+            heap.append((-self.priority(strategies, scores, max_iterations), i, scores, strategies))
+        heapq.heapify(heap)
+
+        while heap:
+            if time.monotonic() >= deadline:
+                timed_out = True
+                break
+
+            neg_priority, i, scores, strategies = heapq.heappop(heap)
+            q = questions[i]
+
+            # Lazy re-keying: stats may have changed since this entry was pushed
+            priority = self.priority(strategies, scores, max_iterations)
+            if heap and priority < -heap[0][0]:
+                heapq.heappush(heap, (-priority, i, scores, strategies))
+                continue
+
+            started = time.process_time()
+            outcome = self.transformer.refine(q, max_iterations=max_iterations, threshold=threshold, scores=scores)
+            self.stats.observe_cost((time.process_time() - started) / self.expected_passes(strategies, max_iterations))
+
+            refined = outcome[0]
+            for entry in refined.refinement_history[len(q.refinement_history):]:
+                self.stats.observe(entry["strategy"], entry["score_improvement"])
+
+            if record_outcome(results, outcome):
+                self.transformer.keep(questions, i, refined)
+                if on_refined:
+                    on_refined(i, refined)
+
+        results["pending"] = len(heap) + len(questions) - scored
+        results["timed_out"] = timed_out
+        return finish_batch_results(results)
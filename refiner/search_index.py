@@ -0,0 +1,325 @@
+"""
+Search Index - In-process BM25 inverted index over the question bank
+"""
+
+import json
+import re
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .parser import Question
+from .keywords import STOP_WORDS
+from .incremental import GrowableArray, IncrementalIndex
+
+_TOKEN = re.compile(r'\b\w\w+\b')
+
+
+def index_tokens(text: str) -> List[str]:
+    """Lowercased search tokens (2+ chars, stop words removed)"""
+    return [w for w in _TOKEN.findall(text.lower()) if w not in STOP_WORDS]
+
+
+def question_tokens(question: Question) -> List[str]:
+    """Tokens a question is indexed under: its text, keywords and subtopics"""
+    parts = [question.question]
+    parts.extend(question.keywords or [])
+    parts.extend(question.subtopics or [])
+    return index_tokens(" ".join(parts))
+
+
+def _term_counts(tokens: List[str], vocabulary: Dict[str, int]) -> Dict[int, int]:
+    counts: Dict[int, int] = {}
+    for token in tokens:
+        term = vocabulary.setdefault(token, len(vocabulary))
+        counts[term] = counts.get(term, 0) + 1
+    return counts
+
+
+def _postings_arrays(terms: np.ndarray, docs: np.ndarray, tf: np.ndarray,
+                     vocabulary: Dict[str, int]) -> Tuple[Dict[str, Tuple[int, int]], np.ndarray, np.ndarray]:
+    """Sort (term, doc, tf) triples into flat posting arrays and term slices"""
+    order = np.lexsort((docs, terms))
+    post_docs = docs[order].astype(np.int32)
+    post_tf = np.minimum(tf[order], np.iinfo(np.uint16).max).astype(np.uint16)
+
+    bounds = np.searchsorted(terms[order], np.arange(len(vocabulary) + 1))
+    slices = {
+        token: (int(bounds[term]), int(bounds[term + 1]))
+        for token, term in vocabulary.items()
+        if bounds[term + 1] > bounds[term]
+    }
+    return slices, post_docs, post_tf
+
+
+class InvertedIndex(IncrementalIndex):
+    """BM25-ranked inverted index with compact posting lists
+
+    Postings for all terms live in two flat arrays (doc numbers as int32,
+    term frequencies as uint16); each term maps to its (start, end) slice,
+    with doc numbers ascending. On disk, doc numbers are delta-encoded and
+    the arrays compressed (np.savez_compressed).
+
+    Upserted questions go to a small in-memory delta segment until the
+    next compaction merges them (see IncrementalIndex).
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+
+        self.doc_lengths = GrowableArray(np.int32)
+        self.terms: Dict[str, Tuple[int, int]] = {}
+        self.post_docs = np.zeros(0, dtype=np.int32)
+        self.post_tf = np.zeros(0, dtype=np.uint16)
+
+        # Unmerged postings: term -> ([doc numbers], [term frequencies])
+        self._delta: Dict[str, Tuple[List[int], List[int]]] = {}
+        self._live_length = 0
+        self._init_incremental()
+
+    def __len__(self) -> int:
+        return self.live_count
+
+    @classmethod
+    def build(cls, questions: Iterable[Question], k1: float = 1.5, b: float = 0.75) -> "InvertedIndex":
+        """Index `questions` (any iterable) in one pass"""
+        index = cls(k1=k1, b=b)
+
+        vocabulary: Dict[str, int] = {}
+        doc_ids: List[str] = []
+        term_col: List[int] = []
+        doc_col: List[int] = []
+        tf_col: List[int] = []
+        lengths: List[int] = []
+
+        for doc, q in enumerate(questions):
+            doc_ids.append(q.id)
+            tokens = question_tokens(q)
+            lengths.append(len(tokens))
+
+            for term, tf in _term_counts(tokens, vocabulary).items():
+                term_col.append(term)
+                doc_col.append(doc)
+                tf_col.append(tf)
+
+        index._install({
+            "doc_ids": doc_ids,
+            "lengths": np.asarray(lengths, dtype=np.int32),
+            **dict(zip(("terms", "post_docs", "post_tf"), _postings_arrays(
+                np.asarray(term_col, dtype=np.int64),
+                np.asarray(doc_col, dtype=np.int64),
+                np.asarray(tf_col, dtype=np.int64),
+                vocabulary
+            )))
+        })
+        return index
+
+    def postings(self, term: str) -> Tuple[np.ndarray, np.ndarray]:
+        """(doc numbers, term frequencies) for one term, live documents only"""
+        start, end = self.terms.get(term, (0, 0))
+        docs, tf = self.post_docs[start:end], self.post_tf[start:end]
+
+        if term in self._delta:
+            delta_docs, delta_tf = self._delta[term]
+            docs = np.concatenate((docs, np.asarray(delta_docs, dtype=np.int32)))
+            tf = np.concatenate((tf, np.asarray(delta_tf, dtype=np.uint16)))
+
+        if self._dead and docs.size:
+            keep = self.live.data[docs]
+            docs, tf = docs[keep], tf[keep]
+        return docs, tf
+
+    def document_frequency(self, term: str) -> int:
+        return self.postings(term)[0].size
+
+    def _idf(self, df: int) -> float:
+        n = self.live_count
+        return float(np.log(1 + (n - df + 0.5) / (df + 0.5)))
+
+    def search(self, query: str, k: int = 10) -> List[Tuple[str, float]]:
+        """
+        BM25 top-k for a free-text query
+        Returns: [(question_id, score)] best first (ties by index order)
+        """
+        with self._lock:
+            docs, scores = self._score(index_tokens(query))
+            if not docs.size or k <= 0:
+                return []
+
+            if docs.size > k:
+                top = np.argpartition(-scores, k - 1)[:k]
+                docs, scores = docs[top], scores[top]
+            order = np.lexsort((docs, -scores))
+
+            return [(self.doc_ids[d], round(float(s), 4)) for d, s in zip(docs[order], scores[order])]
+
+    def _score(self, tokens: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """Matching doc numbers and their summed BM25 scores"""
+        if not self.live_count:
+            return np.zeros(0, dtype=np.int32), np.zeros(0)
+
+        avg_length = self._live_length / self.live_count or 1.0
+        lengths = self.doc_lengths.data
+        doc_parts, score_parts = [], []
+
+        for term in dict.fromkeys(tokens):
+            docs, tf = self.postings(term)
+            if not docs.size:
+                continue
+            tf = tf.astype(np.float64)
+            norm = self.k1 * (1 - self.b + self.b * lengths[docs] / avg_length)
+            doc_parts.append(docs)
+            score_parts.append(self._idf(docs.size) * tf * (self.k1 + 1) / (tf + norm))
+
+        if not doc_parts:
+            return np.zeros(0, dtype=np.int32), np.zeros(0)
+
+        docs, inverse = np.unique(np.concatenate(doc_parts), return_inverse=True)
+        return docs, np.bincount(inverse, weights=np.concatenate(score_parts))
+
+    def docs_with_any(self, terms: Iterable[str]) -> np.ndarray:
+        """Doc numbers containing any of `terms` (whole tokens, not substrings)"""
+        with self._lock:
+            parts = [self.postings(t)[0] for t in terms]
+        parts = [p for p in parts if p.size]
+        return np.unique(np.concatenate(parts)) if parts else np.zeros(0, dtype=np.int32)
+
+    def docs_with_all(self, terms: Iterable[str]) -> np.ndarray:
+        """Doc numbers containing every one of `terms`"""
+        with self._lock:
+            postings = sorted((self.postings(t)[0] for t in set(terms)), key=len)
+        result: Optional[np.ndarray] = None
+        for docs in postings:
+            result = docs if result is None else np.intersect1d(result, docs, assume_unique=True)
+            if not result.size:
+                break
+        return result if result is not None else np.zeros(0, dtype=np.int32)
+
+    def ids(self, docs: np.ndarray) -> List[str]:
+        """Question ids for doc numbers"""
+        return [self.doc_ids[d] for d in docs.tolist()]
+
+    def _add_document(self, doc: int, question: Question):
+        tokens = question_tokens(question)
+        self.doc_lengths.append(len(tokens))
+        self._live_length += len(tokens)
+
+        counts: Dict[str, int] = {}
+        for token in tokens:
+            counts[token] = counts.get(token, 0) + 1
+        for token, tf in counts.items():
+            docs, tfs = self._delta.setdefault(token, ([], []))
+            docs.append(doc)
+            tfs.append(tf)
+
+    def _remove_document(self, doc: int):
+        self._live_length -= int(self.doc_lengths.data[doc])
+
+    def _snapshot(self) -> Dict[str, Any]:
+        return {
+            "doc_ids": list(self.doc_ids),
+            "lengths": self.doc_lengths.data,
+            "live": self.live.data.copy(),
+            "terms": self.terms,
+            "post_docs": self.post_docs,
+            "post_tf": self.post_tf,
+            "delta": {t: (list(d), list(f)) for t, (d, f) in self._delta.items()},
+        }
+
+    @staticmethod
+    def _compacted(snapshot: Dict[str, Any]) -> Dict[str, Any]:
+        live = snapshot["live"]
+        tokens = sorted(snapshot["terms"], key=lambda t: snapshot["terms"][t][0])
+        vocabulary = {token: term for term, token in enumerate(tokens)}
+        spans = np.asarray([snapshot["terms"][t] for t in tokens], dtype=np.int64).reshape(-1, 2)
+
+        term_parts = [np.repeat(np.arange(len(tokens)), spans[:, 1] - spans[:, 0])]
+        doc_parts = [snapshot["post_docs"].astype(np.int64)]
+        tf_parts = [snapshot["post_tf"].astype(np.int64)]
+        for token, (docs, tfs) in snapshot["delta"].items():
+            term = vocabulary.setdefault(token, len(vocabulary))
+            term_parts.append(np.full(len(docs), term, dtype=np.int64))
+            doc_parts.append(np.asarray(docs, dtype=np.int64))
+            tf_parts.append(np.asarray(tfs, dtype=np.int64))
+
+        terms, docs, tf = (np.concatenate(parts) for parts in (term_parts, doc_parts, tf_parts))
+        keep = live[docs]
+        renumber = np.cumsum(live) - 1
+
+        slices, post_docs, post_tf = _postings_arrays(terms[keep], renumber[docs[keep]], tf[keep], vocabulary)
+        return {
+            "doc_ids": [qid for qid, alive in zip(snapshot["doc_ids"], live.tolist()) if alive],
+            "lengths": snapshot["lengths"][live],
+            "terms": slices,
+            "post_docs": post_docs,
+            "post_tf": post_tf,
+        }
+
+    def _install(self, state: Dict[str, Any]):
+        self.terms = state["terms"]
+        self.post_docs = state["post_docs"]
+        self.post_tf = state["post_tf"]
+        self.doc_lengths = GrowableArray.from_array(np.asarray(state["lengths"], dtype=np.int32))
+        self._live_length = int(self.doc_lengths.data.sum())
+        self._delta = {}
+        self._reset_docs(state["doc_ids"])
+
+    def save(self, path: str):
+        """Persist the index (.npz, doc numbers delta-encoded per term)"""
+        if self.stale:
+            self.compact(wait=True)
+
+        with self._lock:
+            tokens = sorted(self.terms, key=lambda t: self.terms[t][0])
+            starts = np.asarray([self.terms[t][0] for t in tokens], dtype=np.int64)
+
+            deltas = self.post_docs.copy()
+            if deltas.size:
+                deltas[1:] -= self.post_docs[:-1]
+                # Each term's first doc number is stored as-is
+                deltas[starts] = self.post_docs[starts]
+
+            path = Path(path)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with path.open('wb') as f:
+                np.savez_compressed(
+                    f,
+                    meta=np.frombuffer(json.dumps({
+                        "k1": self.k1, "b": self.b,
+                        "doc_ids": self.doc_ids, "terms": tokens
+                    }, ensure_ascii=False).encode("utf-8"), dtype=np.uint8),
+                    starts=starts,
+                    deltas=deltas,
+                    tf=self.post_tf,
+                    doc_lengths=self.doc_lengths.data
+                )
+
+    @classmethod
+    def load(cls, path: str) -> "InvertedIndex":
+        with np.load(path) as data:
+            meta = json.loads(data["meta"].tobytes().decode("utf-8"))
+            starts = data["starts"]
+            deltas = data["deltas"]
+            post_tf = data["tf"]
+            lengths = data["doc_lengths"]
+
+        ends = np.append(starts[1:], deltas.size)
+        docs = deltas.astype(np.int64)
+        # Undo delta encoding within each term's slice
+        group = np.repeat(np.arange(starts.size), ends - starts)
+        cumulative = np.cumsum(docs)
+        offsets = np.concatenate(([0], cumulative[starts[1:] - 1])) if starts.size else np.zeros(0, dtype=np.int64)
+
+        index = cls(k1=meta["k1"], b=meta["b"])
+        index._install({
+            "doc_ids": meta["doc_ids"],
+            "lengths": lengths,
+            "terms": {
+                token: (int(s), int(e)) for token, s, e in zip(meta["terms"], starts.tolist(), ends.tolist())
+            },
+            "post_docs": (cumulative - offsets[group]).astype(np.int32),
+            "post_tf": post_tf,
+        })
+        return index
@@ -0,0 +1,289 @@
+"""
+Batch Statistics - Constant-memory, mergeable aggregation of validation scores
+"""
+
+import heapq
+import math
+from typing import Any, Dict, List, Tuple
+
+from .parser import Question
+from .analyzer import CRITERIA
+
+# Quality buckets: (name, lower bound), checked in order
+DISTRIBUTION_BUCKETS = (
+    ("excellent", 4.8),
+    ("very_good", 4.5),
+    ("good", 4.0),
+    ("adequate", 3.5),
+    ("needs_work", 3.0),
+    ("poor", float("-inf")),
+)
+
+# Criterion scores below this are reported as issues
+ISSUE_THRESHOLD = 4.5
+
+# Quantiles reported per criterion: (label, rank)
+QUANTILES = (("p5", 0.05), ("p50", 0.5), ("p95", 0.95))
+
+
+def bucket_for(score: float) -> str:
+    """Distribution bucket for an overall score"""
+    for name, lower in DISTRIBUTION_BUCKETS:
+        if score >= lower:
+            return name
+    return DISTRIBUTION_BUCKETS[-1][0]
+
+
+def criterion_issues(scores: Dict[str, float]) -> List[Dict[str, Any]]:
+    """Criteria holding a score down, in report order"""
+    return [
+        {"criterion": criterion, "score": score, "gap": round(ISSUE_THRESHOLD - score, 2)}
+        for criterion, score in scores.items()
+        if criterion != "overall" and score < ISSUE_THRESHOLD
+    ]
+
+
+class RunningStats:
+    """Online count/mean/variance/min/max (Welford), mergeable (Chan et al.)"""
+
+    __slots__ = ("count", "total", "mean", "m2", "min", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float):
+        self.count += 1
+        self.total += value
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other: "RunningStats"):
+        if not other.count:
+            return
+        if not self.count:
+            for name in self.__slots__:
+                setattr(self, name, getattr(other, name))
+            return
+
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.mean += delta * other.count / count
+        self.count = count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / self.count if self.count else 0.0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+    def summary(self) -> Dict[str, float]:
+        if not self.count:
+            return {"count": 0, "mean": 0.0, "std": 0.0, "min": 0.0, "max": 0.0}
+        return {
+            "count": self.count,
+            "mean": round(self.mean, 2),
+            "std": round(self.std, 2),
+            "min": round(self.min, 2),
+            "max": round(self.max, 2),
+        }
+
+
+class QuantileSketch:
+    """KLL quantile sketch: approximate ranks in O(k log n) memory, mergeable
+
+    Values enter level 0; when a level fills it is sorted and every other
+    value moves up one level with double weight. Upper levels get the
+    largest capacities, so rank error stays around 1.7/k of n. The
+    alternating offset (in place of a random coin) keeps results
+    reproducible.
+    """
+
+    __slots__ = ("k", "n", "levels", "_size", "_offset")
+
+    def __init__(self, k: int = 200):
+        self.k = k
+        self.n = 0
+        self.levels: List[List[float]] = [[]]
+        self._size = 0
+        self._offset = 0
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - level - 1
+        return max(2, int(math.ceil(self.k * (2 / 3) ** depth)))
+
+    def _max_size(self) -> int:
+        return sum(self._capacity(h) for h in range(len(self.levels)))
+
+    def add(self, value: float):
+        self.levels[0].append(value)
+        self.n += 1
+        self._size += 1
+        if self._size >= self._max_size():
+            self._compress()
+
+    def merge(self, other: "QuantileSketch"):
+        while len(self.levels) < len(other.levels):
+            self.levels.append([])
+        for level, items in zip(self.levels, other.levels):
+            level.extend(items)
+        self.n += other.n
+        self._size = sum(len(level) for level in self.levels)
+        while self._size >= self._max_size():
+            self._compress()
+
+    def _compress(self):
+        """Compact the lowest level that is over capacity"""
+        for h, items in enumerate(self.levels):
+            if len(items) < self._capacity(h):
+                continue
+            if h + 1 == len(self.levels):
+                self.levels.append([])
+
+            items.sort()
+            # An odd value out stays behind, so total weight is exact
+            keep = [items.pop()] if len(items) % 2 else []
+            self.levels[h + 1].extend(items[self._offset::2])
+            self._offset ^= 1
+
+            self._size -= len(items) - len(items) // 2
+            self.levels[h] = keep
+            return
+
+    def quantile(self, rank: float) -> float:
+        """Value at `rank` (0.0-1.0); 0.0 for an empty sketch"""
+        if not self.n:
+            return 0.0
+
+        weighted = sorted(
+            (value, 1 << h) for h, items in enumerate(self.levels) for value in items
+        )
+        target = rank * self.n
+        seen = 0
+        for value, weight in weighted:
+            seen += weight
+            if seen >= target:
+                return value
+        return weighted[-1][0]
+
+    def quantiles(self) -> Dict[str, float]:
+        """The QUANTILES labels mapped to their values"""
+        return {label: round(self.quantile(rank), 2) for label, rank in QUANTILES}
+
+
+class BatchAggregator:
+    """Streaming validation summary in constant memory
+
+    Tracks pass/fail counts, the distribution buckets, online mean and
+    variance of the overall score, per-criterion stats and quantile
+    sketches, and a bounded sample of the worst failures. Partial aggregators built over shards
+    combine with merge().
+    """
+
+    def __init__(self, threshold: float, sample_size: int = 100):
+        self.threshold = threshold
+        self.sample_size = sample_size
+
+        self.passed = 0
+        self.failed = 0
+        self.overall = RunningStats()
+        self.criteria = {criterion: RunningStats() for criterion in CRITERIA}
+        self.sketches = {name: QuantileSketch() for name in CRITERIA + ("overall",)}
+        self.distribution = {name: 0 for name, lower in DISTRIBUTION_BUCKETS}
+
+        # Worst failures as a max-heap on score: (-score, -seq, question, scores)
+        # seq is the failure's position, so ties keep the earlier question
+        self._worst: List[Tuple] = []
+
+    def add(self, question: Question, scores: Dict[str, float]):
+        """Add one scored question"""
+        score = scores["overall"]
+
+        self.overall.add(score)
+        for criterion, stats in self.criteria.items():
+            stats.add(scores[criterion])
+        for name, sketch in self.sketches.items():
+            sketch.add(scores[name])
+        self.distribution[bucket_for(score)] += 1
+
+        if score >= self.threshold:
+            self.passed += 1
+            return
+
+        self.failed += 1
+        if self.sample_size <= 0:
+            return
+
+        entry = (-score, -self.failed, question, scores)
+        if len(self._worst) < self.sample_size:
+            heapq.heappush(self._worst, entry)
+        elif -self._worst[0][0] > score:
+            heapq.heapreplace(self._worst, entry)
+
+    def merge(self, other: "BatchAggregator") -> "BatchAggregator":
+        """Fold the partial state of the shard that follows this one"""
+        # Renumber the other shard's failures to follow ours
+        offset = self.failed
+        for neg_score, neg_seq, q, scores in other._worst:
+            entry = (neg_score, neg_seq - offset, q, scores)
+            if len(self._worst) < self.sample_size:
+                heapq.heappush(self._worst, entry)
+            elif -self._worst[0][0] > -neg_score:
+                heapq.heapreplace(self._worst, entry)
+
+        self.passed += other.passed
+        self.failed += other.failed
+        self.overall.merge(other.overall)
+        for criterion, stats in self.criteria.items():
+            stats.merge(other.criteria[criterion])
+        for name, sketch in self.sketches.items():
+            sketch.merge(other.sketches[name])
+        for name, count in other.distribution.items():
+            self.distribution[name] += count
+
+        return self
+
+    def worst_failures(self) -> List[Tuple[Question, Dict[str, float]]]:
+        """Sampled failures, worst first: (question, scores)"""
+        ordered = sorted(self._worst, key=lambda e: (-e[0], -e[1]))
+        return [(q, scores) for neg_score, neg_seq, q, scores in ordered]
+
+    def report(self) -> Dict[str, Any]:
+        """Summary in the validate_batch report format"""
+        failed_questions = []
+        for q, scores in self.worst_failures():
+            issues = criterion_issues(scores)
+            failed_questions.append({
+                "id": q.id,
+                "question": q.question[:50] + "..." if len(q.question) > 50 else q.question,
+                "score": scores["overall"],
+                "top_issue": issues[0] if issues else None
+            })
+
+        return {
+            "total": self.overall.count,
+            "passed": self.passed,
+            "failed": self.failed,
+            "average_score": round(self.overall.total / self.overall.count, 2) if self.overall.count else 0.0,
+            "score_std": round(self.overall.std, 2),
+            "threshold": self.threshold,
+            "distribution": dict(self.distribution),
+            "criteria": {criterion: stats.summary() for criterion, stats in self.criteria.items()},
+            "quantiles": {name: sketch.quantiles() for name, sketch in self.sketches.items()},
+            "failed_questions": failed_questions
+        }
@@ -5,17 +5,89 @@ Question Transformer - Apply refinement strategies
 
 import re
 import random
-from typing import Dict, List, Tuple, Optional
+import hashlib
+import time
+from typing import Any, Callable, Dict, List, Mapping, Pattern, Tuple, Optional
 import yaml
-from .parser import Question
-from .analyzer import QuestionAnalyzer
+from .parser import Question, CandidateQuestion
+from .analyzer import QuestionAnalyzer, scoring_key, duplicate_key
+from .dedup import QuestionDeduplicator
+
+# Called with (question, new refinement_history entries) when a refinement is kept
+RefinementListener = Callable[[Question, List[Dict[str, Any]]], None]
+
+
+def _compile_words(words) -> Pattern:
+    """Compile whole-word, case-insensitive alternation over `words` (one scan per text)
+
+    Group wN matches the Nth word, so a match maps back to its word even
+    when case folding makes the matched text differ from it (e.g. "MİKE").
+    """
+    groups = [(f"w{i}", word) for i, word in enumerate(words)]
+    alternation = '|'.join(
+        f"(?P<{name}>{re.escape(word)})" for name, word in sorted(groups, key=lambda g: len(g[1]), reverse=True)
+    )
+    return re.compile(rf'\b(?:{alternation})\b', re.IGNORECASE)
+
+
+def _substitute(pattern: Pattern, table: Mapping[str, str], text: str) -> str:
+    """Replace every match of `pattern` with its value in `table`
+
+    `table` must have the words `pattern` was compiled from, in the same order.
+    """
+    replacements = list(table.values())
+    return pattern.sub(lambda m: replacements[int(m.lastgroup[1:])], text)
+
+
+# Abstract variable replacements, chosen by question context
+ABSTRACT_REPLACEMENTS = {
+    "default": {
+        'x': 'price',
+        'y': 'quantity',
+        'foo': 'calculate_total',
+        'bar': 'get_discount',
+        'num': 'score',
+        'test': 'validate_email',
+    },
+    "swap": {'x': 'current_price', 'y': 'new_price'},
+    "numbers": {'x': 'scores', 'y': 'grades'},
+    "variable": {'x': 'username', 'y': 'email'},
+}
+_ABSTRACT_PATTERNS = {
+    context: _compile_words(table) for context, table in ABSTRACT_REPLACEMENTS.items()
+}
+
+# Western-only names and their globally diverse alternatives
+DIVERSE_NAME_CHOICES = {
+    "alice": ["Priya", "Amara", "Sofia"],
+    "bob": ["Chen", "Kofi", "Ahmed"],
+    "john": ["Arjun", "Diego", "Kwame"],
+    "jane": ["Yuki", "Elena", "Fatima"],
+    "mike": ["Carlos", "Rashid", "Mei"],
+}
+_WESTERN_NAMES_PATTERN = _compile_words(DIVERSE_NAME_CHOICES)
 
 
 class QuestionTransformer:
     """Transform questions to improve quality"""
 
-    def __init__(self, config_path: str = "config.yaml"):
-        """Load configuration"""
+    # Strategies explored by search(), in tie-break order
+    SEARCH_STRATEGIES = (
+        "_expand_single_word",
+        "_replace_abstract_variables",
+        "_add_real_world_context",
+        "_diversify_names",
+        "_fix_blooms_alignment",
+        "_enhance_keywords",
+        "_add_practical_context",
+    )
+
+    def __init__(self, config_path: str = "config.yaml", seed: Optional[int] = None):
+        """Load configuration
+
+        `seed` (default: refinement.seed) fixes every random choice the
+        strategies make, so identical inputs always refine identically.
+        """
         with open(config_path, 'r') as f:
             self.config = yaml.safe_load(f)
 
@@ -24,14 +96,42 @@ class QuestionTransformer:
         self.realistic_vars = self.config['templates']['realistic_variables']
         self.contexts = self.config['templates']['real_world_contexts']
 
-    def transform(self, question: Question, auto: bool = False) -> Tuple[Question, str, float]:
+        refinement = self.config.get('refinement', {})
+        self.seed = refinement.get('seed', 0) if seed is None else seed
+        self.max_iterations = refinement.get('max_iterations', 1)
+        self.threshold = self.config['scoring']['threshold']
+
+        search = refinement.get('search', {})
+        self.beam_width = search.get('beam_width', 3)
+        self.max_depth = search.get('max_depth', 3)
+        self.budget_ms = search.get('budget_ms', 50)
+
+        self.listeners: List[RefinementListener] = []
+
+    def add_listener(self, listener: RefinementListener):
+        """Notify `listener` of every refinement this transformer keeps
+        (e.g. IncrementalIndex.on_refined to keep an index current)
+
+        transform/refine/search only propose refinements; a refinement is
+        kept (and listeners notified) by apply_transformation,
+        batch_transform, or a caller going through keep().
+        """
+        self.listeners.append(listener)
+
+    def keep(self, questions: List[Question], i: int, refined: Question):
+        """Keep `refined` in place of questions[i] and notify the listeners"""
+        keep_refinement(self.listeners, questions, i, refined)
+
+    def transform(self, question: Question, auto: bool = False,
+                  scores: Optional[Dict[str, float]] = None) -> Tuple[Question, str, float]:
         """
         Transform a question to improve quality
+        Pass `scores` when the question's current scores are already known.
         Returns: (transformed_question, strategy_used, score_improvement)
         """
 
         # Get current scores
-        current_scores = self.analyzer.analyze(question)
+        current_scores = scores or self.analyzer.analyze(question)
         current_overall = current_scores["overall"]
 
         # Identify issues by priority
@@ -43,42 +143,17 @@ class QuestionTransformer:
         # Apply highest priority transformation
         category, description, priority = issues[0]
 
-        transformed = Question(**question.to_dict())  # Deep copy
-        strategy = "unknown"
-
-        if category == "style" and "single-word" in description.lower():
-            transformed, strategy = self._expand_single_word(transformed)
-
-        elif category == "adult_learning" and "abstract" in description.lower():
-            transformed, strategy = self._replace_abstract_variables(transformed)
-
-        elif category == "adult_learning" and "real-world" in description.lower():
-            transformed, strategy = self._add_real_world_context(transformed)
-
-        elif category == "people_first" and "diverse names" in description.lower():
-            transformed, strategy = self._diversify_names(transformed)
-
-        elif category == "blooms":
-            transformed, strategy = self._fix_blooms_alignment(transformed)
-
-        elif category == "rag" and "keywords" in description.lower():
-            transformed, strategy = self._enhance_keywords(transformed)
-
-        elif category == "practical":
-            transformed, strategy = self._add_practical_context(transformed)
-
-        else:
-            # Generic enhancement
-            transformed, strategy = self._generic_enhancement(transformed)
+        candidate, strategy = self._strategy_for_issue(category, description)(CandidateQuestion(question))
 
         # Calculate score improvement
-        new_scores = self.analyzer.analyze(transformed)
+        new_scores = self.analyzer.analyze(candidate)
         new_overall = new_scores["overall"]
         improvement = round(new_overall - current_overall, 2)
 
         # Update refinement metadata
+        transformed = self._accept(question, candidate)
         transformed.update_from_refinement(
-            refined_question=transformed.question,
+            refined_question=candidate.question,
             strategy=strategy,
             score_improvement=improvement
         )
@@ -86,6 +161,309 @@ class QuestionTransformer:
 
         return transformed, strategy, improvement
 
+    def refine(self, question: Question, max_iterations: Optional[int] = None,
+               threshold: Optional[float] = None,
+               scores: Optional[Dict[str, float]] = None) -> Tuple[Question, List[str], float]:
+        """
+        Apply strategies repeatedly until the question passes `threshold`,
+        stops improving, or `max_iterations` passes have run
+        (defaults: scoring.threshold and refinement.max_iterations).
+
+        Each pass tries the issues in priority order and keeps the first
+        strategy that improves the score; the accepted step's scores seed
+        the next pass. Every accepted step is recorded in refinement_history.
+        Returns: (refined_question, strategies_applied, total_improvement)
+        """
+
+        if max_iterations is None:
+            max_iterations = self.max_iterations
+        if threshold is None:
+            threshold = self.threshold
+
+        scores = scores or self.analyzer.analyze(question)
+        start_overall = scores["overall"]
+
+        current = question
+        strategies = []
+
+        for iteration in range(1, max_iterations + 1):
+            if scores["overall"] >= threshold:
+                break
+
+            step = self._best_step(current, scores)
+            if step is None:
+                break  # Converged: no strategy improves the score
+
+            candidate, strategy, new_scores = step
+            improvement = round(new_scores["overall"] - scores["overall"], 2)
+
+            accepted = self._accept(current, candidate)
+            accepted.update_from_refinement(
+                refined_question=candidate.question,
+                strategy=strategy,
+                score_improvement=improvement,
+                iteration=iteration
+            )
+            accepted.quality_scores = new_scores
+
+            current, scores = accepted, new_scores
+            strategies.append(strategy)
+
+        return current, strategies, round(scores["overall"] - start_overall, 2)
+
+    def search(self, question: Question, beam_width: Optional[int] = None,
+               max_depth: Optional[int] = None, budget_ms: Optional[float] = None,
+               threshold: Optional[float] = None,
+               scores: Optional[Dict[str, float]] = None) -> Tuple[Question, List[str], float]:
+        """
+        Beam search over sequences of SEARCH_STRATEGIES
+
+        Each level extends every beam entry with each strategy that addresses
+        one of its current issues, and keeps the `beam_width` best-scoring
+        candidates. Candidates are scored through
+        the analyzer's cache, and content already reached by another sequence
+        (including no-op strategies) is pruned. Stops at `max_depth`, when the
+        best candidate meets `threshold`, or when `budget_ms` of CPU time is
+        spent (defaults: refinement.search and scoring.threshold).
+        Returns: (best_question, strategy_sequence, total_improvement)
+        """
+
+        if beam_width is None:
+            beam_width = self.beam_width
+        if max_depth is None:
+            max_depth = self.max_depth
+        if budget_ms is None:
+            budget_ms = self.budget_ms
+        if threshold is None:
+            threshold = self.threshold
+
+        root_scores = scores or self.analyzer.analyze_cached(question)
+        deadline = time.process_time() + budget_ms / 1000.0
+
+        # Beam entries: (overall, steps, candidate, scores)
+        # steps: tuple of (strategy, question_text, overall) per applied strategy
+        root = (root_scores["overall"], (), question, root_scores)
+        beam = [root]
+        best = root
+        seen = {scoring_key(question)}
+        out_of_budget = False
+
+        for depth in range(max_depth):
+            if best[0] >= threshold or out_of_budget:
+                break
+
+            candidates = []
+            for overall, steps, q, q_scores in beam:
+                for name in self.applicable_strategies(q, q_scores):
+                    if time.process_time() > deadline:
+                        out_of_budget = True
+                        break
+
+                    candidate, strategy = getattr(self, name)(CandidateQuestion(q))
+                    key = scoring_key(candidate)
+                    if key in seen:
+                        continue
+                    seen.add(key)
+
+                    new_scores = self.analyzer.analyze_cached(candidate)
+                    new_overall = new_scores["overall"]
+                    candidates.append((
+                        new_overall,
+                        steps + ((strategy, candidate.question, new_overall),),
+                        candidate,
+                        new_scores
+                    ))
+
+                if out_of_budget:
+                    break
+
+            if not candidates:
+                break
+
+            candidates.sort(key=lambda c: c[0], reverse=True)
+            beam = candidates[:beam_width]
+            if beam[0][0] > best[0]:
+                best = beam[0]
+
+        best_overall, steps, result, result_scores = best
+        if not steps:
+            return question, [], 0.0
+
+        # Replay the winning sequence into refinement_history
+        result = self._accept(question, result)
+        previous = root_scores["overall"]
+        for iteration, (strategy, text, overall) in enumerate(steps, 1):
+            result.update_from_refinement(
+                refined_question=text,
+                strategy=strategy,
+                score_improvement=round(overall - previous, 2),
+                iteration=iteration
+            )
+            previous = overall
+        result.quality_scores = result_scores
+
+        return result, [step[0] for step in steps], round(best_overall - root_scores["overall"], 2)
+
+    def suggest_transformations(self, question: Question,
+                                scores: Optional[Dict[str, float]] = None) -> List[Dict[str, Any]]:
+        """
+        Rank the strategies that address the question's current issues by projected score
+        Only strategies that improve the score are returned, best first. Each
+        suggestion holds 'strategy', 'projected_score', 'improvement',
+        'scores' and the trial 'candidate' (pass it to apply_transformation).
+        """
+
+        scores = scores or self.analyzer.analyze_cached(question)
+        suggestions = []
+
+        for name in self.applicable_strategies(question, scores):
+            candidate, strategy = getattr(self, name)(CandidateQuestion(question))
+            new_scores = self.analyzer.analyze_cached(candidate)
+            improvement = round(new_scores["overall"] - scores["overall"], 2)
+
+            if improvement > 0:
+                suggestions.append({
+                    "strategy": strategy,
+                    "projected_score": new_scores["overall"],
+                    "improvement": improvement,
+                    "scores": new_scores,
+                    "candidate": candidate,
+                })
+
+        # Stable sort keeps SEARCH_STRATEGIES order among ties
+        suggestions.sort(key=lambda s: s["projected_score"], reverse=True)
+        return suggestions
+
+    def suggest_transformations_batch(self, questions: List[Question],
+                                      scores: Optional[List[Dict[str, float]]] = None,
+                                      threshold: Optional[float] = None) -> List[List[Dict[str, Any]]]:
+        """
+        suggest_transformations for a whole bank
+        Scores are computed per language group when not given, questions at
+        or above `threshold` get no suggestions, and duplicates share one
+        computation. Returns suggestion lists in input order.
+        """
+
+        if threshold is None:
+            threshold = self.threshold
+        if scores is None:
+            scores = self.analyzer.analyze_batch(questions, dedupe=True)
+
+        computed: Dict[Tuple, List[Dict[str, Any]]] = {}
+        results = []
+
+        for q, q_scores in zip(questions, scores):
+            if q_scores["overall"] >= threshold:
+                results.append([])
+                continue
+
+            key = duplicate_key(q, include_topic=True)
+            if key not in computed:
+                computed[key] = self.suggest_transformations(q, q_scores)
+            results.append(list(computed[key]))
+
+        return results
+
+    def apply_transformation(self, question: Question, suggestion: Dict[str, Any]) -> bool:
+        """
+        Apply a suggestion from suggest_transformations to `question` in place
+        Works for any question with the same content as the one the
+        suggestion was made for. Returns True if the question changed.
+        """
+
+        changes = suggestion["candidate"].changes()
+        if not changes:
+            return False
+        since = len(question.refinement_history)
+
+        refined_question = changes.pop("question", question.question)
+        for name, value in changes.items():
+            setattr(question, name, list(value) if isinstance(value, list) else value)
+
+        question.update_from_refinement(
+            refined_question=refined_question,
+            strategy=suggestion["strategy"],
+            score_improvement=suggestion["improvement"]
+        )
+        question.quality_scores = dict(suggestion["scores"])
+        notify_refined(self.listeners, question, since)
+
+        return True
+
+    def applicable_strategies(self, question: Question, scores: Dict[str, float]) -> List[str]:
+        """SEARCH_STRATEGIES that address at least one current issue, in tie-break order"""
+
+        wanted = {
+            self._strategy_for_issue(category, description).__name__
+            for category, description, priority in self.analyzer.identify_issues(question, scores)
+        }
+        return [name for name in self.SEARCH_STRATEGIES if name in wanted]
+
+    def _best_step(self, question: Question, scores: Dict[str, float]) -> Optional[Tuple[Question, str, Dict[str, float]]]:
+        """Try strategies for each issue in priority order; return the first that improves the score"""
+
+        tried = set()
+
+        for category, description, priority in self.analyzer.identify_issues(question, scores):
+            strategy_fn = self._strategy_for_issue(category, description)
+            if strategy_fn.__name__ in tried:
+                continue
+            tried.add(strategy_fn.__name__)
+
+            candidate, strategy = strategy_fn(CandidateQuestion(question))
+            new_scores = self.analyzer.analyze(candidate)
+
+            if new_scores["overall"] > scores["overall"]:
+                return candidate, strategy, new_scores
+
+        return None
+
+    @staticmethod
+    def _accept(original: Question, candidate: CandidateQuestion) -> Question:
+        """Materialize an accepted candidate, with question text reset to the
+        original so update_from_refinement records the old and new text"""
+        accepted = candidate.materialize()
+        accepted.question = original.question
+        return accepted
+
+    def _strategy_for_issue(self, category: str, description: str) -> Callable[[Question], Tuple[Question, str]]:
+        """Pick the transformation strategy that addresses an issue"""
+
+        description = description.lower()
+
+        if category == "style" and "single-word" in description:
+            return self._expand_single_word
+
+        elif category == "adult_learning" and "abstract" in description:
+            return self._replace_abstract_variables
+
+        elif category == "adult_learning" and "real-world" in description:
+            return self._add_real_world_context
+
+        elif category == "people_first" and "diverse names" in description:
+            return self._diversify_names
+
+        elif category == "blooms":
+            return self._fix_blooms_alignment
+
+        elif category == "rag" and "keywords" in description:
+            return self._enhance_keywords
+
+        elif category == "practical":
+            return self._add_practical_context
+
+        # Generic enhancement
+        return self._generic_enhancement
+
+    def _rng_for(self, q: Question) -> random.Random:
+        """Per-question RNG derived from the run seed and the question's content
+
+        Seeded from scoring content rather than the id, so duplicates of the
+        same question make the same choices regardless of worker or order.
+        """
+        digest = hashlib.sha256(f"{self.seed}|{scoring_key(q)!r}".encode('utf-8')).digest()
+        return random.Random(int.from_bytes(digest[:8], 'big'))
+
     def _expand_single_word(self, q: Question) -> Tuple[Question, str]:
         """Expand single-word questions to full questions"""
 
@@ -124,35 +502,26 @@ class QuestionTransformer:
     def _replace_abstract_variables(self, q: Question) -> Tuple[Question, str]:
         """Replace abstract variables (x, y, foo, bar) with realistic names"""
 
-        text = q.question
+        text_lower = q.question.lower()
 
         # Map abstract to realistic based on context
-        replacements = {
-            'x': 'price',
-            'y': 'quantity',
-            'foo': 'calculate_total',
-            'bar': 'get_discount',
-            'num': 'score',
-            'test': 'validate_email',
-        }
-
-        # Smarter replacement based on context
-        if 'swap' in text.lower():
-            replacements = {'x': 'current_price', 'y': 'new_price'}
-        elif 'list' in text.lower() or 'number' in text.lower():
-            replacements = {'x': 'scores', 'y': 'grades'}
-        elif 'variable' in text.lower():
-            replacements = {'x': 'username', 'y': 'email'}
+        if 'swap' in text_lower:
+            context = "swap"
+        elif 'list' in text_lower or 'number' in text_lower:
+            context = "numbers"
+        elif 'variable' in text_lower:
+            context = "variable"
+        else:
+            context = "default"
 
-        for old, new in replacements.items():
-            text = re.sub(rf'\b{old}\b', new, text, flags=re.IGNORECASE)
+        pattern = _ABSTRACT_PATTERNS[context]
+        replacements = ABSTRACT_REPLACEMENTS[context]
 
-        q.question = text
+        q.question = _substitute(pattern, replacements, q.question)
 
         # Also update code_context if present
         if q.code_context:
-            for old, new in replacements.items():
-                q.code_context = re.sub(rf'\b{old}\b', new, q.code_context, flags=re.IGNORECASE)
+            q.code_context = _substitute(pattern, replacements, q.code_context)
 
         return q, "replace_abstract_variables"
 
@@ -169,7 +538,7 @@ class QuestionTransformer:
         }
 
         contexts = context_map.get(q.topic, self.contexts["general"])
-        context_example = random.choice(contexts)
+        context_example = self._rng_for(q).choice(contexts)
 
         # Reframe question with context
         text = q.question.lower()
@@ -193,25 +562,16 @@ class QuestionTransformer:
     def _diversify_names(self, q: Question) -> Tuple[Question, str]:
         """Replace Western-only names with globally diverse names"""
 
-        text = q.question
-
+        rng = self._rng_for(q)
         western_to_diverse = {
-            "alice": random.choice(["Priya", "Amara", "Sofia"]),
-            "bob": random.choice(["Chen", "Kofi", "Ahmed"]),
-            "john": random.choice(["Arjun", "Diego", "Kwame"]),
-            "jane": random.choice(["Yuki", "Elena", "Fatima"]),
-            "mike": random.choice(["Carlos", "Rashid", "Mei"]),
+            name: rng.choice(choices) for name, choices in DIVERSE_NAME_CHOICES.items()
         }
 
-        for old, new in western_to_diverse.items():
-            text = re.sub(rf'\b{old}\b', new, text, flags=re.IGNORECASE)
+        q.question = _substitute(_WESTERN_NAMES_PATTERN, western_to_diverse, q.question)
 
         # Also replace in code_context
         if q.code_context:
-            for old, new in western_to_diverse.items():
-                q.code_context = re.sub(rf'\b{old}\b', new, q.code_context, flags=re.IGNORECASE)
-
-        q.question = text
+            q.code_context = _substitute(_WESTERN_NAMES_PATTERN, western_to_diverse, q.code_context)
 
         return q, "diversify_names"
 
@@ -316,40 +676,116 @@ class QuestionTransformer:
 
         return q, "generic_enhancement"
 
-    def batch_transform(self, questions: List[Question], auto: bool = False, threshold: float = 4.8) -> Dict[str, any]:
+    def refine_one(self, question: Question, threshold: Optional[float] = None,
+                   max_iterations: Optional[int] = None, search: bool = False,
+                   scores: Optional[Dict[str, float]] = None) -> Optional[Tuple[Question, List[str], float]]:
         """
-        Transform multiple questions
-        Returns summary statistics
+        Refine one question of a batch (via refine, or search when `search` is set)
+        Returns: (refined_question, strategies, improvement), or None if it already meets threshold
         """
 
-        results = {
-            "total": len(questions),
-            "transformed": 0,
-            "unchanged": 0,
-            "improvements": [],
-            "strategies_used": {},
-        }
+        if threshold is None:
+            threshold = self.threshold
 
-        for i, q in enumerate(questions):
-            current_score = self.analyzer.analyze(q)["overall"]
+        scores = scores or self.analyzer.analyze(question)
 
-            if current_score >= threshold:
-                results["unchanged"] += 1
-                continue
+        if scores["overall"] >= threshold:
+            return None
 
-            transformed, strategy, improvement = self.transform(q, auto=auto)
+        if search:
+            return self.search(question, threshold=threshold, scores=scores)
 
-            if improvement > 0:
-                results["transformed"] += 1
-                results["improvements"].append(improvement)
-                results["strategies_used"][strategy] = results["strategies_used"].get(strategy, 0) + 1
+        return self.refine(question, max_iterations=max_iterations, threshold=threshold, scores=scores)
 
-                # Update original question in list
-                questions[i] = transformed
+    def batch_transform(self, questions: List[Question], auto: bool = False, threshold: float = 4.8,
+                        max_iterations: Optional[int] = None, search: bool = False,
+                        dedupe: bool = False) -> Dict[str, any]:
+        """
+        Refine multiple questions in place (see refine_one)
+        With `dedupe`, each distinct question is refined once and the result
+        fanned out to its duplicates.
+        Returns summary statistics
+        """
+
+        results = new_batch_results(len(questions))
 
-        if results["improvements"]:
-            results["avg_improvement"] = sum(results["improvements"]) / len(results["improvements"])
+        if dedupe:
+            deduplicator = QuestionDeduplicator()
+            groups = deduplicator.group(questions)
+            unique = (
+                self.refine_one(questions[group[0]], threshold=threshold,
+                                max_iterations=max_iterations, search=search)
+                for group in groups
+            )
+            outcomes = deduplicator.iter_fanned_outcomes(questions, groups, unique)
+            results["dedup_ratio"] = deduplicator.ratio(groups)
         else:
-            results["avg_improvement"] = 0.0
+            outcomes = (
+                (i, self.refine_one(q, threshold=threshold, max_iterations=max_iterations, search=search))
+                for i, q in enumerate(questions)
+            )
 
-        return results
+        for i, outcome in outcomes:
+            if record_outcome(results, outcome):
+                # Update original question in list
+                self.keep(questions, i, outcome[0])
+
+        return finish_batch_results(results)
+
+
+def new_batch_results(total: int) -> Dict[str, any]:
+    """Empty batch summary, filled by record_outcome"""
+    return {
+        "total": total,
+        "transformed": 0,
+        "unchanged": 0,
+        "improvements": [],
+        "strategies_used": {},
+    }
+
+
+def record_outcome(results: Dict[str, any], outcome: Optional[Tuple[Question, List[str], float]]) -> bool:
+    """Add one refine_one outcome to a batch summary; True if the refinement should be kept"""
+
+    if outcome is None:
+        results["unchanged"] += 1
+        return False
+
+    transformed, strategies, improvement = outcome
+    if improvement <= 0:
+        return False
+
+    results["transformed"] += 1
+    results["improvements"].append(improvement)
+    for strategy in strategies:
+        results["strategies_used"][strategy] = results["strategies_used"].get(strategy, 0) + 1
+
+    return True
+
+
+def notify_refined(listeners: List[RefinementListener], question: Question, since: int):
+    """Pass the refinement_history entries after the first `since` to each listener"""
+
+    entries = question.refinement_history[since:]
+    if entries:
+        for listener in listeners:
+            listener(question, entries)
+
+
+def keep_refinement(listeners: List[RefinementListener], questions: List[Question],
+                    i: int, refined: Question):
+    """Replace questions[i] with its accepted refinement, notifying `listeners` of the new history"""
+
+    notify_refined(listeners, refined, len(questions[i].refinement_history))
+    questions[i] = refined
+
+
+def finish_batch_results(results: Dict[str, any]) -> Dict[str, any]:
+    """Compute derived batch statistics"""
+
+    if results["improvements"]:
+        results["avg_improvement"] = sum(results["improvements"]) / len(results["improvements"])
+    else:
+        results["avg_improvement"] = 0.0
+
+    return results
@@ -2,19 +2,27 @@
 Quality Validator - Ensure 4.8/5 threshold is met
 """
 
-from typing import Dict, List, Tuple
+import heapq
+import json
+import tempfile
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 from .parser import Question
 from .analyzer import QuestionAnalyzer
+from .stats import BatchAggregator, criterion_issues
+from .sampling import StratifiedSampler, estimate_from_sample
 
 
 class QualityValidator:
     """Validate question quality against flagship standards"""
 
+    # Worst failures kept in validate_batch's failed_questions
+    FAILED_SAMPLE_SIZE = 100
+
     def __init__(self, config_path: str = "config.yaml", threshold: float = 4.8):
         self.analyzer = QuestionAnalyzer(config_path)
         self.threshold = threshold
 
-    def validate(self, question: Question) -> Tuple[bool, Dict[str, any]]:
+    def validate(self, question: Question, include_suggestions: bool = True) -> Tuple[bool, Dict[str, any]]:
         """
         Validate a single question
         Returns: (passes, validation_report)
@@ -34,98 +42,144 @@ class QualityValidator:
 
         if not passes:
             # Identify what's holding the score down
-            for criterion, score in scores.items():
-                if criterion == "overall":
-                    continue
-
-                if score < 4.5:
-                    report["issues"].append({
-                        "criterion": criterion,
-                        "score": score,
-                        "gap": round(4.5 - score, 2)
-                    })
+            report["issues"] = criterion_issues(scores)
 
             # Get suggestions
-            report["suggestions"] = self.analyzer.get_improvement_suggestions(question, scores)
+            if include_suggestions:
+                report["suggestions"] = self.analyzer.get_improvement_suggestions(question, scores)
 
         return passes, report
 
-    def validate_batch(self, questions: List[Question]) -> Dict[str, any]:
+    def aggregate(self, questions: Iterable[Question],
+                  aggregator: Optional[BatchAggregator] = None) -> BatchAggregator:
         """
-        Validate multiple questions
-        Returns summary report
+        Score `questions` into a streaming aggregator (a new one by default)
+        Partial aggregators from separate shards combine with BatchAggregator.merge.
         """
 
-        results = {
-            "total": len(questions),
-            "passed": 0,
-            "failed": 0,
-            "average_score": 0.0,
-            "threshold": self.threshold,
-            "distribution": {
-                "excellent": 0,  # ≥4.8
-                "very_good": 0,  # 4.5-4.7
-                "good": 0,       # 4.0-4.4
-                "adequate": 0,   # 3.5-3.9
-                "needs_work": 0, # 3.0-3.4
-                "poor": 0        # <3.0
-            },
-            "failed_questions": []
-        }
-
-        total_score = 0
+        if aggregator is None:
+            aggregator = BatchAggregator(self.threshold, self.FAILED_SAMPLE_SIZE)
 
         for q in questions:
-            passes, report = self.validate(q)
-
-            if passes:
-                results["passed"] += 1
-            else:
-                results["failed"] += 1
-                results["failed_questions"].append({
-                    "id": q.id,
-                    "question": q.question[:50] + "..." if len(q.question) > 50 else q.question,
-                    "score": report["overall_score"],
-                    "top_issue": report["issues"][0] if report["issues"] else None
-                })
-
-            score = report["overall_score"]
-            total_score += score
-
-            # Distribution
-            if score >= 4.8:
-                results["distribution"]["excellent"] += 1
-            elif score >= 4.5:
-                results["distribution"]["very_good"] += 1
-            elif score >= 4.0:
-                results["distribution"]["good"] += 1
-            elif score >= 3.5:
-                results["distribution"]["adequate"] += 1
-            elif score >= 3.0:
-                results["distribution"]["needs_work"] += 1
-            else:
-                results["distribution"]["poor"] += 1
-
-        results["average_score"] = round(total_score / len(questions), 2)
+            aggregator.add(q, self.analyzer.analyze(q))
+
+        return aggregator
+
+    def validate_batch(self, questions: Iterable[Question], include_suggestions: bool = False) -> Dict[str, any]:
+        """
+        Validate multiple questions in constant memory
+        `failed_questions` samples the worst FAILED_SAMPLE_SIZE failures,
+        lowest score first; suggestions are added to those only on request.
+        Returns summary report
+        """
+
+        aggregator = self.aggregate(questions)
+        results = aggregator.report()
+
+        if include_suggestions:
+            for entry, (q, scores) in zip(results["failed_questions"], aggregator.worst_failures()):
+                entry["suggestions"] = self.analyzer.get_improvement_suggestions(q, scores)
 
         return results
 
-    def get_refinement_priority(self, questions: List[Question]) -> List[Tuple[Question, float, List[str]]]:
+    def estimate_batch(self, questions: Iterable[Question], sample_size: int,
+                       confidence: float = 0.95, seed: int = 0) -> Dict[str, any]:
+        """
+        Estimate validate_batch from a stratified sample, in one pass
+        Only the sampled questions are scored (see StratifiedSampler).
+        Raises ValueError if `questions` is empty.
+        Returns summary report with confidence intervals
+        """
+
+        strata = StratifiedSampler(sample_size, seed=seed).sample(questions)
+        if not strata:
+            raise ValueError("No valid questions found")
+        scored = {
+            key: (count, [self.analyzer.analyze(q) for q in sample])
+            for key, (count, sample) in strata.items()
+        }
+        return estimate_from_sample(scored, self.threshold, confidence)
+
+    def get_refinement_priority(self, questions: Iterable[Question],
+                                limit: Optional[int] = None) -> List[Tuple[Question, float, List[str]]]:
         """
         Get questions prioritized by refinement need
+        `questions` may be any iterable (e.g. QuestionParser.iter_jsonl). With
+        `limit=k`, only the k worst are kept while streaming (bounded heap)
+        and issues are identified for those k alone.
         Returns: List of (question, score, top_issues)
         """
 
-        priorities = []
+        if limit is None:
+            failing = [
+                (scores["overall"], seq, q, scores)
+                for seq, (q, scores) in enumerate(self._iter_failing(questions))
+            ]
+        else:
+            # Max-heap on score (via negation) holding the `limit` worst so far;
+            # ties keep the earlier question, matching the stable full sort
+            heap = []
+            for seq, (q, scores) in enumerate(self._iter_failing(questions)):
+                entry = (-scores["overall"], -seq, q, scores)
+                if len(heap) < limit:
+                    heapq.heappush(heap, entry)
+                elif limit and -heap[0][0] > scores["overall"]:
+                    heapq.heapreplace(heap, entry)
+
+            failing = [(-neg_score, -neg_seq, q, scores) for neg_score, neg_seq, q, scores in heap]
+
+        # Sort by score (lowest first = highest priority)
+        failing.sort(key=lambda x: (x[0], x[1]))
+
+        return [(q, score, self._top_issues(q, scores)) for score, seq, q, scores in failing]
 
+    def iter_refinement_priority_external(self, questions: Iterable[Question], run_size: int = 100000,
+                                          tmp_dir: Optional[str] = None) -> Iterator[Tuple[Question, float, List[str]]]:
+        """
+        get_refinement_priority for banks larger than memory
+        Failing questions are sorted in runs of `run_size`, spilled to
+        temporary files and merged lazily; issues are identified as each
+        entry is yielded. Memory stays bounded by `run_size`.
+        Yields: (question, score, top_issues), lowest score first
+        """
+
+        runs = []
+        try:
+            buffer = []
+            for seq, (q, scores) in enumerate(self._iter_failing(questions)):
+                buffer.append((scores["overall"], seq, scores, q.to_dict()))
+                if len(buffer) >= run_size:
+                    runs.append(self._spill_run(buffer, tmp_dir))
+                    buffer = []
+            if buffer:
+                runs.append(self._spill_run(buffer, tmp_dir))
+
+            readers = [(tuple(json.loads(line)) for line in run) for run in runs]
+            for score, seq, scores, data in heapq.merge(*readers, key=lambda e: (e[0], e[1])):
+                q = Question(**data)
+                yield q, score, self._top_issues(q, scores)
+        finally:
+            for run in runs:
+                run.close()
+
+    def _iter_failing(self, questions: Iterable[Question]) -> Iterator[Tuple[Question, Dict[str, float]]]:
+        """Stream (question, scores) for questions below the threshold"""
         for q in questions:
             scores = self.analyzer.analyze(q)
             if scores["overall"] < self.threshold:
-                issues = self.analyzer.identify_issues(q, scores)
-                top_issues = [desc for cat, desc, pri in issues[:3]]
-                priorities.append((q, scores["overall"], top_issues))
-
-        # Sort by score (lowest first = highest priority)
-        priorities.sort(key=lambda x: x[1])
-
-        return priorities
+                yield q, scores
+
+    def _top_issues(self, question: Question, scores: Dict[str, float]) -> List[str]:
+        """Descriptions of the three highest-priority issues"""
+        issues = self.analyzer.identify_issues(question, scores)
+        return [desc for cat, desc, pri in issues[:3]]
+
+    @staticmethod
+    def _spill_run(buffer: List[tuple], tmp_dir: Optional[str]):
+        """Write one sorted run to a temporary file, rewound for reading"""
+        buffer.sort(key=lambda e: (e[0], e[1]))
+        run = tempfile.TemporaryFile('w+', encoding='utf-8', dir=tmp_dir)
+        for entry in buffer:
+            run.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        run.seek(0)
+        return run
@@ -0,0 +1,144 @@
+"""
+Keyword Vocabulary - Bank-wide keyword document frequencies for RAG scoring
+"""
+
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import yaml
+
+from .parser import Question
+
+
+def normalize_keyword(keyword: str) -> str:
+    """Lowercased, whitespace-collapsed keyword"""
+    return " ".join(keyword.lower().split())
+
+
+class KeywordVocabulary:
+    """Document frequency of every keyword, bank-wide and per topic
+
+    Each question counts once per distinct (normalized) keyword. Questions
+    are tracked by id, so upsert() and delete() adjust the counts in O(k)
+    without a rebuild; `version` changes whenever the counts do.
+    """
+
+    def __init__(self, max_df: float = 0.5, min_documents: int = 50):
+        self.max_df = max_df
+        self.min_documents = min_documents
+
+        self.df: Dict[str, int] = {}
+        self.topic_df: Dict[str, Dict[str, int]] = {}
+        self.topic_documents: Dict[str, int] = {}
+        # question id -> (topic, normalized keywords)
+        self._entries: Dict[str, Tuple[str, Tuple[str, ...]]] = {}
+        self.version = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @classmethod
+    def from_config(cls, config_path: str = "config.yaml") -> "KeywordVocabulary":
+        """Vocabulary with settings from rag.vocabulary, loaded from its path if the file exists"""
+        with open(config_path, 'r') as f:
+            settings = dict(yaml.safe_load(f)['rag'].get('vocabulary', {}))
+        path = settings.pop('path', None)
+        if path and Path(path).exists():
+            return cls.load(path, **settings)
+        return cls(**settings)
+
+    @property
+    def active(self) -> bool:
+        """Whether the table covers enough questions to score with"""
+        return len(self._entries) >= self.min_documents
+
+    def build(self, questions: Iterable[Question]) -> "KeywordVocabulary":
+        """Count `questions` (replaces any previous contents)"""
+        self.df, self.topic_df, self.topic_documents, self._entries = {}, {}, {}, {}
+        for q in questions:
+            self.upsert(q)
+        return self
+
+    def upsert(self, question: Question):
+        """Count `question`, replacing any earlier counts for its id"""
+        self.delete(question.id)
+        keywords = tuple(dict.fromkeys(normalize_keyword(k) for k in question.keywords or []))
+        self._entries[question.id] = (question.topic, keywords)
+        self._adjust(question.topic, keywords, 1)
+
+    def delete(self, question_id: str) -> bool:
+        """Remove a question's counts; False if it is not counted"""
+        entry = self._entries.pop(question_id, None)
+        if entry is None:
+            return False
+        self._adjust(*entry, -1)
+        return True
+
+    def on_refined(self, question: Question, entries: List[Dict[str, Any]]):
+        """QuestionTransformer listener: recount a refined question"""
+        self.upsert(question)
+
+    def _adjust(self, topic: str, keywords: Tuple[str, ...], step: int):
+        topic_df = self.topic_df.setdefault(topic, {})
+        self.topic_documents[topic] = self.topic_documents.get(topic, 0) + step
+        for table in (self.df, topic_df):
+            for keyword in keywords:
+                count = table.get(keyword, 0) + step
+                if count:
+                    table[keyword] = count
+                else:
+                    del table[keyword]
+        if not self.topic_documents[topic]:
+            del self.topic_documents[topic], self.topic_df[topic]
+        self.version += 1
+
+    def share(self, keyword: str, topic: Optional[str] = None) -> float:
+        """Share of questions (in `topic`, if given) that have `keyword`"""
+        keyword = normalize_keyword(keyword)
+        if topic is None:
+            total, count = len(self._entries), self.df.get(keyword, 0)
+        else:
+            total, count = self.topic_documents.get(topic, 0), self.topic_df.get(topic, {}).get(keyword, 0)
+        return count / total if total else 0.0
+
+    def distinct_count(self, keywords: Iterable[str]) -> int:
+        """Number of different keywords in at most `max_df` of the bank"""
+        limit = self.max_df * len(self._entries)
+        get = self.df.get
+        return sum(1 for k in {normalize_keyword(k) for k in keywords} if get(k, 0) <= limit)
+
+    def generic_keywords(self, limit: int = 10) -> List[Tuple[str, float]]:
+        """Keywords above `max_df`, most common first: [(keyword, share)]"""
+        total = len(self._entries)
+        ranked = sorted(self.df.items(), key=lambda item: (-item[1], item[0]))
+        return [(k, round(n / total, 3)) for k, n in ranked[:limit] if n > self.max_df * total]
+
+    def save(self, path: str):
+        """Write the table as JSON
+
+        Per-question entries are stored alongside the counts so a loaded
+        table can still apply upserts; load() recounts from the entries.
+        """
+        data = {
+            "documents": len(self._entries),
+            "df": self.df,
+            "topics": {
+                topic: {"documents": self.topic_documents[topic], "df": df}
+                for topic, df in self.topic_df.items()
+            },
+            "questions": {qid: [topic, list(keywords)] for qid, (topic, keywords) in self._entries.items()}
+        }
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path: str, **settings) -> "KeywordVocabulary":
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+        vocabulary = cls(**settings)
+        for qid, (topic, keywords) in data["questions"].items():
+            vocabulary._entries[qid] = (topic, tuple(keywords))
+            vocabulary._adjust(topic, tuple(keywords), 1)
+        return vocabulary
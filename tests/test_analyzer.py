@@ -0,0 +1,24 @@
+"""Raw-record scoring tests for QuestionAnalyzer"""
+
+import pytest
+
+from refiner import QuestionAnalyzer, QuestionParser
+
+ROW = {"id": "q1", "topic": "Data Types", "question": "What does type(3.0) return in Python?",
+       "style": "short_question", "difficulty": "starter", "keywords": ["type", "float"]}
+
+
+def test_record_scores_match_question_scores():
+    analyzer = QuestionAnalyzer()
+    record = analyzer.analyze_record(ROW)
+    scores = analyzer.analyze(QuestionParser._dict_to_question(dict(ROW)))
+    assert record.overall == scores["overall"]
+
+
+@pytest.mark.parametrize("field", ["question", "difficulty", "style"])
+def test_records_missing_required_fields_are_rejected(field):
+    row = {k: v for k, v in ROW.items() if k != field}
+    with pytest.raises(ValueError, match="Missing required fields"):
+        QuestionAnalyzer().analyze_record(row)
+    with pytest.raises(ValueError, match="Missing required fields"):
+        next(QuestionAnalyzer().analyze_records([tuple(row.values())], columns=list(row)))
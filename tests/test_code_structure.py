@@ -0,0 +1,35 @@
+"""Fingerprint and statement-similarity tests for StructuralFingerprinter"""
+
+from refiner.code_structure import StructuralFingerprinter
+
+LOOP = "total = 0\nfor item in items:\n    total += item\nprint(total)"
+
+
+def test_renamed_snippets_share_a_digest():
+    fingerprinter = StructuralFingerprinter()
+    renamed = "count = 0\nfor v in values:\n    count += v\nprint(count)"
+    assert fingerprinter.fingerprint(LOOP).digest == fingerprinter.fingerprint(renamed).digest
+
+
+def test_statements_hash_the_same_wherever_their_names_first_appear():
+    fingerprinter = StructuralFingerprinter()
+    prefixed = fingerprinter.fingerprint("data = load()\n" + LOOP)
+    plain = fingerprinter.fingerprint(LOOP)
+
+    assert prefixed.digest != plain.digest
+    assert plain.statements <= prefixed.statements
+    assert StructuralFingerprinter.similarity(prefixed, plain) == len(plain.statements) / len(prefixed.statements)
+
+
+def test_unrelated_snippets_share_no_statements():
+    fingerprinter = StructuralFingerprinter()
+    other = fingerprinter.fingerprint("def f(a):\n    return a * 2")
+    assert StructuralFingerprinter.similarity(fingerprinter.fingerprint(LOOP), other) == 0.0
+
+
+def test_unparseable_snippets_fall_back_to_tokens():
+    fingerprinter = StructuralFingerprinter()
+    a = fingerprinter.fingerprint("for x in range(10)\n    print(x")
+    b = fingerprinter.fingerprint("for y in range(3)\n    print(y")
+    assert a.method == b.method == "tokens"
+    assert a.digest == b.digest
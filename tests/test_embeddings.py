@@ -0,0 +1,74 @@
+"""Recall tests for SemanticIndex on banks large enough to use the ANN index"""
+
+import random
+
+import numpy as np
+
+from refiner import SemanticIndex
+from refiner.parser import Question
+
+BANK_SIZE = 2 * SemanticIndex.EXACT_MAX
+
+
+def make_bank(size, seed=0):
+    """Distinct short questions drawn from a shared vocabulary"""
+    rng = random.Random(seed)
+    vocab = ["".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(3, 9)))
+             for _ in range(3000)]
+    return [
+        Question(id=f"q{i}", topic="Python", question=" ".join(rng.choice(vocab) for _ in range(rng.randint(4, 9))),
+                 style="explain_concept", difficulty="core")
+        for i in range(size)
+    ]
+
+
+def one_word_edits(questions, count, seed=1):
+    """(edited text, index of the source question) pairs"""
+    rng = random.Random(seed)
+    edits = []
+    for i in rng.sample(range(len(questions)), count):
+        words = questions[i].question.split()
+        words[rng.randrange(len(words))] = rng.choice(["value", "list", "foo"])
+        edits.append((" ".join(words), i))
+    return edits
+
+
+def test_ann_recall_above_exact_max():
+    questions = make_bank(BANK_SIZE)
+    index = SemanticIndex().build(questions)
+    assert len(index) > SemanticIndex.EXACT_MAX
+
+    edits = one_word_edits(questions, 300)
+    vectors = index.vectorizer.transform([text for text, i in edits])
+    exact = np.argmax(vectors @ index.vectors.data.T, axis=1)
+    found = [index.query_vector(vector, k=1)[0][0] for vector in vectors]
+
+    assert np.mean(np.asarray(found) == exact) >= 0.98
+
+
+def test_upserts_above_exact_max_are_found_before_compaction():
+    questions = make_bank(BANK_SIZE)
+    index = SemanticIndex().build(questions)
+    index.background_compaction = False
+
+    changed = Question(id="q7", topic="Python", question="zzyzx quokka marmalade", style="explain_concept",
+                       difficulty="core")
+    index.upsert(changed)
+    assert index.search("zzyzx quokka marmalade", k=1)[0][0] == "q7"
+
+    index.delete("q7")
+    assert all(qid != "q7" for qid, sim in index.search("zzyzx quokka marmalade", k=5))
+
+
+def test_similar_matches_questions_by_id_and_content():
+    questions = make_bank(50)
+    index = SemanticIndex().build(questions)
+
+    copy = Question(id="q3", topic="Python", question=questions[3].question, style="explain_concept",
+                    difficulty="core")
+    assert all(qid != "q3" for qid, sim in index.similar(copy, k=5))
+
+    # Same id, new text: embedded afresh, still excluded as itself
+    edited = Question(id="q3", topic="Python", question=questions[4].question, style="explain_concept",
+                      difficulty="core")
+    assert index.similar(edited, k=1)[0] == ("q4", 1.0)
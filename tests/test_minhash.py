@@ -0,0 +1,84 @@
+"""Candidate verification tests for NearDuplicateDetector"""
+
+import random
+from itertools import combinations
+
+import numpy as np
+
+from refiner import NearDuplicateDetector
+from refiner.parser import Question
+
+
+def make_question(i, text):
+    return Question(id=f"q{i}", topic="Python", question=text, style="rewrite", difficulty="core")
+
+
+def make_bank(families=40, variants=4, seed=0):
+    """Families of questions that differ by a word or two"""
+    rng = random.Random(seed)
+    vocab = [f"w{i}" for i in range(400)]
+    questions = []
+    for _ in range(families):
+        base = [rng.choice(vocab) for _ in range(14)]
+        for _ in range(variants):
+            words = list(base)
+            for _ in range(rng.randint(0, 2)):
+                words[rng.randrange(len(words))] = rng.choice(vocab)
+            questions.append(make_question(len(questions), " ".join(words)))
+    return questions
+
+
+def test_bucket_pairs_are_verified_beyond_the_head():
+    detector = NearDuplicateDetector(threshold=0.6)
+    shared = "alpha beta gamma delta epsilon zeta eta theta iota kappa lambda mu"
+    questions = [
+        make_question(0, "alpha beta gamma delta epsilon zeta one two three four five six"),
+        make_question(1, shared + " nu xi"),
+        make_question(2, shared + " omicron pi"),
+    ]
+    sigs = detector.signatures(questions)
+    assert detector.similarity(sigs[0], sigs[1]) < 0.6 <= detector.similarity(sigs[1], sigs[2])
+
+    found = detector._verify_bucket(sigs, np.arange(3), np.random.default_rng(0))
+    assert [(i, j) for i, j, score in found] == [(1, 2)]
+
+
+def test_find_reports_every_similar_pair_sharing_a_bucket():
+    detector = NearDuplicateDetector(threshold=0.5)
+    questions = make_bank()
+    sigs = detector.signatures(questions)
+
+    expected = set()
+    for i, j in combinations(range(len(questions)), 2):
+        shares_band = any(
+            (sigs[i, b * detector.rows:(b + 1) * detector.rows] == sigs[j, b * detector.rows:(b + 1) * detector.rows]).all()
+            for b in range(detector.bands)
+        )
+        if shares_band and detector.similarity(sigs[i], sigs[j]) >= detector.threshold:
+            expected.add((i, j))
+
+    # Questions with identical signatures are checked through their first occurrence,
+    # so compare the clusters the verified pairs induce
+    component = list(range(len(questions)))
+
+    def root(i):
+        while component[i] != i:
+            i = component[i]
+        return i
+
+    for i, j in sorted(expected):
+        component[max(root(i), root(j))] = min(root(i), root(j))
+    groups = {}
+    for i in range(len(questions)):
+        groups.setdefault(root(i), []).append(i)
+
+    clusters, pairs = detector.find(questions)
+    assert clusters == [members for members in groups.values() if len(members) > 1]
+    assert {(i, j) for i, j, score in pairs} <= expected
+
+
+def test_identical_questions_cluster_without_band_checks():
+    questions = [make_question(i, "what does len return for an empty list") for i in range(300)]
+    clusters, pairs = NearDuplicateDetector().find(questions)
+    assert clusters == [list(range(300))]
+    assert len(pairs) == 299
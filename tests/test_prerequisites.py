@@ -0,0 +1,79 @@
+"""Cycle detection and ordering tests for PrerequisiteGraph"""
+
+import random
+
+import pytest
+
+from refiner.parser import Question
+from refiner.prerequisites import PrerequisiteGraph
+
+
+def make_question(qid, prerequisites=()):
+    return Question(id=qid, topic="Python", question=f"Question {qid}?", style="short_question",
+                    difficulty="core", prerequisites=list(prerequisites))
+
+
+def make_graph(edges):
+    """Graph over {id: [prerequisite ids]}"""
+    return PrerequisiteGraph.build(make_question(qid, refs) for qid, refs in edges.items())
+
+
+def reachable(edges, start):
+    """Ids reachable from `start` by one or more prerequisite edges"""
+    seen, stack = set(), list(edges[start])
+    while stack:
+        qid = stack.pop()
+        if qid not in seen:
+            seen.add(qid)
+            stack.extend(edges[qid])
+    return seen
+
+
+def assert_topological(graph, edges):
+    position = {qid: i for i, qid in enumerate(graph.topological_order())}
+    for qid, refs in edges.items():
+        if qid in position:
+            assert all(position[ref] < position[qid] for ref in refs if ref in edges)
+
+
+def test_order_puts_prerequisites_first():
+    edges = {"loops": ["variables", "conditions"], "conditions": ["variables"], "variables": [],
+             "functions": ["loops", "variables"], "recursion": ["functions"]}
+    graph = make_graph(edges)
+
+    assert len(graph.topological_order()) == len(edges)
+    assert_topological(graph, edges)
+    assert graph.cycles() == []
+    assert graph.closure("recursion") == ["functions", "loops", "variables", "conditions"]
+    assert graph.dependents("variables") == ["loops", "conditions", "functions", "recursion"]
+
+
+def test_cycles_and_questions_needing_them_are_left_out_of_the_order():
+    edges = {"a": ["b"], "b": ["c"], "c": ["a"], "d": ["a"], "e": [], "f": ["f"], "g": ["e", "missing"]}
+    graph = make_graph(edges)
+
+    assert sorted(sorted(cycle) for cycle in graph.cycles()) == [["a", "b", "c"], ["f"]]
+    assert graph.topological_order() == ["e", "g"]
+    assert graph.dangling == {"g": ["missing"]}
+    with pytest.raises(ValueError, match="Unknown question id"):
+        graph.prerequisites("missing")
+
+
+def test_random_graphs_match_a_brute_force_reachability_check():
+    rng = random.Random(0)
+    for trial in range(20):
+        ids = [f"q{i}" for i in range(40)]
+        edges = {qid: rng.sample(ids, rng.randint(0, 2)) for qid in ids}
+        graph = make_graph(edges)
+
+        reach = {qid: reachable(edges, qid) for qid in ids}
+        on_cycle = {qid for qid in ids if qid in reach[qid]}
+        assert {qid for cycle in graph.cycles() for qid in cycle} == on_cycle
+        for cycle in graph.cycles():
+            assert all(set(cycle) <= reach[qid] for qid in cycle)
+        assert all(set(graph.closure(qid)) == reach[qid] - {qid} for qid in ids)
+
+        # Ordered exactly when nothing it (transitively) needs lies on a cycle
+        ordered = {qid for qid in ids if not (reach[qid] | {qid}) & on_cycle}
+        assert set(graph.topological_order()) == ordered
+        assert_topological(graph, edges)
@@ -0,0 +1,78 @@
+"""Sample size and interval coverage tests for StratifiedSampler and estimate_from_sample"""
+
+import random
+
+from refiner.parser import Question
+from refiner.sampling import StratifiedSampler, estimate_from_sample, wilson_interval
+
+TOPICS = [f"topic{i}" for i in range(11)]
+DIFFICULTIES = ["starter", "core", "advanced", "expert"]
+STYLES = ["short_question", "explain_concept"]
+
+
+def make_bank(size, seed=0):
+    """Questions over 88 strata of uneven size, with a score per id that depends on the stratum"""
+    rng = random.Random(seed)
+    questions, scores = [], {}
+    for i in range(size):
+        topic = TOPICS[min(int(rng.expovariate(0.4)), len(TOPICS) - 1)]
+        difficulty, style = rng.choice(DIFFICULTIES), rng.choice(STYLES)
+        q = Question(id=f"q{i}", topic=topic, question=f"Question {i}?", style=style, difficulty=difficulty)
+        base = 2.5 + 0.2 * TOPICS.index(topic) + 0.3 * DIFFICULTIES.index(difficulty)
+        scores[q.id] = {"overall": round(min(5.0, max(1.0, rng.gauss(base, 0.6))), 2)}
+        questions.append(q)
+    return questions, scores
+
+
+def estimate(questions, scores, sample_size, seed, threshold=4.0):
+    strata = StratifiedSampler(sample_size, seed=seed).sample(questions)
+    scored = {key: (count, [scores[q.id] for q in sample]) for key, (count, sample) in strata.items()}
+    return estimate_from_sample(scored, threshold)
+
+
+def test_sample_size_is_honored_with_more_strata_than_samples():
+    questions, scores = make_bank(3000)
+    result = estimate(questions, scores, 50, seed=0)
+    assert result["strata"] > 50
+    assert result["sample_size"] == 50
+    assert result["total"] == 3000
+
+
+def test_intervals_cover_the_true_values():
+    questions, scores = make_bank(3000)
+    overall = [scores[q.id]["overall"] for q in questions]
+    true_mean = sum(overall) / len(overall)
+    true_rate = sum(x >= 4.0 for x in overall) / len(overall)
+
+    runs, mean_hits, rate_hits = 200, 0, 0
+    for seed in range(runs):
+        result = estimate(questions, scores, 50, seed=seed)
+        mean, rate = result["average_score"], result["pass_rate"]
+        assert mean["high"] - mean["low"] > 0.05
+        mean_hits += mean["low"] <= true_mean <= mean["high"]
+        rate_hits += rate["low"] <= true_rate <= rate["high"]
+
+    # Nominal 95%; allow for the approximation on 50-question samples
+    assert mean_hits / runs >= 0.9
+    assert rate_hits / runs >= 0.9
+
+
+def test_zero_observed_pass_rate_still_has_an_interval():
+    questions, scores = make_bank(500)
+    result = estimate(questions, scores, 30, seed=3, threshold=5.1)
+    assert result["pass_rate"]["estimate"] == 0.0
+    assert result["pass_rate"]["high"] > 0.0
+
+
+def test_census_has_exact_shares():
+    questions, scores = make_bank(200)
+    result = estimate(questions, scores, 500, seed=0)
+    assert result["sample_size"] == 200
+    assert result["pass_rate"]["low"] == result["pass_rate"]["estimate"] == result["pass_rate"]["high"]
+
+
+def test_wilson_interval_is_inside_unit_range():
+    low, high = wilson_interval(0.0, 20, 1.96)
+    assert low == 0.0 and 0.1 < high < 0.2
+    low, high = wilson_interval(1.0, 20, 1.96)
+    assert 0.8 < low < 0.9 and high == 1.0
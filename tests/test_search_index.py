@@ -0,0 +1,84 @@
+"""Delta-segment and persistence tests for InvertedIndex"""
+
+import random
+
+import numpy as np
+
+from refiner.parser import Question
+from refiner.search_index import InvertedIndex
+
+
+def make_question(i, text, keywords=None):
+    return Question(id=f"q{i}", topic="Python", question=text, style="explain_concept", difficulty="core",
+                    keywords=keywords or [])
+
+
+def make_bank(size, seed=0):
+    rng = random.Random(seed)
+    vocab = [f"term{i}" for i in range(200)]
+    return [make_question(i, " ".join(rng.choice(vocab) for _ in range(rng.randint(3, 12))))
+            for i in range(size)]
+
+
+def scores(index, query):
+    """Every match as {question_id: score}; ties order by doc number, which upserts change"""
+    return dict(index.search(query, k=len(index)))
+
+
+def probe_queries(count, seed=1):
+    rng = random.Random(seed)
+    return [" ".join(f"term{rng.randrange(200)}" for _ in range(rng.randint(1, 3))) for _ in range(count)]
+
+
+def test_delta_segment_matches_a_fresh_build():
+    questions = make_bank(500)
+    index = InvertedIndex.build(questions)
+    index.background_compaction = False
+
+    edited = list(questions)
+    for i in (3, 40, 41, 499):
+        edited[i] = make_question(i, "zzyzx quokka " + questions[i].question)
+        index.upsert(edited[i])
+    added = make_question(500, "quokka marmalade term5")
+    index.upsert(added)
+    index.delete("q7")
+    edited = [q for q in edited if q.id != "q7"] + [added]
+
+    # Not yet compacted: reads merge the delta segment
+    assert index.stale and index._delta
+    fresh = InvertedIndex.build(edited)
+    assert len(index) == len(fresh)
+    for query in probe_queries(50) + ["zzyzx quokka", "marmalade"]:
+        assert scores(index, query) == scores(fresh, query)
+    assert "q7" not in scores(index, "term1 term2 term3")
+
+    index.compact(wait=True)
+    assert not index.stale
+    assert scores(index, "zzyzx quokka") == scores(fresh, "zzyzx quokka")
+
+
+def test_save_load_round_trip(tmp_path):
+    index = InvertedIndex.build(make_bank(400), k1=1.2, b=0.6)
+    index.background_compaction = False
+    index.upsert(make_question(10, "quokka term7 term7", keywords=["marmalade"]))
+    index.delete("q20")
+
+    path = tmp_path / "index" / "bm25.npz"
+    index.save(str(path))
+    loaded = InvertedIndex.load(str(path))
+
+    assert (loaded.k1, loaded.b) == (1.2, 0.6)
+    assert len(loaded) == len(index)
+    assert loaded.terms == index.terms
+    assert np.array_equal(loaded.post_docs, index.post_docs)
+    assert np.array_equal(loaded.post_tf, index.post_tf)
+    for query in probe_queries(50) + ["quokka marmalade"]:
+        assert loaded.search(query, k=10) == index.search(query, k=10)
+
+
+def test_empty_index_round_trip(tmp_path):
+    path = tmp_path / "empty.npz"
+    InvertedIndex.build([]).save(str(path))
+    loaded = InvertedIndex.load(str(path))
+    assert len(loaded) == 0
+    assert loaded.search("anything") == []
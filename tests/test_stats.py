@@ -0,0 +1,121 @@
+"""Error-bound and merge tests for QuantileSketch and BatchAggregator"""
+
+import bisect
+import random
+
+import pytest
+
+from refiner.analyzer import CRITERIA
+from refiner.parser import Question
+from refiner.stats import BatchAggregator, QuantileSketch
+
+RANKS = [i / 100 for i in range(1, 100)]
+
+
+def rank_error(sketch, values):
+    """Largest |true rank - requested rank| over RANKS, as a fraction of n"""
+    ordered = sorted(values)
+    worst = 0.0
+    for rank in RANKS:
+        value = sketch.quantile(rank)
+        low = bisect.bisect_left(ordered, value) / len(ordered)
+        high = bisect.bisect_right(ordered, value) / len(ordered)
+        worst = max(worst, 0.0 if low <= rank <= high else min(abs(low - rank), abs(high - rank)))
+    return worst
+
+
+def make_scored(size, seed=0):
+    """(question, scores) pairs with every criterion and a skewed overall score"""
+    rng = random.Random(seed)
+    scored = []
+    for i in range(size):
+        scores = {criterion: round(rng.uniform(2.5, 5.0), 2) for criterion in CRITERIA}
+        scores["overall"] = round(min(5.0, rng.betavariate(5, 1.5) * 5), 2)
+        q = Question(id=f"q{i}", topic="Python", question=f"Question {i}?", style="short_question",
+                     difficulty="core")
+        scored.append((q, scores))
+    return scored
+
+
+@pytest.mark.parametrize("order", ["random", "sorted", "reversed"])
+def test_quantile_error_within_bound(order):
+    rng = random.Random(0)
+    values = [rng.lognormvariate(0, 1) for _ in range(100000)]
+    if order != "random":
+        values.sort(reverse=order == "reversed")
+
+    sketch = QuantileSketch(k=200)
+    for value in values:
+        sketch.add(value)
+
+    assert sketch.n == len(values)
+    assert rank_error(sketch, values) <= 1.7 / sketch.k
+    # Memory stays O(k log n), far below n
+    assert sum(len(level) for level in sketch.levels) < 3 * sketch.k + 100
+
+
+def test_merged_sketches_keep_the_error_bound():
+    rng = random.Random(1)
+    shards = [[rng.gauss(shard, 1) for _ in range(20000)] for shard in range(5)]
+
+    merged = QuantileSketch(k=200)
+    for shard in shards:
+        sketch = QuantileSketch(k=200)
+        for value in shard:
+            sketch.add(value)
+        merged.merge(sketch)
+
+    values = [value for shard in shards for value in shard]
+    assert merged.n == len(values)
+    assert rank_error(merged, values) <= 1.7 / merged.k
+
+
+def test_small_sketch_is_exact():
+    sketch = QuantileSketch()
+    for value in range(1, 101):
+        sketch.add(value)
+    assert sketch.quantile(0.5) == 50
+    assert sketch.quantile(1.0) == 100
+    assert QuantileSketch().quantile(0.5) == 0.0
+
+
+def test_merged_aggregators_match_a_single_pass():
+    scored = make_scored(5000)
+    single = BatchAggregator(threshold=4.0, sample_size=20)
+    for q, scores in scored:
+        single.add(q, scores)
+
+    merged = BatchAggregator(threshold=4.0, sample_size=20)
+    for start in range(0, len(scored), 1200):
+        shard = BatchAggregator(threshold=4.0, sample_size=20)
+        for q, scores in scored[start:start + 1200]:
+            shard.add(q, scores)
+        merged.merge(shard)
+
+    expected, report = single.report(), merged.report()
+    quantiles = report.pop("quantiles")
+    expected_quantiles = expected.pop("quantiles")
+    assert report == expected
+    assert [q.id for q, scores in merged.worst_failures()] == [q.id for q, scores in single.worst_failures()]
+
+    # Sketches merge approximately: within a rank bound of the single pass
+    overall = sorted(scores["overall"] for q, scores in scored)
+    for label, rank in (("p5", 0.05), ("p50", 0.5), ("p95", 0.95)):
+        assert quantiles["overall"][label] == pytest.approx(expected_quantiles["overall"][label], abs=0.1)
+        position = bisect.bisect_left(overall, quantiles["overall"][label]) / len(overall)
+        assert abs(position - rank) <= 0.03
+
+
+def test_worst_failure_ties_keep_the_earlier_question():
+    scored = make_scored(50)
+    for q, scores in scored:
+        scores["overall"] = 3.0
+    aggregator = BatchAggregator(threshold=4.0, sample_size=5)
+    shard = BatchAggregator(threshold=4.0, sample_size=5)
+    for q, scores in scored[:25]:
+        aggregator.add(q, scores)
+    for q, scores in scored[25:]:
+        shard.add(q, scores)
+    aggregator.merge(shard)
+
+    assert [q.id for q, scores in aggregator.worst_failures()] == ["q0", "q1", "q2", "q3", "q4"]
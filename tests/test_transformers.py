@@ -0,0 +1,25 @@
+"""Regression tests for QuestionTransformer strategies"""
+
+from refiner import QuestionTransformer
+from refiner.parser import Question
+
+
+def make_question(text, code_context=None):
+    return Question(id="q1", topic="Data Types", question=text, style="scenario_task",
+                    difficulty="starter", code_context=code_context)
+
+
+def test_diversify_names_handles_case_folded_unicode():
+    transformer = QuestionTransformer()
+    q, strategy = transformer._diversify_names(make_question("Why does MİKE swap values?"))
+    assert strategy == "diversify_names"
+    assert "MİKE" not in q.question
+    assert q.question.startswith("Why does ") and q.question.endswith(" swap values?")
+
+
+def test_replace_abstract_variables_handles_long_s():
+    transformer = QuestionTransformer()
+    # "ſ" (long s) case-folds to "s", so the pattern matches "teſt" as "test"
+    q, strategy = transformer._replace_abstract_variables(make_question("Run teſt on x", "teſt(x)"))
+    assert q.question == "Run validate_email on price"
+    assert q.code_context == "validate_email(price)"
@@ -0,0 +1,58 @@
+"""Top-k and external-memory ordering tests for QualityValidator.get_refinement_priority"""
+
+import random
+
+from refiner import QualityValidator
+from refiner.parser import Question
+
+STYLES = ["short_question", "explain_concept", "rewrite", "scenario_task"]
+DIFFICULTIES = ["starter", "core", "stretch"]
+PHRASES = [
+    "What is x?",
+    "Explain the difference between a list and a tuple in Python.",
+    "Write a function that returns the largest number in a list of prices.",
+    "Given a CSV of orders, how would you total revenue per customer using a dict?",
+    "Rewrite this loop as a comprehension: for i in items: out.append(i * 2)",
+    "Why does foo(bar) raise a TypeError?",
+]
+
+
+def make_bank(size, seed=0):
+    """Questions with many repeated scores, so ties are common"""
+    rng = random.Random(seed)
+    return [
+        Question(id=f"q{i}", topic="Python", question=rng.choice(PHRASES), style=rng.choice(STYLES),
+                 difficulty=rng.choice(DIFFICULTIES), keywords=rng.sample(["list", "dict", "loop"], rng.randint(0, 2)))
+        for i in range(size)
+    ]
+
+
+def ranked(entries):
+    return [(q.id, score) for q, score, issues in entries]
+
+
+def test_limit_matches_the_head_of_the_full_sort():
+    validator = QualityValidator()
+    questions = make_bank(300)
+    full = validator.get_refinement_priority(questions)
+    assert len({score for q, score, issues in full}) < len(full)
+
+    for limit in (0, 1, 7, 50, len(full) + 10):
+        top = validator.get_refinement_priority(iter(questions), limit=limit)
+        assert ranked(top) == ranked(full)[:limit]
+        assert [issues for q, score, issues in top] == [issues for q, score, issues in full[:limit]]
+
+
+def test_external_merge_matches_the_full_sort(tmp_path):
+    validator = QualityValidator()
+    questions = make_bank(300, seed=1)
+    full = validator.get_refinement_priority(questions)
+
+    for run_size in (1, 16, 1000):
+        merged = list(validator.iter_refinement_priority_external(iter(questions), run_size=run_size,
+                                                                  tmp_dir=str(tmp_path)))
+        assert ranked(merged) == ranked(full)
+        assert [q.to_dict() for q, score, issues in merged] == [q.to_dict() for q, score, issues in full]
+
+    # Spilled runs are removed once the merge finishes
+    assert not list(tmp_path.iterdir())